@@ -6,12 +6,20 @@ It downloads and caches the model before the app starts.
 """
 
 import os
+import sys
 from transformers import pipeline
 
+# The detector package lives in the repository root, one level up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detector.snapshot import create_snapshot, has_snapshot, load_snapshot
+
 # Configuration
 MODEL_NAME = "openai-community/roberta-base-openai-detector"
+MODEL_REVISION = "main"  # Keep in sync with app.py
 TASK = "text-classification"
 MODEL_CACHE_DIR = "./model_cache"
+MODEL_SNAPSHOT_DIR = os.path.join(MODEL_CACHE_DIR, "snapshot", MODEL_NAME.replace("/", "--"))
 
 def setup_model():
     """Download and cache the model for Streamlit Cloud."""
@@ -20,18 +28,19 @@ def setup_model():
     # Create cache directory
     os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
     
-    # Set cache directory
-    os.environ['TRANSFORMERS_CACHE'] = MODEL_CACHE_DIR
-    os.environ['HF_HOME'] = MODEL_CACHE_DIR
-    
     try:
-        print(f"📥 Downloading model: {MODEL_NAME}")
-        print("⏳ This will only happen once during deployment...")
+        if not has_snapshot(MODEL_SNAPSHOT_DIR, MODEL_REVISION):
+            print(f"📥 Downloading model: {MODEL_NAME} @ {MODEL_REVISION}")
+            print("⏳ This will only happen once during deployment...")
+            create_snapshot(MODEL_NAME, MODEL_SNAPSHOT_DIR, revision=MODEL_REVISION,
+                            cache_dir=MODEL_CACHE_DIR)
         
-        # Download and cache the model
+        # Load from the snapshot exactly the way the app does
+        model, tokenizer = load_snapshot(MODEL_SNAPSHOT_DIR, checksums=True)
         classifier = pipeline(
             task=TASK,
-            model=MODEL_NAME,
+            model=model,
+            tokenizer=tokenizer,
             device=-1  # CPU only
         )
         
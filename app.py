@@ -10,8 +10,32 @@ Date: December 10, 2025
 
 import streamlit as st
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import csv
+import html
+import io
+import json
 import os
+import re
+import tempfile
+import time
+import hashlib
+import unicodedata
+import numpy as np
+import torch
+
+from detector import metrics
+from detector.batching import ThreadMicroBatcher
+from detector.cache import ResultCache, make_key
+from detector.cascade import HashedNgramModel, escalate
+from detector.engine import DirectClassifier, build_batch, label_indices, softmax
+from detector.ensemble import Ensemble
+from detector.logits import LogitStore
+from detector.neardup import SimHashIndex, fingerprint, similarity
+from detector.memory import parameter_bytes
+from detector.pool import ModelPool
+from detector.registry import ModelRegistry
+from detector.snapshot import create_snapshot, has_snapshot, load_snapshot, read_manifest
 
 # ============================================================================
 # Configuration Constants
@@ -22,6 +46,8 @@ import os
 AI_THRESHOLD = 0.70        # If AI probability > 70%, classify as "AI Generated"
 HUMAN_THRESHOLD = 0.70     # If Human probability > 70%, classify as "Human Written"
                            # If neither exceeds threshold, classify as "Mixed/Uncertain"
+HIGH_CONFIDENCE = 0.85     # Likelier class above 85%: "High" confidence
+MEDIUM_CONFIDENCE = 0.70   # Likelier class from 70%: "Medium" confidence, otherwise "Low"
 
 # Input constraints
 MAX_CHAR_LIMIT = 5000      # Maximum characters accepted from user input
@@ -33,9 +59,297 @@ TASK = "text-classification"                                    # Pipeline task
 DEVICE = -1                                              # -1 for CPU, 0+ for GPU device ID
 MODEL_CACHE_DIR = "./model_cache"                       # Local directory for model caching
                                                           # Reduces download time on subsequent runs
+MODEL_REVISION = "main"    # Branch, tag or commit hash to download; use a commit hash to pin exactly
+MODEL_SNAPSHOT_DIR = os.path.join(MODEL_CACHE_DIR, "snapshot", MODEL_NAME.replace("/", "--"))
+                                                          # Local safetensors snapshot the app loads from
+REQUIRE_LOCAL_SNAPSHOT = False  # Fail instead of downloading when no snapshot exists (offline deploys)
+VERIFY_SNAPSHOT_CHECKSUMS = False  # Hash every snapshot file at startup (sizes are always checked)
+SHARE_MODEL_WEIGHTS = True  # Memory-map weights from the snapshot so worker processes share one copy
+INFERENCE_BACKEND = "direct"  # "direct" (tokenizer + model, no pipeline), "torch" (transformers pipeline) or "onnx" (ONNX Runtime, CPU)
+ONNX_MODEL_DIR = os.path.join(MODEL_CACHE_DIR, "onnx", MODEL_NAME.replace("/", "--"))
+                                                          # Exported ONNX model (created on first use)
+QUANTIZED_MODEL = False    # Serve the dynamic INT8 variant (Linear layers) on the torch backend, CPU only
+QUANTIZED_MODEL_DIR = os.path.join(MODEL_CACHE_DIR, "int8", MODEL_NAME.replace("/", "--"))
+                                                          # Quantized model (created on first use)
+MODEL_REPLICAS = 1         # Model replicas (worker processes) serving requests in parallel; 1 = in-process
+THREADS_PER_REPLICA = None  # Intra-op torch threads per replica; None = CPU cores / MODEL_REPLICAS
+PIN_REPLICA_CORES = True   # Pin each replica to its own slice of cores (Linux)
+
+# Model ensemble (several detectors scored concurrently, probabilities averaged with weights)
+ENSEMBLE_MODELS = []       # e.g. [{"name": MODEL_NAME, "weight": 1.0}, {"name": "./other-detector", "weight": 0.5}]
+                           # Optional per member: "revision" (default "main"; MODEL_REVISION for MODEL_NAME),
+                           # and "ai_label"/"human_label" for other label names. Empty = MODEL_NAME alone.
+                           # Members use the torch backend.
+ENSEMBLE_WORKERS = None    # Threads scoring members concurrently; None = one per member
+
+# Runtime model switching (models loaded, switched and unloaded without restarting the app)
+ENABLE_MODEL_SWITCHING = False  # Sidebar to switch models; new requests use the new model at once
+MODEL_CHOICES = []         # Models offered besides MODEL_NAME (Hub names or local checkpoint paths)
+MAX_LOADED_MODELS = 2      # Models kept in memory at once; the least recently used is unloaded first
+MODEL_MEMORY_BUDGET_MB = None  # Also unload least recently used models beyond this much memory; None = no limit
+
+# Long-document scoring (sliding window)
+ENABLE_WINDOWING = True    # Score the full text in overlapping windows instead of truncating
+WINDOW_TOKENS = 512        # Window size in tokens, including the <s> and </s> special tokens
+WINDOW_OVERLAP = 128       # Tokens shared between consecutive windows to preserve context
+WINDOW_AGGREGATION = "mean"  # How window scores are combined: "mean", "max" or "weighted"
+
+# Sentence heatmap (single text: every sentence scored in one batched forward pass)
+ENABLE_SENTENCE_HEATMAP = True  # Highlight each sentence by its own AI probability
+SENTENCE_CONTEXT = 0       # Neighbouring sentences on each side scored along with each sentence
+
+# Batch scoring
+BATCH_SIZE = 16            # Windows per forward pass in analyze_texts
+
+# Bulk file upload
+BULK_FILE_TYPES = ["csv", "txt", "jsonl"]  # Accepted upload formats (one text per row/line)
+BULK_TEXT_FIELD = "text"   # CSV column / JSONL key holding the text (CSV falls back to first column)
+BULK_CHUNK_SIZE = 64       # Rows read and scored at a time; bounds memory for any file size
+
+# Result cache (identical texts are not scored twice)
+ENABLE_RESULT_CACHE = True
+RESULT_CACHE_PATH = os.path.join(MODEL_CACHE_DIR, "results.sqlite3")  # Survives restarts
+RESULT_CACHE_MEMORY_ENTRIES = 1024         # In-process LRU size
+RESULT_CACHE_MAX_ROWS = 100_000            # On-disk entries kept (least recently used evicted)
+RESULT_CACHE_TTL_SECONDS = 30 * 24 * 3600  # Entries older than 30 days are recomputed
+PREPROCESSING_VERSION = 1  # Bump whenever _normalize_text changes to invalidate cached scores
+ENABLE_INCREMENTAL_RESCORING = True  # Single text: reuse cached scores of unchanged paragraphs after an edit
+
+# Near-duplicate lookup (lightly edited copies of previously scored texts; needs the result cache)
+NEAR_DUPLICATE_MODE = "flag"  # "flag" the earlier score next to a fresh score, "reuse" it instead of scoring
+                               # (returns another text's score), or "off"
+NEAR_DUPLICATE_MAX_DISTANCE = 5  # SimHash bits (of 64) that may differ, i.e. >= 92% fingerprint similarity
+NEAR_DUPLICATE_MAX_TEXTS = 1_000_000  # Texts kept in the in-memory index (about 150 MB at the limit)
+
+# Two-stage cascade (a hashed n-gram model answers clear-cut texts; the rest go to the transformer)
+ENABLE_CASCADE = False     # Train the pre-classifier first: python -m detector train-cascade texts.jsonl
+CASCADE_MODEL_PATH = os.path.join(MODEL_CACHE_DIR, "cascade", MODEL_NAME.replace("/", "--") + ".npz")
+CASCADE_MARGIN = 0.15      # Pre-classifier answers only beyond a threshold by this much (e.g. AI > 85%)
+
+# Raw-logit store (python -m detector reclassify: re-read a corpus under new thresholds without the model)
+LOGIT_STORE_DIR = os.path.join(MODEL_CACHE_DIR, "logits")  # One subdirectory per model revision and window settings
+
+# Micro-batching (HTTP service: python -m detector serve)
+MICROBATCH_MAX_WAIT_MS = 10  # How long a request waits for concurrent requests to batch with
+MICROBATCH_MAX_TEXTS = 32    # Batch is sent immediately once it holds this many texts
+
+# Shared inference worker (Streamlit: all sessions' requests are batched together)
+ENABLE_SHARED_SCHEDULER = True
+SCHEDULER_MAX_WAIT_MS = 5    # Short: a lone user should barely notice the wait
+SCHEDULER_MAX_TEXTS = 64     # Large enough to take a whole bulk-upload chunk at once
+
+# Metrics (per-stage latency histograms and counters, Prometheus text format)
+SHOW_METRICS_SIDEBAR = False  # Admin sidebar with live p50/p95/p99 per stage
+METRICS_FILE = None        # e.g. "./model_cache/detector.prom" for node_exporter's textfile collector
+METRICS_FILE_INTERVAL_SECONDS = 15  # Minimum time between rewrites of METRICS_FILE
+
+
+def use_model(model_name: str) -> None:
+    """
+    Switch MODEL_NAME and the model directories derived from it.
+
+    Used by the CLI and benchmarks to serve another checkpoint (e.g. a local
+    path) without editing this file. Call it before load_model().
+
+    Args:
+        model_name (str): Hugging Face model name or local checkpoint path
+    """
+    global MODEL_NAME, MODEL_SNAPSHOT_DIR, ONNX_MODEL_DIR, QUANTIZED_MODEL_DIR, CASCADE_MODEL_PATH
+    MODEL_NAME = model_name
+    MODEL_SNAPSHOT_DIR = _model_dir("snapshot", model_name)
+    ONNX_MODEL_DIR = _model_dir("onnx", model_name)
+    QUANTIZED_MODEL_DIR = _model_dir("int8", model_name)
+    CASCADE_MODEL_PATH = _model_dir("cascade", model_name) + ".npz"
+
+
+def _model_dir(kind: str, model_name: str) -> str:
+    """
+    Return the directory under MODEL_CACHE_DIR for one kind of model file.
+    
+    Args:
+        kind (str): "snapshot", "onnx", "int8" or "cascade"
+        model_name (str): Hugging Face model name or local checkpoint path
+        
+    Returns:
+        str: Where files of that kind are kept for the model, under MODEL_CACHE_DIR
+    """
+    return os.path.join(MODEL_CACHE_DIR, kind, model_name.strip("/").replace("/", "--"))
+
+
+def _replica_settings() -> Dict[str, Any]:
+    """
+    Collect this module's current plain-data settings for model replica processes.
+    
+    Replicas import app.py afresh, so settings changed at runtime (by the CLI,
+    benchmarks or use_model) are sent along and applied there.
+    
+    Returns:
+        dict: Upper-case module constants holding str, int, float, bool, None,
+              or lists and dicts of them (e.g. ENSEMBLE_MODELS)
+    """
+    return {name: value for name, value in globals().items()
+            if name.isupper() and isinstance(value, (str, int, float, bool, type(None), list, dict))}
+
+
+def _prepare_snapshot(model_name: str, snapshot_dir: str, revision: str) -> None:
+    """
+    Download a model revision into a local snapshot, unless it is already there.
+    
+    A snapshot taken at another revision is replaced.
+    
+    Args:
+        model_name (str): Hugging Face model name or local checkpoint path
+        snapshot_dir (str): Snapshot directory
+        revision (str): Branch, tag or commit hash
+        
+    Raises:
+        FileNotFoundError: If there is no snapshot of revision and REQUIRE_LOCAL_SNAPSHOT is set
+    """
+    if has_snapshot(snapshot_dir, revision):
+        return
+    if REQUIRE_LOCAL_SNAPSHOT:
+        found = f" (found revision {read_manifest(snapshot_dir)['revision']})" if has_snapshot(snapshot_dir) else ""
+        raise FileNotFoundError(f"No model snapshot of revision {revision} in {snapshot_dir}{found}; "
+                                f"run 'python download_model.py --revision {revision}' first")
+    create_snapshot(model_name, snapshot_dir, revision=revision, cache_dir=MODEL_CACHE_DIR)
+
+
+def _member_revision(spec: Dict[str, Any]) -> str:
+    """
+    Return the revision an ensemble member is snapshotted at.
+    
+    Args:
+        spec (Dict[str, Any]): An ENSEMBLE_MODELS entry, as from _ensemble_specs
+        
+    Returns:
+        str: Its "revision"; MODEL_REVISION for MODEL_NAME, which shares its snapshot
+    """
+    return spec.get('revision', MODEL_REVISION if spec['name'] == MODEL_NAME else "main")
+
+
+def _ensemble_specs() -> List[Dict[str, Any]]:
+    """
+    Normalize ENSEMBLE_MODELS entries to dicts.
+    
+    Returns:
+        List[Dict[str, Any]]: ENSEMBLE_MODELS with plain names expanded to {"name": name}
+    """
+    return [{'name': spec} if isinstance(spec, str) else spec for spec in ENSEMBLE_MODELS]
+
+
+def _load_ensemble() -> Ensemble:
+    """
+    Load every ENSEMBLE_MODELS member from its local snapshot into one Ensemble.
+    
+    Members whose labels are not 'Fake'/'Real' are renamed according to
+    their "ai_label" and "human_label", so every member is read the same way.
+    
+    Returns:
+        Ensemble: The members, in ENSEMBLE_MODELS order
+        
+    Raises:
+        ValueError: If a member's labels cannot be mapped to 'Fake'/'Real'
+    """
+    members = []
+    for spec in _ensemble_specs():
+        model, tokenizer = load_snapshot(_model_dir("snapshot", spec['name']), checksums=VERIFY_SNAPSHOT_CHECKSUMS,
+                                         share_weights=SHARE_MODEL_WEIGHTS)
+        renamed = {spec.get('ai_label'): 'Fake', spec.get('human_label'): 'Real'}
+        model.config.id2label = {index: renamed.get(label, label) for index, label in model.config.id2label.items()}
+        model.config.label2id = {label: index for index, label in model.config.id2label.items()}
+        label_indices(model.config)  # Fail now rather than on the first request
+        if INFERENCE_BACKEND == "direct":
+            classifier = DirectClassifier(model, tokenizer, device=DEVICE)
+        else:
+            classifier = pipeline(task=TASK, model=model, tokenizer=tokenizer, device=DEVICE)
+        members.append((spec['name'], spec.get('weight', 1.0), classifier))
+    return Ensemble(members, workers=ENSEMBLE_WORKERS)
+
+
+def _load_classifier(model_name: str):
+    """
+    Load a model for serving with the current backend and replica settings.
+    
+    load_model() calls it for MODEL_NAME and caches the result; the model
+    registry (see load_model_registry) calls it for models chosen at runtime.
+    ENSEMBLE_MODELS only replaces MODEL_NAME.
+    
+    Args:
+        model_name (str): Hugging Face model name or local checkpoint path
+        
+    Returns:
+        A DirectClassifier, pipeline, OnnxClassifier, Ensemble or ModelPool, as described in load_model
+    """
+    # Create cache directory if it doesn't exist
+    # This ensures the model has a persistent storage location
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    
+    # The configured directories belong to MODEL_NAME; other models get their own
+    if model_name == MODEL_NAME:
+        snapshot_dir, onnx_dir, quantized_dir = MODEL_SNAPSHOT_DIR, ONNX_MODEL_DIR, QUANTIZED_MODEL_DIR
+    else:
+        snapshot_dir, onnx_dir, quantized_dir = (_model_dir(kind, model_name)
+                                                 for kind in ("snapshot", "onnx", "int8"))
+    ensemble = bool(ENSEMBLE_MODELS) and model_name == MODEL_NAME
+    
+    # Download the pinned revision once into a self-contained snapshot;
+    # every later start loads it without contacting the Hugging Face Hub
+    if ensemble:
+        for spec in _ensemble_specs():
+            _prepare_snapshot(spec['name'], _model_dir("snapshot", spec['name']), _member_revision(spec))
+    else:
+        # MODEL_REVISION pins MODEL_NAME; other models are served at their default branch
+        _prepare_snapshot(model_name, snapshot_dir, MODEL_REVISION if model_name == MODEL_NAME else "main")
+    
+    if MODEL_REPLICAS > 1:
+        # Each replica process runs this function again with MODEL_REPLICAS = 1
+        threads = THREADS_PER_REPLICA or max(1, (os.cpu_count() or 1) // MODEL_REPLICAS)
+        if model_name == MODEL_NAME:
+            return ModelPool(MODEL_REPLICAS, threads, pin_cores=PIN_REPLICA_CORES, settings=_replica_settings())
+        settings = dict(_replica_settings(), ENSEMBLE_MODELS=[])
+        return ModelPool(MODEL_REPLICAS, threads, model_name=model_name, pin_cores=PIN_REPLICA_CORES,
+                         settings=settings)
+    
+    if ensemble:
+        return _load_ensemble()
+    
+    if INFERENCE_BACKEND == "onnx":
+        # Imported lazily: onnxruntime is only needed for this backend
+        from detector.onnx_backend import OnnxClassifier, export_onnx, is_exported
+        # Exported again whenever the snapshot moved to another revision
+        revision = read_manifest(snapshot_dir)['revision']
+        if not is_exported(onnx_dir, revision):
+            export_onnx(snapshot_dir, onnx_dir, source_revision=revision, local_files_only=True)
+        return OnnxClassifier(onnx_dir)
+    
+    if QUANTIZED_MODEL:
+        from detector.quantization import is_quantized, load_quantized, quantize_model
+        revision = read_manifest(snapshot_dir)['revision']
+        if not is_quantized(quantized_dir, revision):
+            quantize_model(snapshot_dir, quantized_dir, source_revision=revision, local_files_only=True)
+        model, tokenizer = load_quantized(quantized_dir)
+        if INFERENCE_BACKEND == "direct":
+            return DirectClassifier(model, tokenizer, device=-1)
+        return pipeline(task=TASK, model=model, tokenizer=tokenizer, device=-1)
+    
+    # Load model and tokenizer strictly from the local snapshot
+    model, tokenizer = load_snapshot(snapshot_dir, checksums=VERIFY_SNAPSHOT_CHECKSUMS,
+                                     share_weights=SHARE_MODEL_WEIGHTS)
+    if INFERENCE_BACKEND == "direct":
+        # Label columns are resolved once here instead of on every call
+        return DirectClassifier(model, tokenizer, device=DEVICE)
+    # The pipeline abstracts away tokenization and inference details
+    classifier = pipeline(
+        task=TASK,              # Type of task: text-classification
+        model=model,            # Pre-trained model from the pinned snapshot
+        tokenizer=tokenizer,
+        device=DEVICE           # CPU (-1) or GPU (0+) device
+    )
+    return classifier
 
 
 @st.cache_resource
+@metrics.timed("model_load")
 def load_model():
     """
     Load and cache the Hugging Face model pipeline for text classification.
@@ -50,35 +364,38 @@ def load_model():
     - Persists until app restart or cache clear
     - Memory-efficient for production deployment
     
+    With INFERENCE_BACKEND = "direct" (the default), the tokenizer and model
+    are called directly by a DirectClassifier instead of through a pipeline
+    (see detector.engine).
+    With INFERENCE_BACKEND = "onnx", the model is exported to ONNX_MODEL_DIR
+    on first use and served by ONNX Runtime instead (see detector.onnx_backend).
+    With QUANTIZED_MODEL = True, the dynamic INT8 variant in QUANTIZED_MODEL_DIR
+    is loaded instead of fp32 (see detector.quantization).
+    With MODEL_REPLICAS > 1, a ModelPool of that many replica processes is
+    returned, each pinned to its own cores (see detector.pool).
+    With ENSEMBLE_MODELS set, every member is loaded from its own snapshot
+    and an Ensemble is returned instead of MODEL_NAME (see detector.ensemble).
+    
     Returns:
         pipeline: Hugging Face pipeline object for text classification.
                  Returns a callable pipeline that accepts text and returns predictions.
+                 With the direct backend, a DirectClassifier with the same interface.
+                 With the ONNX backend, an OnnxClassifier with the same interface.
+                 With ENSEMBLE_MODELS, an Ensemble.
+                 With MODEL_REPLICAS > 1, a ModelPool.
         
     Raises:
         Exception: If model loading fails due to network issues, incompatible
                   dependencies, insufficient disk space, or invalid model name.
                   
     Note:
-        First run downloads ~500MB model. Subsequent runs use cached version.
-        Model files are stored in MODEL_CACHE_DIR to avoid re-downloading.
+        First run downloads ~500MB model at MODEL_REVISION into MODEL_SNAPSHOT_DIR
+        (config, tokenizer, safetensors weights and a checksum manifest).
+        Subsequent runs load only from that directory, with no network access,
+        and the safetensors weights are memory-mapped instead of copied.
     """
     try:
-        # Create cache directory if it doesn't exist
-        # This ensures the model has a persistent storage location
-        os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
-        
-        # Set the Hugging Face cache directory via environment variable
-        # This tells transformers library where to store downloaded models
-        os.environ['TRANSFORMERS_CACHE'] = MODEL_CACHE_DIR
-        
-        # Load model and tokenizer with local caching
-        # The pipeline abstracts away tokenization and inference details
-        classifier = pipeline(
-            task=TASK,           # Type of task: text-classification
-            model=MODEL_NAME,    # Pre-trained model from HuggingFace
-            device=DEVICE        # CPU (-1) or GPU (0+) device
-        )
-        return classifier
+        return _load_classifier(MODEL_NAME)
     except Exception as e:
         # Display user-friendly error message in the UI
         st.error(f"Failed to load model: {str(e)}")
@@ -90,258 +407,1871 @@ def load_model():
         raise
 
 
-def analyze_text(text: str, classifier) -> Dict[str, Any]:
+# Bumped when the fields stored per cache entry change
+_CACHE_ENTRY_VERSION = 2
+
+# Result fields recomputed from ai_probability on read rather than cached
+_DERIVED_RESULT_FIELDS = ('human_probability', 'classification', 'confidence_level')
+
+
+@st.cache_resource
+def load_result_cache() -> Optional[ResultCache]:
     """
-    Process text through the model and return structured results.
+    Create the shared score cache (memory LRU + SQLite file).
+    
+    Cached with @st.cache_resource so all sessions share one cache and its
+    hit-rate counters.
+    
+    Returns:
+        Optional[ResultCache]: The cache, or None when ENABLE_RESULT_CACHE is off
+    """
+    if not ENABLE_RESULT_CACHE:
+        return None
+    return ResultCache(
+        RESULT_CACHE_PATH,
+        memory_entries=RESULT_CACHE_MEMORY_ENTRIES,
+        max_rows=RESULT_CACHE_MAX_ROWS,
+        ttl_seconds=RESULT_CACHE_TTL_SECONDS
+    )
+
+
+@st.cache_resource
+def load_near_duplicate_index(model: str, revision: Optional[str], aggregation: str,
+                              windowed: bool) -> SimHashIndex:
+    """
+    Create the in-memory near-duplicate index for one model and set of scoring settings.
+    
+    Cached with @st.cache_resource (one index per model, revision and
+    aggregation/windowing combination, shared by all sessions), so a text is
+    only ever matched with texts scored by the same classifier. It covers
+    texts scored since the process started and maps their fingerprints to
+    their result cache keys.
     
     Args:
-        text (str): The input text to analyze
-        classifier: The Hugging Face pipeline object
+        model (str): Model name or path of the indexed scores (config.name_or_path,
+                     as in _cache_key; an Ensemble names all its members)
+        revision (Optional[str]): Model revision of the indexed scores
+        aggregation (str): Window aggregation method of the indexed scores
+        windowed (bool): Whether the indexed scores cover the full text
         
     Returns:
-        dict: A dictionary containing:
-            - ai_probability (float): Probability of AI-generated (0-100)
-            - human_probability (float): Probability of human-written (0-100)
-            - classification (str): "AI Generated", "Human Written", or "Mixed/Uncertain"
-            - confidence_level (str): "High", "Medium", or "Low"
-            
-    Raises:
-        Exception: If inference fails or output format is unexpected
+        SimHashIndex: The index
     """
-    try:
-        # Truncate text if it's too long for the model (max ~512 tokens ≈ 2000 chars)
-        # This prevents indexing errors with very long texts
-        MAX_MODEL_CHARS = 2000
-        if len(text) > MAX_MODEL_CHARS:
-            text = text[:MAX_MODEL_CHARS]
-            
-        # Run inference - returns list like [{'label': 'ChatGPT', 'score': 0.937}]
-        # Using top_k=None to get all label scores
-        results = classifier(text, top_k=None, truncation=True)
-        
-        # Extract probabilities
-        ai_prob = 0.0
-        human_prob = 0.0
-        
-        # results format: [[{'label': 'Real', 'score': 0.12}, {'label': 'Fake', 'score': 0.88}]]
-        # Note: openai-community/roberta-base-openai-detector uses 'Fake' for AI-generated, 'Real' for human
-        if isinstance(results, list) and len(results) > 0:
-            scores = results[0] if isinstance(results[0], list) else results
-            
-            for item in scores:
-                if isinstance(item, dict):
-                    label = item.get('label', '').strip()
-                    score = item.get('score', 0.0)
-                    
-                    # 'Fake' label means AI-generated
-                    if label == 'Fake':
-                        ai_prob = score * 100
-                    # 'Real' label means human-written (real text)
-                    elif label == 'Real':
-                        human_prob = score * 100
-        
-        # Ensure probabilities sum to 100%
-        if ai_prob == 0.0 and human_prob > 0.0:
-            ai_prob = 100 - human_prob
-        elif human_prob == 0.0 and ai_prob > 0.0:
-            human_prob = 100 - ai_prob
-        
-        # Determine classification based on threshold comparison
-        # Uses simple rule-based logic: if either probability exceeds threshold,
-        # classify accordingly; otherwise mark as uncertain/mixed
-        if ai_prob > (AI_THRESHOLD * 100):
-            classification = "AI Generated"
-        elif human_prob > (HUMAN_THRESHOLD * 100):
-            classification = "Human Written"
-        else:
-            # Neither probability exceeds threshold - model is uncertain
-            classification = "Mixed/Uncertain"
-        
-        # Determine confidence level based on maximum probability
-        # Higher max probability = more confident prediction
-        # This is independent of the classification result
-        max_prob = max(ai_prob, human_prob)
-        if max_prob > 85:
-            confidence_level = "High"      # Very confident (>85%)
-        elif max_prob >= 70:
-            confidence_level = "Medium"    # Moderately confident (70-85%)
-        else:
-            confidence_level = "Low"       # Low confidence (<70%)
+    return SimHashIndex(NEAR_DUPLICATE_MAX_DISTANCE, max_entries=NEAR_DUPLICATE_MAX_TEXTS)
+
+
+@st.cache_resource
+def load_cascade() -> Optional[HashedNgramModel]:
+    """
+    Load the cascade's pre-classifier.
+    
+    Returns:
+        Optional[HashedNgramModel]: The pre-classifier, or None when ENABLE_CASCADE is off
         
-        return {
-            'ai_probability': ai_prob,
-            'human_probability': human_prob,
-            'classification': classification,
-            'confidence_level': confidence_level
-        }
+    Raises:
+        FileNotFoundError: If ENABLE_CASCADE is on but no pre-classifier was trained
+    """
+    if not ENABLE_CASCADE:
+        return None
+    if not os.path.exists(CASCADE_MODEL_PATH):
+        raise FileNotFoundError(f"No cascade pre-classifier at {CASCADE_MODEL_PATH}. "
+                                f"Train one with: python -m detector train-cascade <texts file>")
+    return HashedNgramModel.load(CASCADE_MODEL_PATH)
+
+
+def _normalize_text(text: str) -> str:
+    """
+    Normalize text before scoring and cache lookup.
+    
+    Unicode is NFC-normalized, Windows line endings are unified and outer
+    whitespace is stripped, so trivially different copies of a text share
+    one score. Bump PREPROCESSING_VERSION whenever this changes.
+    
+    Args:
+        text (str): Raw input text
         
-    except Exception as e:
-        st.error(f"Error during text analysis: {str(e)}")
-        raise
+    Returns:
+        str: Normalized text
+    """
+    return unicodedata.normalize('NFC', text).replace('\r\n', '\n').strip()
 
 
-def main():
+def _cache_key(text: str, classifier, aggregation: str, windowed: bool) -> str:
     """
-    Main application function that sets up the Streamlit UI and handles user interactions.
+    Build the cache key for a normalized text under the current settings.
     
-    This function orchestrates the entire application flow:
-    1. Configure page settings (title, icon, layout)
-    2. Display header and model information
-    3. Load and cache the ML model
-    4. Create input interface for text entry
-    5. Handle analysis button click
-    6. Validate user input
-    7. Perform text analysis
-    8. Display results with visualizations
-    9. Provide interpretation guidance
+    The key covers the model (name and hub revision), preprocessing version
+    and window settings, so changing any of them invalidates old entries.
     
-    The function uses Streamlit's reactive programming model where the entire
-    script reruns on each user interaction. State is preserved using caching.
+    Args:
+        text (str): Normalized input text
+        classifier: The Hugging Face pipeline object
+        aggregation (str): Window aggregation method
+        windowed (bool): Whether the full text is scored
+        
+    Returns:
+        str: Cache key
+    """
+    config = classifier.model.config
+    return make_key(
+        config.name_or_path,
+        getattr(config, '_commit_hash', None),
+        PREPROCESSING_VERSION, _CACHE_ENTRY_VERSION,
+        windowed, WINDOW_TOKENS, WINDOW_OVERLAP, aggregation,
+        hashlib.sha256(text.encode('utf-8')).hexdigest()
+    )
+
+
+def _chunk_cache_key(chunk: str, classifier) -> str:
+    """
+    Build the cache key for the window scores of one paragraph chunk.
     
+    Unlike _cache_key it leaves out the aggregation method: raw window
+    scores are cached and aggregated per request.
+    
+    Args:
+        chunk (str): Paragraph text
+        classifier: The Hugging Face pipeline object
+        
     Returns:
-        None: This function manages the UI and doesn't return a value.
+        str: Cache key
     """
-    # Page configuration - must be the first Streamlit command
-    # Sets browser tab title, favicon, and page width
-    st.set_page_config(
-        page_title="AI Content Detector",  # Browser tab title
-        page_icon="🔍",                     # Browser tab icon
-        layout="centered"                   # Content width: centered or wide
+    config = classifier.model.config
+    return make_key(
+        'chunk',
+        config.name_or_path,
+        getattr(config, '_commit_hash', None),
+        PREPROCESSING_VERSION, _CACHE_ENTRY_VERSION,
+        WINDOW_TOKENS, WINDOW_OVERLAP,
+        hashlib.sha256(chunk.encode('utf-8')).hexdigest()
     )
+
+
+def _split_windows(token_ids: List[int], body_size: int, overlap: int) -> List[List[int]]:
+    """
+    Split a token id sequence into overlapping windows.
     
-    # Header Section
-    st.title("🔍 AI Content Detector")
-    st.markdown("""
-    This tool helps you detect whether text was generated by AI (ChatGPT) or written by a human.
-    Simply paste your text below and click **Analyze Text** to see the results.
-    """)
+    Args:
+        token_ids (List[int]): Token ids of the whole document (no special tokens)
+        body_size (int): Maximum number of content tokens per window
+        overlap (int): Number of tokens shared between consecutive windows
+        
+    Returns:
+        List[List[int]]: Windows covering every token at least once. A document
+                         shorter than body_size yields a single window.
+    """
+    if len(token_ids) <= body_size:
+        return [token_ids]
     
-    st.info(f"**Model**: {MODEL_NAME} (trained to detect AI-generated text)")
+    step = max(body_size - overlap, 1)
+    windows = []
+    for start in range(0, len(token_ids), step):
+        windows.append(token_ids[start:start + body_size])
+        if start + body_size >= len(token_ids):
+            break
+    return windows
+
+
+def _window_logits(windows: List[List[int]], classifier) -> np.ndarray:
+    """
+    Run all windows through the model in a single batched forward pass.
     
-    # Load model
-    try:
-        with st.spinner("Loading AI detection model..."):
-            classifier = load_model()
-    except Exception:
-        st.stop()
+    Args:
+        windows (List[List[int]]): Content token ids per window
+        classifier: A DirectClassifier, pipeline or OnnxClassifier (provides model and tokenizer)
+        
+    Returns:
+        np.ndarray: Raw logits, one row per window, in input order
+    """
+    # Add <s> ... </s> around each window, then pad only to the longest window
+    input_ids, attention_mask = build_batch(classifier.tokenizer, windows)
+    if isinstance(classifier, DirectClassifier):
+        return classifier.logits(input_ids, attention_mask)
     
-    # Input Section
-    st.markdown("---")
-    st.subheader("📝 Enter Text to Analyze")
-    
-    # Initialize session state for clear counter
-    if 'clear_counter' not in st.session_state:
-        st.session_state.clear_counter = 0
-    
-    # Text area with dynamic key that changes when cleared
-    text_input = st.text_area(
-        label="Paste your text here:",
-        height=200,
-        max_chars=MAX_CHAR_LIMIT,
-        placeholder="Paste the text you want to analyze here. The detector works best with at least a few sentences.",
-        help=f"Maximum {MAX_CHAR_LIMIT} characters. Best results with 50+ words.",
-        key=f"text_area_{st.session_state.clear_counter}"
-    )
+    model = classifier.model
+    with torch.inference_mode():
+        logits = model(input_ids=input_ids.to(model.device),
+                       attention_mask=attention_mask.to(model.device)).logits
+    return logits.float().cpu().numpy()
+
+
+def _score_windows(windows: List[List[int]], classifier) -> List[float]:
+    """
+    Score all windows in a single batched forward pass.
     
-    # Character count
-    char_count = len(text_input)
-    st.caption(f"Characters: {char_count}/{MAX_CHAR_LIMIT}")
-    
-    # Button row with Analyze and Clear buttons
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        analyze_button = st.button("🔍 Analyze Text", type="primary", use_container_width=True)
-    with col2:
-        clear_button = st.button("🗑️ Clear", use_container_width=True)
-    
-    # Handle clear button click - increment counter to force text_area recreation
-    if clear_button:
-        st.session_state.clear_counter += 1
-        st.rerun()
-    
-    # Analysis and Results
-    if analyze_button:
-        # Validation
-        if not text_input or text_input.strip() == "":
-            st.error("⚠️ Please enter some text to analyze.")
-        else:
-            # Warning for very long text
-            if char_count > MAX_CHAR_LIMIT:
-                st.warning(f"⚠️ Text exceeds {MAX_CHAR_LIMIT} characters. Results may take longer.")
-            
-            # Warning for very short text
-            word_count = len(text_input.split())
-            if word_count < 10:
-                st.warning("⚠️ Text is very short. Results may have limited confidence.")
-            
-            # Perform analysis
-            with st.spinner("🔄 Analyzing text..."):
-                try:
-                    results = analyze_text(text_input, classifier)
-                    
-                    # Results Section
-                    st.markdown("---")
-                    st.subheader("📊 Analysis Results")
-                    
-                    # Progress bar for AI probability
-                    st.markdown("**AI Detection Level:**")
-                    st.progress(results['ai_probability'] / 100)
-                    
-                    # Main result display
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric(
-                            label="AI Probability",
-                            value=f"{results['ai_probability']:.1f}%"
-                        )
-                    with col2:
-                        st.metric(
-                            label="Human Probability",
-                            value=f"{results['human_probability']:.1f}%"
-                        )
-                    
-                    # Classification result with color coding
-                    st.markdown("**Classification:**")
-                    classification = results['classification']
-                    
-                    if classification == "Human Written":
-                        st.success(f"✅ This text appears to be **{classification}**")
-                    elif classification == "AI Generated":
-                        st.error(f"🤖 This text appears to be **{classification}**")
-                    else:
-                        st.warning(f"❓ This text shows **{classification}** signals")
-                    
-                    # Confidence level
-                    confidence = results['confidence_level']
-                    st.markdown(f"**Confidence Level:** {confidence}")
-                    
-                    if confidence == "Low":
-                        st.warning("⚠️ Low confidence result. The text may be ambiguous or the model is uncertain. "
-                                 "Try with longer or more distinctive text for better results.")
-                    
-                    # Interpretation guidance
-                    with st.expander("ℹ️ How to interpret these results"):
-                        st.markdown("""
-                        **Understanding the Results:**
-                        - **AI Generated (>70% AI)**: The text likely written by ChatGPT or similar AI
-                        - **Human Written (>70% Human)**: The text likely written by a human
-                        - **Mixed/Uncertain**: The model cannot definitively classify the text
-                        
-                        **Confidence Levels:**
-                        - **High (>85%)**: Very confident in the classification
-                        - **Medium (70-85%)**: Reasonably confident, but some uncertainty
-                        - **Low (<70%)**: Uncertain classification, interpret with caution
-                        
-                        **Limitations:**
-                        - Best performance with English text
-                        - Trained specifically on ChatGPT-generated content
-                        - May not detect other AI models accurately
-                        - Very short texts may yield unreliable results
-                        """)
-                
-                except Exception as e:
-                    st.error(f"❌ An error occurred during analysis. Please try again.")
-                    st.exception(e)
+    Args:
+        windows (List[List[int]]): Content token ids per window
+        classifier: A DirectClassifier, pipeline or OnnxClassifier (provides model and tokenizer)
+        
+    Returns:
+        List[float]: AI probability (0-1) for each window, in input order
+    """
+    probabilities = softmax(_window_logits(windows, classifier))
+    if isinstance(classifier, DirectClassifier):
+        # Label columns were resolved at load
+        fake_index = classifier.fake_index
+    else:
+        fake_index = label_indices(classifier.model.config)['Fake']
+    return probabilities[:, fake_index].tolist()
+
+
+def _aggregate_window_scores(scores: List[float], lengths: List[int], method: str) -> float:
+    """
+    Combine per-window AI probabilities into one document-level probability.
+    
+    Args:
+        scores (List[float]): AI probability (0-1) of each window
+        lengths (List[int]): Number of content tokens in each window
+        method (str): "mean", "max" or "weighted" (mean weighted by window length)
+        
+    Returns:
+        float: Aggregated AI probability (0-1)
+        
+    Raises:
+        ValueError: If method is not a supported aggregation
+    """
+    if method == "mean":
+        return sum(scores) / len(scores)
+    if method == "max":
+        return max(scores)
+    if method == "weighted":
+        total = sum(lengths)
+        if total == 0:
+            return sum(scores) / len(scores)
+        return sum(score * length for score, length in zip(scores, lengths)) / total
+    raise ValueError(f"Unknown window aggregation: {method!r}")
+
+
+def _build_result(ai_prob: float, human_prob: float) -> Dict[str, Any]:
+    """
+    Turn AI/Human percentages into the result dictionary shown in the UI.
+    
+    Args:
+        ai_prob (float): Probability of AI-generated (0-100)
+        human_prob (float): Probability of human-written (0-100)
+        
+    Returns:
+        dict: ai_probability, human_probability, classification and confidence_level
+    """
+    # Determine classification based on threshold comparison
+    # Uses simple rule-based logic: if either probability exceeds threshold,
+    # classify accordingly; otherwise mark as uncertain/mixed
+    if ai_prob > (AI_THRESHOLD * 100):
+        classification = "AI Generated"
+    elif human_prob > (HUMAN_THRESHOLD * 100):
+        classification = "Human Written"
+    else:
+        # Neither probability exceeds threshold - model is uncertain
+        classification = "Mixed/Uncertain"
+    
+    # Determine confidence level based on maximum probability
+    # Higher max probability = more confident prediction
+    # This is independent of the classification result
+    max_prob = max(ai_prob, human_prob)
+    if max_prob > (HIGH_CONFIDENCE * 100):
+        confidence_level = "High"      # Very confident (>85%)
+    elif max_prob >= (MEDIUM_CONFIDENCE * 100):
+        confidence_level = "Medium"    # Moderately confident (70-85%)
+    else:
+        confidence_level = "Low"       # Low confidence (<70%)
+    
+    return {
+        'ai_probability': ai_prob,
+        'human_probability': human_prob,
+        'classification': classification,
+        'confidence_level': confidence_level
+    }
+
+
+def _score_bucketed(windows: List[List[int]], classifier, batch_size: Optional[int],
+                    scorer=_score_windows) -> List[Any]:
+    """
+    Score windows in batches of similar length.
+    
+    Args:
+        windows (List[List[int]]): Content token ids per window
+        classifier: The Hugging Face pipeline object (provides model and tokenizer)
+        batch_size (Optional[int]): Windows per forward pass; None for a single pass
+        scorer: Scores one batch of windows (_score_windows, or _window_logits for raw logits)
+        
+    Returns:
+        List[Any]: What scorer returned for each window (by default its AI
+                   probability, 0-1), in input order
+    """
+    # Shortest windows first, so every bucket holds windows of similar length
+    order = sorted(range(len(windows)), key=lambda index: len(windows[index]))
+    step = batch_size or len(order)
+    window_scores = [0.0] * len(windows)
+    for start in range(0, len(order), step):
+        bucket = order[start:start + step]
+        with metrics.timed("forward"):
+            bucket_scores = scorer([windows[i] for i in bucket], classifier)
+        for index, score in zip(bucket, bucket_scores):
+            window_scores[index] = score
+    metrics.TOKENS.inc(sum(len(window) for window in windows))
+    return window_scores
+
+
+def _encode_windows(texts: List[str], tokenizer,
+                    windowed: bool) -> Tuple[List[List[int]], List[int], List[List[int]], Any, int]:
+    """
+    Tokenize texts in one call and split them into windows.
+    
+    Args:
+        texts (List[str]): The input texts
+        tokenizer: The tokenizer to use
+        windowed (bool): Split the full text rather than keep only the first window
+        
+    Returns:
+        Tuple: windows of every text in text order, the text index of each
+               window, token ids per text, character offsets per token (None
+               with a slow tokenizer) and the content tokens per window
+    """
+    # Offsets map tokens back to characters, so truncation is reported exactly.
+    # verbose=False: texts longer than 512 tokens are expected here (they get windowed).
+    with metrics.timed("tokenize"):
+        encodings = tokenizer(list(texts), add_special_tokens=False, return_attention_mask=False,
+                              return_offsets_mapping=tokenizer.is_fast, verbose=False)
+    token_ids = encodings['input_ids']
+    offsets = encodings['offset_mapping'] if tokenizer.is_fast else None
+    body_size = WINDOW_TOKENS - tokenizer.num_special_tokens_to_add(pair=False)
+    
+    # Flatten the windows of every text, remembering which text each came from
+    windows = []
+    owners = []
+    for text_index, ids in enumerate(token_ids):
+        text_windows = _split_windows(ids, body_size, WINDOW_OVERLAP) if windowed else [ids[:body_size]]
+        windows.extend(text_windows)
+        owners.extend([text_index] * len(text_windows))
+    return windows, owners, token_ids, offsets, body_size
+
+
+def _group_window_scores(count: int, windows: List[List[int]], owners: List[int],
+                         window_scores: List[float]) -> Tuple[List[List[float]], List[List[int]]]:
+    """
+    Regroup flattened window scores per text.
+    
+    Args:
+        count (int): Number of texts
+        windows (List[List[int]]): Content token ids per window
+        owners (List[int]): Text index of each window
+        window_scores (List[float]): AI probability (0-1) of each window
+        
+    Returns:
+        Tuple: Window scores per text and window lengths (content tokens) per text
+    """
+    scores_per_text = [[] for _ in range(count)]
+    lengths_per_text = [[] for _ in range(count)]
+    for index, text_index in enumerate(owners):
+        scores_per_text[text_index].append(window_scores[index])
+        lengths_per_text[text_index].append(len(windows[index]))
+    return scores_per_text, lengths_per_text
+
+
+def _score_members(ensemble: Ensemble, encode, batch_size: Optional[int]) -> List[Tuple[tuple, List[float], float]]:
+    """
+    Encode once per distinct tokenizer, then score every member's windows concurrently.
+    
+    Args:
+        ensemble (Ensemble): The members
+        encode: Called with each distinct tokenizer; returns a tuple whose
+                first item is the windows to score
+        batch_size (Optional[int]): Windows per forward pass; None for a single pass
+        
+    Returns:
+        List[Tuple[tuple, List[float], float]]: Per member, in member order: what
+            encode returned for its tokenizer, its window scores and its
+            scoring time in seconds
+    """
+    encoded = {}
+    for group in ensemble.tokenizer_groups():
+        group_encoding = encode(group[0].classifier.tokenizer)
+        for member in group:
+            encoded[member.name] = group_encoding
+    
+    outputs = ensemble.map(lambda member: _score_bucketed(encoded[member.name][0], member.classifier, batch_size))
+    for member, (_, seconds) in zip(ensemble.members, outputs):
+        metrics.ENSEMBLE_MEMBER_SECONDS.observe(seconds, member=member.name)
+    return [(encoded[member.name], scores, seconds) for member, (scores, seconds) in zip(ensemble.members, outputs)]
+
+
+def _analyze_batch(texts: List[str], classifier, aggregation: str,
+                   batch_size: Optional[int], windowed: bool) -> List[Dict[str, Any]]:
+    """
+    Score several texts with length-bucketed batched forward passes.
+    
+    All texts are tokenized exactly once, in one call, and split into windows
+    (or cut to a single window when windowed is False). Windows from every text are then
+    sorted by token length and grouped into batches, so each batch is padded
+    only to its own longest window instead of to 512 tokens. Window scores are
+    mapped back to their text and aggregated, preserving the input order.
+    
+    With an Ensemble, texts are tokenized once per distinct tokenizer and the
+    members score concurrently. Each member's document probabilities are
+    combined with the member weights, and token counts are those of the first
+    member's tokenizer.
+    
+    Args:
+        texts (List[str]): The input texts to analyze
+        classifier: The Hugging Face pipeline object or an Ensemble
+        aggregation (str): "mean", "max" or "weighted"
+        batch_size (Optional[int]): Windows per forward pass; None scores all
+                                    windows in a single pass
+        windowed (bool): Score the full text rather than only the first window
+        
+    Returns:
+        List[Dict[str, Any]]: One result per text (same keys as analyze_text,
+                              plus members with an Ensemble), in the order of texts
+    """
+    if not texts:
+        return []
+    
+    ensemble = classifier if isinstance(classifier, Ensemble) else None
+    if ensemble is not None:
+        scored = _score_members(ensemble, lambda tokenizer: _encode_windows(texts, tokenizer, windowed), batch_size)
+    else:
+        encoding = _encode_windows(texts, classifier.tokenizer, windowed)
+        scored = [(encoding, _score_bucketed(encoding[0], classifier, batch_size), None)]
+    
+    postprocess_start = time.perf_counter()
+    # Document probability (0-1) of every text under each member
+    member_probs = []
+    for (windows, owners, *_), window_scores, _ in scored:
+        scores_per_text, lengths_per_text = _group_window_scores(len(texts), windows, owners, window_scores)
+        member_probs.append([_aggregate_window_scores(scores, lengths, aggregation)
+                             for scores, lengths in zip(scores_per_text, lengths_per_text)])
+    
+    windows, owners, token_ids, offsets, body_size = scored[0][0]
+    window_counts = [0] * len(texts)
+    for text_index in owners:
+        window_counts[text_index] += 1
+    results = []
+    for text_index in range(len(texts)):
+        if ensemble is not None:
+            ai_prob = ensemble.combine([probs[text_index] for probs in member_probs]) * 100
+        else:
+            ai_prob = member_probs[0][text_index] * 100
+        result = _build_result(ai_prob, 100 - ai_prob)
+        
+        tokens_total = len(token_ids[text_index])
+        tokens_scored = tokens_total if windowed else min(tokens_total, body_size)
+        if tokens_scored == tokens_total:
+            chars_scored = len(texts[text_index])
+        elif offsets is not None:
+            chars_scored = offsets[text_index][tokens_scored - 1][1]
+        else:
+            chars_scored = None
+        
+        result['window_count'] = window_counts[text_index]
+        result['tokens_scored'] = tokens_scored
+        result['tokens_total'] = tokens_total
+        result['chars_scored'] = chars_scored
+        if ensemble is not None:
+            # Latency is the member's time for the whole batch
+            result['members'] = [{'name': member.name, 'weight': member.weight,
+                                  'ai_probability': probs[text_index] * 100, 'latency_ms': seconds * 1000}
+                                 for member, probs, (_, _, seconds) in zip(ensemble.members, member_probs, scored)]
+        results.append(result)
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - postprocess_start, stage="postprocess")
+    return results
+
+
+def _text_logits(texts: List[str], classifier, batch_size: Optional[int],
+                 windowed: bool) -> Tuple[List[np.ndarray], List[List[int]]]:
+    """
+    Raw window logits of several texts, for the logit store.
+    
+    Texts are tokenized, windowed and batched exactly as in _analyze_batch.
+    
+    Args:
+        texts (List[str]): The input texts
+        classifier: The Hugging Face pipeline object (not an Ensemble)
+        batch_size (Optional[int]): Windows per forward pass; None for a single pass
+        windowed (bool): Score the full text rather than only the first window
+        
+    Returns:
+        Tuple: Logits of each text's windows (windows x labels) and the
+               content tokens of each window, in the order of texts
+    """
+    if not texts:
+        return [], []
+    windows, owners, *_ = _encode_windows(texts, classifier.tokenizer, windowed)
+    window_logits = _score_bucketed(windows, classifier, batch_size, scorer=_window_logits)
+    logits_per_text, lengths_per_text = _group_window_scores(len(texts), windows, owners, window_logits)
+    return [np.stack(rows) for rows in logits_per_text], lengths_per_text
+
+
+# A sentence runs to ., ! or ? (plus closing quotes/brackets) followed by
+# whitespace, or to the end of its line
+_SENTENCE_PATTERN = re.compile(r'\S.*?(?:[.!?]+["\'\u2019\u201d)\]]*(?=\s|$)|(?=\n)|$)')
+
+
+def _split_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Split text into sentences.
+    
+    Args:
+        text (str): Normalized input text
+        
+    Returns:
+        List[Tuple[int, int]]: (start, end) character offsets of each sentence,
+                               without surrounding whitespace
+    """
+    return [match.span() for match in _SENTENCE_PATTERN.finditer(text)]
+
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def _split_paragraphs(text: str) -> List[str]:
+    """
+    Split text into paragraphs at blank lines.
+    
+    Boundaries depend only on the text around them, so editing one paragraph
+    leaves every other paragraph (and its cache key) unchanged.
+    
+    Args:
+        text (str): Normalized input text
+        
+    Returns:
+        List[str]: Non-empty paragraphs, stripped, in order
+    """
+    return [paragraph.strip() for paragraph in _PARAGRAPH_BREAK.split(text) if paragraph.strip()]
+
+
+def _score_sentences(text: str, classifier, context: int) -> List[Dict[str, Any]]:
+    """
+    Score every sentence of a text in a single batched forward pass.
+    
+    The text is tokenized once, as consecutive chunks that each end with a
+    sentence and start with the whitespace before it, so every sentence gets
+    the same tokens it has in the full text. Each window holds one sentence
+    plus up to context neighbouring sentences on each side, trimmed to
+    WINDOW_TOKENS around the sentence.
+    
+    Sentence spans do not depend on the tokenizer, so with an Ensemble each
+    member scores the same sentences and their scores are combined.
+    
+    Args:
+        text (str): Normalized input text
+        classifier: The Hugging Face pipeline object or an Ensemble
+        context (int): Neighbouring sentences on each side included in each window
+        
+    Returns:
+        List[Dict[str, Any]]: Per sentence, in order: start and end (character
+                              offsets into text), text and ai_probability (0-100)
+    """
+    spans = _split_sentences(text)
+    if not spans:
+        return []
+    
+    if isinstance(classifier, Ensemble):
+        scored = _score_members(classifier, lambda tokenizer: (_sentence_windows(text, spans, tokenizer, context),),
+                                batch_size=None)
+        scores = [classifier.combine(member_scores) for member_scores in zip(*(scores for _, scores, _ in scored))]
+    else:
+        scores = _score_bucketed(_sentence_windows(text, spans, classifier.tokenizer, context), classifier,
+                                 batch_size=None)
+    return [{'start': start, 'end': end, 'text': text[start:end], 'ai_probability': score * 100}
+            for (start, end), score in zip(spans, scores)]
+
+
+def _sentence_windows(text: str, spans: List[Tuple[int, int]], tokenizer, context: int) -> List[List[int]]:
+    """
+    Build one window per sentence for _score_sentences.
+    
+    Args:
+        text (str): Normalized input text
+        spans (List[Tuple[int, int]]): Sentence offsets from _split_sentences
+        tokenizer: The tokenizer to use
+        context (int): Neighbouring sentences on each side included in each window
+        
+    Returns:
+        List[List[int]]: Content token ids of each sentence's window
+    """
+    chunk_starts = [0] + [end for _, end in spans[:-1]]
+    with metrics.timed("tokenize"):
+        chunk_ids = tokenizer([text[chunk_start:end] for chunk_start, (_, end) in zip(chunk_starts, spans)],
+                              add_special_tokens=False, truncation=False)['input_ids']
+    body_size = WINDOW_TOKENS - tokenizer.num_special_tokens_to_add(pair=False)
+    
+    windows = []
+    for index, ids in enumerate(chunk_ids):
+        sentence = ids[:body_size]
+        before = [token for chunk in chunk_ids[max(0, index - context):index] for token in chunk]
+        after = [token for chunk in chunk_ids[index + 1:index + 1 + context] for token in chunk]
+        # Split the remaining room between both sides, giving unused room to the other side
+        room = body_size - len(sentence)
+        after = after[:max(room // 2, room - len(before))]
+        before = before[len(before) - min(len(before), room - len(after)):]
+        windows.append(before + sentence + after)
+    return windows
+
+
+def _score_chunks(chunks: List[str], classifier, batch_size: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    Score the windows of several paragraph chunks, without aggregating them.
+    
+    Args:
+        chunks (List[str]): Paragraph texts
+        classifier: The Hugging Face pipeline object or an Ensemble
+        batch_size (Optional[int]): Windows per forward pass; None for a single pass
+        
+    Returns:
+        List[Dict[str, Any]]: Per chunk: scores (AI probability 0-1 of each
+                              window), lengths (content tokens of each window)
+                              and tokens (tokens in the chunk). With an Ensemble,
+                              members (per member: name, weight, scores, lengths
+                              and latency_ms for the whole call) replaces scores
+                              and lengths.
+    """
+    if not chunks:
+        return []
+    
+    ensemble = classifier if isinstance(classifier, Ensemble) else None
+    if ensemble is not None:
+        scored = _score_members(ensemble, lambda tokenizer: _encode_windows(chunks, tokenizer, windowed=True),
+                                batch_size)
+    else:
+        encoding = _encode_windows(chunks, classifier.tokenizer, windowed=True)
+        scored = [(encoding, _score_bucketed(encoding[0], classifier, batch_size), None)]
+    
+    grouped = [_group_window_scores(len(chunks), windows, owners, window_scores)
+               for (windows, owners, *_), window_scores, _ in scored]
+    token_ids = scored[0][0][2]
+    if ensemble is None:
+        scores_per_chunk, lengths_per_chunk = grouped[0]
+        return [{'scores': scores, 'lengths': lengths, 'tokens': len(ids)}
+                for scores, lengths, ids in zip(scores_per_chunk, lengths_per_chunk, token_ids)]
+    return [{'members': [{'name': member.name, 'weight': member.weight,
+                          'scores': scores_per_chunk[index], 'lengths': lengths_per_chunk[index],
+                          'latency_ms': seconds * 1000}
+                         for member, (scores_per_chunk, lengths_per_chunk), (_, _, seconds)
+                         in zip(ensemble.members, grouped, scored)],
+             'tokens': len(ids)}
+            for index, ids in enumerate(token_ids)]
+
+
+def _aggregate_chunks(chunk_entries: List[Dict[str, Any]],
+                      aggregation: str) -> Tuple[float, int, Optional[List[Dict[str, Any]]]]:
+    """
+    Aggregate the window scores of a document's chunks (see _score_chunks).
+    
+    Args:
+        chunk_entries (List[Dict[str, Any]]): Entries of every chunk, in order
+        aggregation (str): "mean", "max" or "weighted"
+        
+    Returns:
+        Tuple: AI probability (0-1) of the document, its window count, and for
+               an ensemble the name, weight and ai_probability (0-100) of each
+               member (None otherwise)
+    """
+    if 'members' not in chunk_entries[0]:
+        scores = [score for entry in chunk_entries for score in entry['scores']]
+        lengths = [length for entry in chunk_entries for length in entry['lengths']]
+        return _aggregate_window_scores(scores, lengths, aggregation), len(scores), None
+    
+    # Each member aggregates its own windows; the document probabilities are then weighted
+    members = []
+    for index, member in enumerate(chunk_entries[0]['members']):
+        scores = [score for entry in chunk_entries for score in entry['members'][index]['scores']]
+        lengths = [length for entry in chunk_entries for length in entry['members'][index]['lengths']]
+        members.append({'name': member['name'], 'weight': member['weight'],
+                        'ai_probability': _aggregate_window_scores(scores, lengths, aggregation) * 100})
+    ai_prob = (sum(member['weight'] * member['ai_probability'] for member in members)
+               / sum(member['weight'] for member in members) / 100)
+    window_count = sum(len(entry['members'][0]['scores']) for entry in chunk_entries)
+    return ai_prob, window_count, members
+
+
+def _apply_cascade(texts: List[str],
+                   cascade: Optional[HashedNgramModel]) -> Tuple[Dict[int, Dict[str, Any]], List[int]]:
+    """
+    Let the pre-classifier answer the texts it is confident about.
+    
+    Args:
+        texts (List[str]): Normalized texts
+        cascade (Optional[HashedNgramModel]): Pre-classifier; None escalates everything
+        
+    Returns:
+        Tuple: Results by text index for the answered texts (same keys as
+               analyze_text, no tokens scored, scored_by "cascade"), and the
+               indices of the texts that need the transformer
+    """
+    if cascade is None or not texts:
+        return {}, list(range(len(texts)))
+    
+    with metrics.timed("cascade"):
+        probabilities = cascade.predict_proba(texts)
+    escalated = escalate(probabilities, AI_THRESHOLD, HUMAN_THRESHOLD, CASCADE_MARGIN)
+    answered = {}
+    for index in np.flatnonzero(~escalated).tolist():
+        ai_prob = float(probabilities[index]) * 100
+        result = _build_result(ai_prob, 100 - ai_prob)
+        result.update({'window_count': 0, 'tokens_scored': 0, 'tokens_total': 0,
+                       'chars_scored': 0, 'scored_by': 'cascade'})
+        answered[index] = result
+    metrics.CASCADE_TEXTS.inc(len(answered), stage="pre_classifier")
+    metrics.CASCADE_TEXTS.inc(len(texts) - len(answered), stage="transformer")
+    return answered, np.flatnonzero(escalated).tolist()
+
+
+def _score_texts(texts: List[str], classifier, aggregation: str,
+                 batch_size: Optional[int], windowed: bool) -> List[Dict[str, Any]]:
+    """
+    Score texts with the cascade's pre-classifier, if enabled, and the rest with the transformer.
+    
+    Args:
+        texts (List[str]): Normalized texts to score
+        classifier: The Hugging Face pipeline object, OnnxClassifier or ModelPool
+        aggregation (str): "mean", "max" or "weighted"
+        batch_size (Optional[int]): Windows per forward pass; None for a single pass
+        windowed (bool): Score the full text rather than only the first window
+        
+    Returns:
+        List[Dict[str, Any]]: One result per text, in the order of texts
+    """
+    answered, escalated = _apply_cascade(texts, load_cascade())
+    if not answered:
+        return _dispatch(_analyze_batch, classifier, texts, aggregation=aggregation,
+                         batch_size=batch_size, windowed=windowed)
+    
+    results = [answered.get(index) for index in range(len(texts))]
+    if escalated:
+        scored = _dispatch(_analyze_batch, classifier, [texts[index] for index in escalated],
+                           aggregation=aggregation, batch_size=batch_size, windowed=windowed)
+        for index, result in zip(escalated, scored):
+            results[index] = result
+    return results
+
+
+def _dispatch(function, classifier, *args: Any, **kwargs: Any) -> Any:
+    """
+    Call function(*args, classifier=classifier, **kwargs) here, or on an idle
+    replica when classifier is a ModelPool.
+    
+    Args:
+        function: A module-level function of this file taking a classifier keyword
+        classifier: The Hugging Face pipeline object, OnnxClassifier or ModelPool
+        *args: Positional arguments for function
+        **kwargs: Keyword arguments for function
+        
+    Returns:
+        Any: What function returned
+    """
+    if isinstance(classifier, ModelPool):
+        return classifier.run(function.__name__, *args, **kwargs)
+    return function(*args, classifier=classifier, **kwargs)
+
+
+def _analyze_cached(texts: List[str], classifier, aggregation: str,
+                    batch_size: Optional[int], windowed: bool) -> List[Dict[str, Any]]:
+    """
+    Like _analyze_batch, but reuse cached scores and only run the model on misses.
+    
+    Texts are normalized first. Duplicate texts within one call are scored
+    once. Only the raw probability and token counts are cached; classification
+    and confidence are rebuilt on read, so threshold changes apply immediately.
+    
+    Args:
+        texts (List[str]): The input texts to analyze
+        classifier: The Hugging Face pipeline object
+        aggregation (str): "mean", "max" or "weighted"
+        batch_size (Optional[int]): Windows per forward pass; None for a single pass
+        windowed (bool): Score the full text rather than only the first window
+        
+    Returns:
+        List[Dict[str, Any]]: One result per text, in the order of texts
+    """
+    start = time.perf_counter()
+    texts = [_normalize_text(text) for text in texts]
+    cache = load_result_cache()
+    if cache is None:
+        results = _score_texts(texts, classifier, aggregation, batch_size, windowed)
+        _record_metrics(texts, results, start)
+        return results
+    
+    with metrics.timed("cache_lookup"):
+        keys = [_cache_key(text, classifier, aggregation, windowed) for text in texts]
+        entries = cache.get_many(keys)
+    metrics.CACHE_LOOKUPS.inc(len(entries), result="hit")
+    metrics.CACHE_LOOKUPS.inc(len(keys) - len(entries), result="miss")
+    
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in entries:
+            missing.setdefault(key, text)
+    
+    near_duplicates = {}
+    fingerprints = {}
+    if missing and NEAR_DUPLICATE_MODE != "off":
+        config = classifier.model.config
+        index = load_near_duplicate_index(config.name_or_path, getattr(config, '_commit_hash', None),
+                                          aggregation, windowed)
+        near_duplicates, fingerprints = _find_near_duplicates(missing, index, cache)
+        if NEAR_DUPLICATE_MODE == "reuse":
+            for key, match in near_duplicates.items():
+                entries[key] = match['entry']
+                del missing[key]
+    
+    if missing:
+        scored = _score_texts(list(missing.values()), classifier, aggregation, batch_size, windowed)
+        new_entries = {
+            key: {name: value for name, value in result.items() if name not in _DERIVED_RESULT_FIELDS}
+            for key, result in zip(missing, scored)
+        }
+        # Pre-classifier answers are cheap to recompute and must not outlive ENABLE_CASCADE
+        model_entries = {key: entry for key, entry in new_entries.items() if entry.get('scored_by') != 'cascade'}
+        with metrics.timed("cache_store"):
+            cache.put_many(model_entries)
+        entries.update(new_entries)
+        # Flagged texts are indexed too: they may be the closest match for a later copy
+        for key in model_entries:
+            if key in fingerprints:
+                index.add(fingerprints[key], key)
+    
+    results = []
+    for key in keys:
+        result = _result_from_entry(entries[key])
+        if key in near_duplicates:
+            result['near_duplicate'] = {'similarity': near_duplicates[key]['similarity'],
+                                        'ai_probability': near_duplicates[key]['entry']['ai_probability'],
+                                        'reused': NEAR_DUPLICATE_MODE == "reuse"}
+        results.append(result)
+    _record_metrics(texts, results, start)
+    return results
+
+
+def _result_from_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rebuild an analysis result from a cached entry.
+    
+    Args:
+        entry (Dict[str, Any]): A cached score (fields of _DERIVED_RESULT_FIELDS left out)
+        
+    Returns:
+        Dict[str, Any]: The full result, classified under the current thresholds
+    """
+    result = _build_result(entry['ai_probability'], 100 - entry['ai_probability'])
+    result.update({name: value for name, value in entry.items() if name != 'ai_probability'})
+    return result
+
+
+def _find_near_duplicates(missing: Dict[str, str], index: SimHashIndex,
+                          cache: ResultCache) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+    """
+    Look up cache misses in the near-duplicate index.
+    
+    Args:
+        missing (Dict[str, str]): Normalized texts by cache key, not found in the cache
+        index (SimHashIndex): Index of earlier texts' fingerprints
+        cache (ResultCache): Cache holding the earlier texts' entries
+        
+    Returns:
+        Tuple: Matches by cache key (entry: the earlier text's cache entry,
+               similarity: fingerprint similarity 0-1), and the fingerprint
+               of every missing text
+    """
+    with metrics.timed("near_duplicate_lookup"):
+        fingerprints = {key: fingerprint(text) for key, text in missing.items()}
+        matches = {key: index.query(value) for key, value in fingerprints.items()}
+        matches = {key: match for key, match in matches.items() if match is not None}
+        earlier = cache.get_many({earlier_key for earlier_key, _ in matches.values()}) if matches else {}
+    
+    # Earlier entries may have been evicted from the cache since they were indexed
+    near_duplicates = {key: {'entry': earlier[earlier_key], 'similarity': similarity(distance)}
+                       for key, (earlier_key, distance) in matches.items() if earlier_key in earlier}
+    metrics.NEAR_DUPLICATES.inc(len(near_duplicates))
+    return near_duplicates, fingerprints
+
+
+def _record_metrics(texts: List[str], results: List[Dict[str, Any]], start: float) -> None:
+    """
+    Count texts, characters and outcomes of one analysis call and record its latency.
+    
+    Args:
+        texts (List[str]): The normalized texts that were analyzed
+        results (List[Dict[str, Any]]): Their results
+        start (float): time.perf_counter() when the call began
+    """
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="analyze")
+    metrics.TEXTS.inc(len(texts))
+    metrics.CHARS.inc(sum(len(text) for text in texts))
+    for result in results:
+        metrics.CLASSIFICATIONS.inc(classification=result['classification'])
+    if METRICS_FILE:
+        metrics.export_textfile(METRICS_FILE, METRICS_FILE_INTERVAL_SECONDS)
+
+
+def analyze_text(text: str, classifier, aggregation: str = WINDOW_AGGREGATION) -> Dict[str, Any]:
+    """
+    Process text through the model and return structured results.
+    
+    When ENABLE_WINDOWING is set, long texts are scored in full using
+    overlapping windows, all in one batched forward pass (see _analyze_batch);
+    otherwise the text is cut to the first WINDOW_TOKENS tokens. Either way
+    the text is tokenized once and the result reports exactly how much of it
+    was scored.
+    
+    Args:
+        text (str): The input text to analyze
+        classifier: The Hugging Face pipeline object
+        aggregation (str): How window scores are combined when windowing:
+                           "mean", "max" or "weighted". Defaults to WINDOW_AGGREGATION.
+        
+    Returns:
+        dict: A dictionary containing:
+            - ai_probability (float): Probability of AI-generated (0-100)
+            - human_probability (float): Probability of human-written (0-100)
+            - classification (str): "AI Generated", "Human Written", or "Mixed/Uncertain"
+            - confidence_level (str): "High", "Medium", or "Low"
+            - window_count (int): Number of windows scored
+            - tokens_scored (int): Tokens that went through the model
+            - tokens_total (int): Tokens in the (normalized) text
+            - chars_scored (Optional[int]): Characters of the normalized text covered
+                                            by the scored tokens (None with a slow tokenizer)
+            
+    Raises:
+        Exception: If inference fails or output format is unexpected
+    """
+    try:
+        return _analyze_cached([text], classifier, aggregation, batch_size=None,
+                               windowed=ENABLE_WINDOWING)[0]
+    except Exception as e:
+        st.error(f"Error during text analysis: {str(e)}")
+        raise
+
+
+def analyze_sentences(text: str, classifier, context: int = SENTENCE_CONTEXT) -> List[Dict[str, Any]]:
+    """
+    Score each sentence of a text on its own, for the sentence heatmap.
+    
+    All sentences go through the model in one batched forward pass, which
+    costs far less than one classifier() call per sentence.
+    
+    Args:
+        text (str): The input text to analyze
+        classifier: The Hugging Face pipeline object
+        context (int): Neighbouring sentences on each side scored along with
+                       each sentence. Defaults to SENTENCE_CONTEXT.
+        
+    Returns:
+        List[Dict[str, Any]]: Per sentence, in order: start and end (character
+                              offsets into the normalized text), text and
+                              ai_probability (0-100)
+        
+    Raises:
+        Exception: If inference fails
+    """
+    try:
+        with metrics.timed("sentences"):
+            return _dispatch(_score_sentences, classifier, _normalize_text(text), context=context)
+    except Exception as e:
+        st.error(f"Error during sentence analysis: {str(e)}")
+        raise
+
+
+def analyze_text_incremental(text: str, classifier, aggregation: str = WINDOW_AGGREGATION,
+                             batch_size: Optional[int] = BATCH_SIZE,
+                             scheduler: Optional[ThreadMicroBatcher] = None) -> Dict[str, Any]:
+    """
+    Analyze a text, re-running the model only on paragraphs not seen before.
+    
+    The text is split into paragraphs at blank lines. Each paragraph's window
+    scores are cached under a hash of the paragraph, in the shared result
+    cache, so after an edit only the changed paragraphs go through the model.
+    The window scores of all paragraphs are then aggregated into the document
+    result. Windows never span a paragraph break, so the score can differ
+    slightly from analyze_text's. Without the result cache (ENABLE_RESULT_CACHE
+    off) every paragraph is re-scored. With ENABLE_CASCADE, a clear-cut text
+    is answered by the pre-classifier before any paragraph is scored.
+    
+    When paragraphs changed, the whole text is also looked up in the
+    near-duplicate index (see NEAR_DUPLICATE_MODE), which covers texts scored
+    by analyze_text as well, and indexed for later lookups. Changed
+    paragraphs go through scheduler when one is given, so they are batched
+    with other sessions' requests.
+    
+    Args:
+        text (str): The input text to analyze
+        classifier: The Hugging Face pipeline object
+        aggregation (str): "mean", "max" or "weighted". Defaults to WINDOW_AGGREGATION.
+        batch_size (Optional[int]): Windows per forward pass. Defaults to BATCH_SIZE
+                                    (the scheduler always uses BATCH_SIZE).
+        scheduler (Optional[ThreadMicroBatcher]): Shared scheduler of classifier
+                                                  (see load_scheduler); None scores here
+        
+    Returns:
+        dict: The keys of analyze_text (token counts cover the paragraphs), plus:
+            - paragraph_count (int): Paragraphs in the text
+            - paragraphs_reinferred (int): Paragraphs that went through the model
+            - tokens_reinferred (int): Tokens that went through the model
+            - reinferred_fraction (float): tokens_reinferred / tokens_total (0-1)
+        
+    Raises:
+        Exception: If inference fails
+    """
+    try:
+        start = time.perf_counter()
+        text = _normalize_text(text)
+        paragraphs = _split_paragraphs(text)
+        if not paragraphs:
+            return _analyze_cached([text], classifier, aggregation, batch_size, windowed=True)[0]
+        
+        # A clear-cut text needs no paragraph scores at all
+        answered, _ = _apply_cascade([text], load_cascade())
+        if answered:
+            _record_metrics([text], [answered[0]], start)
+            return answered[0]
+        
+        cache = load_result_cache()
+        keys = [_chunk_cache_key(paragraph, classifier) for paragraph in paragraphs]
+        entries = {}
+        if cache is not None:
+            with metrics.timed("cache_lookup"):
+                entries = cache.get_many(keys)
+        
+        missing = {}
+        for key, paragraph in zip(keys, paragraphs):
+            if key not in entries:
+                missing.setdefault(key, paragraph)
+        metrics.CACHE_LOOKUPS.inc(len(keys) - len(missing), result="hit")
+        metrics.CACHE_LOOKUPS.inc(len(missing), result="miss")
+        
+        near_duplicate = None
+        document_key = None
+        if missing and cache is not None and NEAR_DUPLICATE_MODE != "off":
+            # Indexed like analyze_text's full-text scores of the same model and aggregation
+            document_key = make_key('paragraphs', _cache_key(text, classifier, aggregation, windowed=True))
+            config = classifier.model.config
+            index = load_near_duplicate_index(config.name_or_path, getattr(config, '_commit_hash', None),
+                                              aggregation, True)
+            near_duplicates, fingerprints = _find_near_duplicates({document_key: text}, index, cache)
+            near_duplicate = near_duplicates.get(document_key)
+            if near_duplicate is not None and NEAR_DUPLICATE_MODE == "reuse":
+                result = _result_from_entry(near_duplicate['entry'])
+                result['near_duplicate'] = {'similarity': near_duplicate['similarity'],
+                                            'ai_probability': near_duplicate['entry']['ai_probability'],
+                                            'reused': True}
+                _record_metrics([text], [result], start)
+                return result
+        
+        if missing:
+            if scheduler is not None:
+                scored = scheduler.score([('paragraph', paragraph) for paragraph in missing.values()])
+            else:
+                scored = _dispatch(_score_chunks, classifier, list(missing.values()), batch_size=batch_size)
+            new_entries = dict(zip(missing, scored))
+            if cache is not None:
+                with metrics.timed("cache_store"):
+                    cache.put_many(new_entries)
+            entries.update(new_entries)
+        
+        ai_prob, window_count, members = _aggregate_chunks([entries[key] for key in keys], aggregation)
+        result = _build_result(ai_prob * 100, 100 - ai_prob * 100)
+        
+        tokens_total = sum(entries[key]['tokens'] for key in keys)
+        tokens_reinferred = sum(entries[key]['tokens'] for key in missing)
+        result['window_count'] = window_count
+        result['tokens_scored'] = tokens_total
+        result['tokens_total'] = tokens_total
+        result['chars_scored'] = len(text)
+        result['paragraph_count'] = len(paragraphs)
+        result['paragraphs_reinferred'] = len(missing)
+        result['tokens_reinferred'] = tokens_reinferred
+        result['reinferred_fraction'] = tokens_reinferred / tokens_total if tokens_total else 1.0
+        if members is not None:
+            # Missing paragraphs were scored in one call; reused ones cost no member time
+            for index, member in enumerate(members):
+                member['latency_ms'] = max((entries[key]['members'][index]['latency_ms'] for key in missing),
+                                           default=0.0)
+            result['members'] = members
+        
+        if document_key is not None:
+            entry = {name: value for name, value in result.items()
+                     if name in ('ai_probability', 'window_count', 'tokens_scored', 'tokens_total',
+                                 'chars_scored', 'members')}
+            with metrics.timed("cache_store"):
+                cache.put_many({document_key: entry})
+            index.add(fingerprints[document_key], document_key)
+        if near_duplicate is not None:
+            result['near_duplicate'] = {'similarity': near_duplicate['similarity'],
+                                        'ai_probability': near_duplicate['entry']['ai_probability'],
+                                        'reused': False}
+        metrics.TOKENS_REUSED.inc(tokens_total - tokens_reinferred)
+        _record_metrics([text], [result], start)
+        return result
+    except Exception as e:
+        st.error(f"Error during text analysis: {str(e)}")
+        raise
+
+
+def analyze_texts(texts: List[str], classifier, batch_size: int = BATCH_SIZE,
+                  aggregation: str = WINDOW_AGGREGATION) -> List[Dict[str, Any]]:
+    """
+    Analyze many texts at once with batched, dynamically padded forward passes.
+    
+    Much faster than calling analyze_text in a loop: tokenization happens in
+    one call and windows of similar length share a forward pass.
+    
+    Args:
+        texts (List[str]): The input texts to analyze
+        classifier: The Hugging Face pipeline object
+        batch_size (int): Windows per forward pass. Defaults to BATCH_SIZE.
+        aggregation (str): How window scores are combined: "mean", "max" or
+                           "weighted". Defaults to WINDOW_AGGREGATION.
+        
+    Returns:
+        List[Dict[str, Any]]: One result dictionary per text, in input order,
+                              with the same keys as analyze_text
+        
+    Raises:
+        Exception: If inference fails or output format is unexpected
+    """
+    try:
+        return _analyze_cached(texts, classifier, aggregation, batch_size, windowed=ENABLE_WINDOWING)
+    except Exception as e:
+        st.error(f"Error during batch text analysis: {str(e)}")
+        raise
+
+
+def open_logit_store(classifier, windowed: bool = ENABLE_WINDOWING) -> LogitStore:
+    """
+    Open (or create) the logit store of a model under the current window settings.
+    
+    Args:
+        classifier: The Hugging Face pipeline object, OnnxClassifier or ModelPool
+        windowed (bool): Whether full texts are scored
+        
+    Returns:
+        LogitStore: Its directory under LOGIT_STORE_DIR is named after the
+                    model, its revision and every setting that changes logits
+        
+    Raises:
+        ValueError: If classifier is an Ensemble (members have logits of their own)
+    """
+    if isinstance(classifier, Ensemble):
+        raise ValueError("The logit store holds the logits of a single model, not an ensemble")
+    config = classifier.model.config
+    identity = {
+        'model': config.name_or_path,
+        'revision': getattr(config, '_commit_hash', None),
+        'preprocessing_version': PREPROCESSING_VERSION,
+        'windowed': windowed,
+        'window_tokens': WINDOW_TOKENS,
+        'window_overlap': WINDOW_OVERLAP if windowed else None
+    }
+    name = os.path.basename(config.name_or_path.rstrip("/")) + "-" + make_key(identity)[:16]
+    return LogitStore(os.path.join(LOGIT_STORE_DIR, name), num_labels=len(config.id2label),
+                      ai_index=label_indices(config)['Fake'], identity=identity)
+
+
+def record_logits(texts: List[str], classifier, store: LogitStore,
+                  batch_size: int = BATCH_SIZE, windowed: bool = ENABLE_WINDOWING) -> np.ndarray:
+    """
+    Make sure the logits of every text are in store; only texts not stored yet reach the model.
+    
+    Args:
+        texts (List[str]): The input texts (normalized here, as for scoring)
+        classifier: The Hugging Face pipeline object, OnnxClassifier or ModelPool
+        store (LogitStore): Store opened with open_logit_store for this classifier
+        batch_size (int): Windows per forward pass. Defaults to BATCH_SIZE.
+        windowed (bool): Must match the store. Defaults to ENABLE_WINDOWING.
+        
+    Returns:
+        np.ndarray: Store row of each text, in input order
+    """
+    keys = [hashlib.sha256(_normalize_text(text).encode('utf-8')).hexdigest() for text in texts]
+    rows = store.lookup(keys)
+    missing = {}
+    for index in np.flatnonzero(rows < 0):
+        missing.setdefault(keys[index], _normalize_text(texts[index]))
+    if missing:
+        window_logits, window_lengths = _dispatch(_text_logits, classifier, list(missing.values()),
+                                                  batch_size=batch_size, windowed=windowed)
+        store.append(list(missing), window_logits, window_lengths)
+        rows = store.lookup(keys)
+    return rows
+
+
+def _iter_upload_rows(uploaded_file, skipped: Optional[List[int]] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Stream (row number, text) pairs from an uploaded CSV, TXT or JSONL file.
+    
+    The file is decoded and parsed line by line, so only the current row is
+    held in memory regardless of upload size. Empty rows are skipped, and so
+    are JSONL lines that are not a JSON object, instead of failing the file.
+    
+    Args:
+        uploaded_file: Streamlit UploadedFile (a binary file-like object with .name)
+        skipped (Optional[List[int]]): Receives the row numbers of malformed rows
+        
+    Yields:
+        Tuple[int, str]: 1-based row number in the source file and its text,
+                         cut to MAX_CHAR_LIMIT characters
+        
+    Raises:
+        ValueError: If the file extension is not one of BULK_FILE_TYPES
+    """
+    extension = os.path.splitext(uploaded_file.name)[1].lower().lstrip('.')
+    if extension not in BULK_FILE_TYPES:
+        raise ValueError(f"Unsupported file type: .{extension}")
+    
+    stream = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', errors='replace', newline='')
+    try:
+        yield from _parse_rows(stream, extension, skipped)
+    finally:
+        # Hand the underlying upload back open so it can be read again on rerun
+        stream.detach()
+
+
+def _parse_rows(stream, extension: str, skipped: Optional[List[int]] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Parse non-empty (row number, text) pairs from a decoded upload stream.
+    
+    Args:
+        stream: Text stream positioned at the start of the file
+        extension (str): "csv", "jsonl" or "txt"
+        skipped (Optional[List[int]]): Receives the row numbers of malformed rows
+        
+    Yields:
+        Tuple[int, str]: 1-based row number and its text, cut to MAX_CHAR_LIMIT
+    """
+    if extension == 'csv':
+        reader = csv.reader(stream)
+        header = next(reader, [])
+        normalized = [column.strip().lower() for column in header]
+        column = normalized.index(BULK_TEXT_FIELD) if BULK_TEXT_FIELD in normalized else 0
+        rows = ((row_number, row[column] if column < len(row) else '')
+                for row_number, row in enumerate(reader, start=1))
+    elif extension == 'jsonl':
+        rows = _parse_jsonl(stream, skipped)
+    else:
+        rows = ((row_number, line.rstrip('\r\n')) for row_number, line in enumerate(stream, start=1))
+    
+    for row_number, text in rows:
+        if text.strip():
+            yield row_number, text[:MAX_CHAR_LIMIT]
+
+
+def _parse_jsonl(stream, skipped: Optional[List[int]]) -> Iterator[Tuple[int, str]]:
+    """
+    Parse the text field of each JSONL line, skipping lines that are not a JSON object.
+    
+    Args:
+        stream: Text stream of a JSONL file
+        skipped (Optional[List[int]]): Receives the row numbers of lines that
+                                       are not a JSON object
+        
+    Yields:
+        Tuple[int, str]: 1-based row number and its BULK_TEXT_FIELD value
+    """
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        if not isinstance(record, dict):
+            if skipped is not None:
+                skipped.append(row_number)
+            continue
+        yield row_number, str(record.get(BULK_TEXT_FIELD, ''))
+
+
+def _chunked(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Group an iterable into lists of at most size items without materializing it.
+    
+    Args:
+        rows (Iterable[Any]): Items to group
+        size (int): Maximum items per chunk
+        
+    Yields:
+        List[Any]: Consecutive chunks of rows
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def render_bulk_upload(classifier) -> None:
+    """
+    Render the bulk upload tab: score every row of an uploaded file.
+    
+    Rows are streamed through analyze_texts in BULK_CHUNK_SIZE chunks and each
+    chunk's results are appended to a temporary CSV on disk, so memory stays
+    bounded no matter how large the upload is. A live progress bar and
+    rows/sec counter are shown while scoring, and the result file is offered
+    for download afterwards.
+    
+    Args:
+        classifier: The Hugging Face pipeline object
+        
+    Returns:
+        None: This function manages the UI and doesn't return a value.
+    """
+    st.markdown("---")
+    st.subheader("📂 Analyze a File")
+    st.caption(f"Upload a CSV (with a '{BULK_TEXT_FIELD}' column), a JSONL file (with a "
+               f"'{BULK_TEXT_FIELD}' field) or a TXT file with one text per line. "
+               f"Each text is limited to {MAX_CHAR_LIMIT} characters.")
+    
+    uploaded_file = st.file_uploader("Upload file", type=BULK_FILE_TYPES)
+    
+    if st.button("🔍 Analyze File", type="primary", disabled=uploaded_file is None):
+        # Drop the previous run's result file before starting a new one
+        previous_path = st.session_state.pop('bulk_result_path', None)
+        if previous_path and os.path.exists(previous_path):
+            os.remove(previous_path)
+        
+        progress_bar = st.progress(0.0)
+        status = st.empty()
+        uploaded_file.seek(0)
+        total_bytes = max(uploaded_file.size, 1)
+        row_count = 0
+        start_time = time.perf_counter()
+        output_path = None
+        skipped = []
+        
+        try:
+            with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8',
+                                             delete=False) as output:
+                output_path = output.name
+                writer = csv.writer(output)
+                writer.writerow(['row', 'text', 'ai_probability', 'human_probability',
+                                 'classification', 'confidence_level', 'tokens_scored', 'tokens_total'])
+                
+                for chunk in _chunked(_iter_upload_rows(uploaded_file, skipped), BULK_CHUNK_SIZE):
+                    results = analyze_texts_shared([text for _, text in chunk], classifier)
+                    for (row_number, text), result in zip(chunk, results):
+                        writer.writerow([row_number, text,
+                                         f"{result['ai_probability']:.2f}",
+                                         f"{result['human_probability']:.2f}",
+                                         result['classification'], result['confidence_level'],
+                                         result['tokens_scored'], result['tokens_total']])
+                    
+                    row_count += len(chunk)
+                    elapsed = time.perf_counter() - start_time
+                    progress_bar.progress(min(uploaded_file.tell() / total_bytes, 1.0))
+                    status.caption(f"Scored {row_count} rows · {row_count / elapsed:.1f} rows/sec")
+            
+            st.session_state.bulk_result_path = output_path
+            progress_bar.progress(1.0)
+            elapsed = time.perf_counter() - start_time
+            st.success(f"✅ Scored {row_count} rows in {elapsed:.1f}s "
+                       f"({row_count / max(elapsed, 1e-9):.1f} rows/sec)")
+            if skipped:
+                shown = ", ".join(str(row_number) for row_number in skipped[:10])
+                st.warning(f"⚠️ Skipped {len(skipped)} malformed row(s): {shown}"
+                           f"{', …' if len(skipped) > 10 else ''}")
+        except Exception as e:
+            st.error(f"❌ Could not process the uploaded file: {str(e)}")
+        finally:
+            # A failed or interrupted run (e.g. a rerun mid-file) leaves no partial file behind
+            if output_path and st.session_state.get('bulk_result_path') != output_path:
+                os.unlink(output_path)
+    
+    # Offer the most recent result file (kept across reruns, e.g. after clicking download)
+    result_path = st.session_state.get('bulk_result_path')
+    if result_path and os.path.exists(result_path):
+        with open(result_path, 'rb') as result_file:
+            st.download_button("⬇️ Download Results (CSV)", data=result_file,
+                               file_name="detector_results.csv", mime="text/csv")
+
+
+@st.cache_resource
+def load_scheduler(_classifier) -> ThreadMicroBatcher:
+    """
+    Start the background inference worker shared by all Streamlit sessions.
+    
+    Every session's clicks are queued to this one worker, which batches
+    requests that arrive together into a single analyze_texts call. Ten
+    simultaneous users then cost about one batched forward pass instead of
+    ten forward passes contending for the same CPU threads. With a ModelPool,
+    one batch per replica can be in flight at a time.
+    
+    Args:
+        _classifier: The Hugging Face pipeline object (leading underscore tells
+                     @st.cache_resource not to hash it)
+        
+    Returns:
+        ThreadMicroBatcher: The shared scheduler
+    """
+    return _make_scheduler(_classifier)
+
+
+def _make_scheduler(classifier) -> ThreadMicroBatcher:
+    """
+    Build a ThreadMicroBatcher that scores texts and paragraph requests in shared batches.
+    
+    Args:
+        classifier: The model the scheduler scores with
+        
+    Returns:
+        ThreadMicroBatcher: A scheduler batching requests for that model
+    """
+    def score_batch(requests: List[Any]) -> List[Dict[str, Any]]:
+        # Texts get document results; ('paragraph', text) requests from
+        # analyze_text_incremental get the raw window scores of _score_chunks
+        paragraphs = [index for index, request in enumerate(requests) if isinstance(request, tuple)]
+        if not paragraphs:
+            return _analyze_cached(requests, classifier, WINDOW_AGGREGATION, BATCH_SIZE, windowed=ENABLE_WINDOWING)
+        results = [None] * len(requests)
+        texts = [index for index, request in enumerate(requests) if not isinstance(request, tuple)]
+        if texts:
+            scored = _analyze_cached([requests[index] for index in texts], classifier, WINDOW_AGGREGATION,
+                                     BATCH_SIZE, windowed=ENABLE_WINDOWING)
+            for index, result in zip(texts, scored):
+                results[index] = result
+        scored = _dispatch(_score_chunks, classifier, [requests[index][1] for index in paragraphs],
+                           batch_size=BATCH_SIZE)
+        for index, entry in zip(paragraphs, scored):
+            results[index] = entry
+        return results
+    
+    return ThreadMicroBatcher(score_batch, max_wait_ms=SCHEDULER_MAX_WAIT_MS, max_texts=SCHEDULER_MAX_TEXTS,
+                              workers=getattr(classifier, 'replicas', 1))
+
+
+def _load_served_model(model_name: str) -> Dict[str, Any]:
+    """
+    Load a model for the registry, with its own shared scheduler.
+    
+    Args:
+        model_name (str): Hugging Face model name or local checkpoint path
+        
+    Returns:
+        dict: classifier, and scheduler (None when ENABLE_SHARED_SCHEDULER is off)
+    """
+    classifier = _load_classifier(model_name)
+    return {'classifier': classifier,
+            'scheduler': _make_scheduler(classifier) if ENABLE_SHARED_SCHEDULER else None}
+
+
+def _unload_served_model(served: Dict[str, Any]) -> None:
+    """
+    Stop a model's scheduler and worker processes or threads once the registry drops it.
+    
+    Args:
+        served (Dict[str, Any]): What _load_served_model returned
+    """
+    if served['scheduler'] is not None:
+        served['scheduler'].close()
+    if isinstance(served['classifier'], (ModelPool, Ensemble)):
+        served['classifier'].close()
+
+
+def _served_model_bytes(served: Dict[str, Any]) -> Optional[int]:
+    """
+    Measure the weight bytes of a model loaded by the registry.
+    
+    Args:
+        served (Dict[str, Any]): What _load_served_model returned
+        
+    Returns:
+        Optional[int]: Bytes of the model's weights, or None when they are not
+                       torch tensors in this process (ONNX, replica processes)
+    """
+    classifier = served['classifier']
+    if QUANTIZED_MODEL:
+        # Packed INT8 weights are neither parameters nor buffers
+        return None
+    if isinstance(classifier, Ensemble):
+        return sum(parameter_bytes(member.classifier.model) for member in classifier.members)
+    if isinstance(classifier, ModelPool) or not isinstance(getattr(classifier, 'model', None), torch.nn.Module):
+        return None
+    return parameter_bytes(classifier.model)
+
+
+@st.cache_resource
+def load_model_registry() -> ModelRegistry:
+    """
+    Create the registry of models loaded at runtime, shared by all sessions.
+    
+    MODEL_NAME is active at first. At most MAX_LOADED_MODELS models (and
+    MODEL_MEMORY_BUDGET_MB of weights) stay loaded; the least recently used
+    one is unloaded first, once the requests using it have finished.
+    
+    Returns:
+        ModelRegistry: Registry whose models are _load_served_model results
+    """
+    max_bytes = int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024) if MODEL_MEMORY_BUDGET_MB else None
+    return ModelRegistry(_load_served_model, default=MODEL_NAME, max_models=MAX_LOADED_MODELS,
+                         max_bytes=max_bytes, size=_served_model_bytes, unloader=_unload_served_model)
+
+
+def analyze_texts_shared(texts: List[str], classifier,
+                         scheduler: Optional[ThreadMicroBatcher] = None) -> List[Dict[str, Any]]:
+    """
+    Analyze texts through the shared inference worker (see load_scheduler).
+    
+    Used by the UI so concurrent sessions are batched together. Falls back to
+    analyze_texts when ENABLE_SHARED_SCHEDULER is off.
+    
+    Args:
+        texts (List[str]): The input texts to analyze
+        classifier: The Hugging Face pipeline object
+        scheduler (Optional[ThreadMicroBatcher]): Scheduler of classifier
+                                                  (default: load_scheduler(classifier))
+        
+    Returns:
+        List[Dict[str, Any]]: One result dictionary per text, in input order
+        
+    Raises:
+        Exception: If inference fails or output format is unexpected
+    """
+    if not ENABLE_SHARED_SCHEDULER:
+        return analyze_texts(texts, classifier)
+    try:
+        return (scheduler or load_scheduler(classifier)).score(texts)
+    except Exception as e:
+        st.error(f"Error during text analysis: {str(e)}")
+        raise
+
+
+def render_sentence_heatmap(text: str, sentences: List[Dict[str, Any]]) -> None:
+    """
+    Show the text with every sentence highlighted from green (human) to red (AI).
+    
+    Args:
+        text (str): The analyzed text
+        sentences (List[Dict[str, Any]]): Output of analyze_sentences for text
+    """
+    text = _normalize_text(text)
+    parts = []
+    position = 0
+    for sentence in sentences:
+        parts.append(html.escape(text[position:sentence['start']]))
+        hue = 120 * (1 - sentence['ai_probability'] / 100)
+        parts.append(f'<span style="background-color: hsl({hue:.0f}, 75%, 80%); color: #000; border-radius: 3px;" '
+                     f'title="AI probability: {sentence["ai_probability"]:.1f}%">'
+                     f'{html.escape(sentence["text"])}</span>')
+        position = sentence['end']
+    parts.append(html.escape(text[position:]))
+    st.markdown(f'<div style="white-space: pre-wrap; line-height: 1.8;">{"".join(parts)}</div>',
+                unsafe_allow_html=True)
+    st.caption("🟩 Human-like · 🟨 Uncertain · 🟥 AI-like. Hover over a sentence for its AI probability.")
+
+
+def render_model_switcher(registry: ModelRegistry) -> None:
+    """
+    Sidebar to switch the served model and unload idle ones, for all sessions.
+    
+    Requests already running keep the model they started with.
+    
+    Args:
+        registry (ModelRegistry): The shared model registry
+    """
+    st.sidebar.header("🔀 Model")
+    loaded = registry.loaded()
+    choices = list(dict.fromkeys([MODEL_NAME] + list(MODEL_CHOICES) + [model['name'] for model in loaded]))
+    choice = st.sidebar.selectbox("Served model", choices, index=choices.index(registry.active))
+    if choice != registry.active:
+        try:
+            with st.spinner(f"Loading {choice}..."):
+                registry.activate(choice)
+            st.rerun()
+        except Exception as e:
+            st.sidebar.error(f"Failed to load {choice}: {str(e)}")
+    
+    for model in loaded:
+        size = f"{model['size_bytes'] / (1024 * 1024):.0f} MB" if model['size_bytes'] else "size unknown"
+        st.sidebar.caption(f"{'✅' if model['active'] else '💤'} {model['name']} · {size} · "
+                           f"loaded in {model['load_seconds']:.1f}s")
+        if not model['active'] and st.sidebar.button("Unload", key=f"unload-{model['name']}"):
+            registry.unload(model['name'])
+            st.rerun()
+
+
+def render_metrics_sidebar() -> None:
+    """
+    Show live per-stage latency percentiles and counters in the sidebar.
+    
+    Percentiles cover the most recent observations of this server process
+    (see detector.metrics), across all sessions.
+    """
+    st.sidebar.header("📈 Metrics")
+    rows = []
+    for (stage,) in metrics.STAGE_SECONDS.label_values():
+        summary = metrics.STAGE_SECONDS.quantiles(stage=stage)
+        rows.append({
+            'Stage': stage,
+            'Count': summary['count'],
+            'p50 (ms)': round(summary['p50'] * 1000, 1),
+            'p95 (ms)': round(summary['p95'] * 1000, 1),
+            'p99 (ms)': round(summary['p99'] * 1000, 1)
+        })
+    if rows:
+        st.sidebar.dataframe(rows, hide_index=True)
+    else:
+        st.sidebar.caption("No requests yet.")
+    
+    texts = sum(metrics.TEXTS.values().values())
+    lookups = metrics.CACHE_LOOKUPS.values()
+    hits = lookups.get(("hit",), 0)
+    total_lookups = hits + lookups.get(("miss",), 0)
+    st.sidebar.metric("Texts analyzed", int(texts))
+    st.sidebar.metric("Tokens through the model", int(sum(metrics.TOKENS.values().values())))
+    reused = sum(metrics.TOKENS_REUSED.values().values())
+    if reused:
+        st.sidebar.metric("Tokens reused from unchanged paragraphs", int(reused))
+    if total_lookups:
+        st.sidebar.metric("Cache hit rate", f"{hits / total_lookups:.0%}")
+    for (classification,), count in sorted(metrics.CLASSIFICATIONS.values().items()):
+        st.sidebar.caption(f"{classification}: {int(count)}")
+
+
+def render_analysis(classifier, scheduler: Optional[ThreadMicroBatcher] = None) -> None:
+    """
+    Show the single-text and bulk-upload tabs.
+    
+    Args:
+        classifier: The model to analyze with
+        scheduler (Optional[ThreadMicroBatcher]): Its shared scheduler
+                                                  (default: load_scheduler(classifier))
+    """
+    # Two modes: a single pasted text, or a bulk file of many texts
+    single_tab, bulk_tab = st.tabs(["📝 Single Text", "📂 Bulk Upload"])
+    
+    with single_tab:
+        # Input Section
+        st.markdown("---")
+        st.subheader("📝 Enter Text to Analyze")
+        
+        # Initialize session state for clear counter
+        if 'clear_counter' not in st.session_state:
+            st.session_state.clear_counter = 0
+        
+        # Text area with dynamic key that changes when cleared
+        text_input = st.text_area(
+            label="Paste your text here:",
+            height=200,
+            max_chars=MAX_CHAR_LIMIT,
+            placeholder="Paste the text you want to analyze here. The detector works best with at least a few sentences.",
+            help=f"Maximum {MAX_CHAR_LIMIT} characters. Best results with 50+ words.",
+            key=f"text_area_{st.session_state.clear_counter}"
+        )
+        
+        # Character count
+        char_count = len(text_input)
+        st.caption(f"Characters: {char_count}/{MAX_CHAR_LIMIT}")
+        
+        # Button row with Analyze and Clear buttons
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            analyze_button = st.button("🔍 Analyze Text", type="primary", use_container_width=True)
+        with col2:
+            clear_button = st.button("🗑️ Clear", use_container_width=True)
+        
+        # Handle clear button click - increment counter to force text_area recreation
+        if clear_button:
+            st.session_state.clear_counter += 1
+            st.rerun()
+        
+        # Analysis and Results
+        if analyze_button:
+            # Validation
+            if not text_input or text_input.strip() == "":
+                st.error("⚠️ Please enter some text to analyze.")
+            else:
+                # Warning for very long text
+                if char_count > MAX_CHAR_LIMIT:
+                    st.warning(f"⚠️ Text exceeds {MAX_CHAR_LIMIT} characters. Results may take longer.")
+                
+                # Warning for very short text
+                word_count = len(text_input.split())
+                if word_count < 10:
+                    st.warning("⚠️ Text is very short. Results may have limited confidence.")
+                
+                # Perform analysis
+                with st.spinner("🔄 Analyzing text..."):
+                    try:
+                        if ENABLE_INCREMENTAL_RESCORING:
+                            shared = (scheduler or load_scheduler(classifier)) if ENABLE_SHARED_SCHEDULER else None
+                            results = analyze_text_incremental(text_input, classifier, scheduler=shared)
+                        else:
+                            results = analyze_texts_shared([text_input], classifier, scheduler)[0]
+                        
+                        # Results Section
+                        st.markdown("---")
+                        st.subheader("📊 Analysis Results")
+                        
+                        # Progress bar for AI probability
+                        st.markdown("**AI Detection Level:**")
+                        st.progress(results['ai_probability'] / 100)
+                        
+                        # Main result display
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.metric(
+                                label="AI Probability",
+                                value=f"{results['ai_probability']:.1f}%"
+                            )
+                        with col2:
+                            st.metric(
+                                label="Human Probability",
+                                value=f"{results['human_probability']:.1f}%"
+                            )
+                        
+                        # Classification result with color coding
+                        st.markdown("**Classification:**")
+                        classification = results['classification']
+                        
+                        if classification == "Human Written":
+                            st.success(f"✅ This text appears to be **{classification}**")
+                        elif classification == "AI Generated":
+                            st.error(f"🤖 This text appears to be **{classification}**")
+                        else:
+                            st.warning(f"❓ This text shows **{classification}** signals")
+                        
+                        # Confidence level
+                        confidence = results['confidence_level']
+                        st.markdown(f"**Confidence Level:** {confidence}")
+                        
+                        # Only the first WINDOW_TOKENS tokens are scored when windowing is off
+                        if results['tokens_scored'] < results['tokens_total']:
+                            st.caption(f"ℹ️ Scored the first {results['tokens_scored']} of "
+                                       f"{results['tokens_total']} tokens "
+                                       f"({results['chars_scored']} of {len(text_input)} characters).")
+                        
+                        if results.get('scored_by') == 'cascade':
+                            st.caption("⚡ Clear-cut text: answered by the fast pre-classifier "
+                                       "without running the transformer.")
+                        
+                        # Lightly edited copy of a text analyzed before
+                        if 'near_duplicate' in results:
+                            near_duplicate = results['near_duplicate']
+                            if near_duplicate['reused']:
+                                st.caption(f"🔁 Near-duplicate ({near_duplicate['similarity']:.0%} similar) of a "
+                                           f"previously analyzed text; its score was reused.")
+                            else:
+                                st.caption(f"🔁 Near-duplicate ({near_duplicate['similarity']:.0%} similar) of a "
+                                           f"previously analyzed text scored "
+                                           f"{near_duplicate['ai_probability']:.1f}% AI.")
+                        
+                        # After an edit, only changed paragraphs are re-scored
+                        if 'reinferred_fraction' in results:
+                            st.caption(f"♻️ Re-scored {results['paragraphs_reinferred']} of "
+                                       f"{results['paragraph_count']} paragraphs "
+                                       f"({results['reinferred_fraction']:.0%} of tokens); "
+                                       f"the rest reused earlier scores.")
+                        
+                        # Ensemble: what each member said and how long it took
+                        if 'members' in results:
+                            with st.expander("🧩 Ensemble members"):
+                                st.table([{'Model': member['name'], 'Weight': member['weight'],
+                                           'AI Probability': f"{member['ai_probability']:.1f}%",
+                                           'Latency': f"{member['latency_ms']:.0f} ms"}
+                                          for member in results['members']])
+                        
+                        if confidence == "Low":
+                            st.warning("⚠️ Low confidence result. The text may be ambiguous or the model is uncertain. "
+                                     "Try with longer or more distinctive text for better results.")
+                        
+                        # Per-sentence heatmap: which parts of the text drive the score
+                        if ENABLE_SENTENCE_HEATMAP:
+                            st.markdown("**Sentence Heatmap:**")
+                            render_sentence_heatmap(text_input, analyze_sentences(text_input, classifier))
+                        
+                        # Interpretation guidance
+                        with st.expander("ℹ️ How to interpret these results"):
+                            st.markdown("""
+                            **Understanding the Results:**
+                            - **AI Generated (>70% AI)**: The text likely written by ChatGPT or similar AI
+                            - **Human Written (>70% Human)**: The text likely written by a human
+                            - **Mixed/Uncertain**: The model cannot definitively classify the text
+                            
+                            **Confidence Levels:**
+                            - **High (>85%)**: Very confident in the classification
+                            - **Medium (70-85%)**: Reasonably confident, but some uncertainty
+                            - **Low (<70%)**: Uncertain classification, interpret with caution
+                            
+                            **Limitations:**
+                            - Best performance with English text
+                            - Trained specifically on ChatGPT-generated content
+                            - May not detect other AI models accurately
+                            - Very short texts may yield unreliable results
+                            """)
+                    
+                    except Exception as e:
+                        st.error(f"❌ An error occurred during analysis. Please try again.")
+                        st.exception(e)
+    
+    with bulk_tab:
+        render_bulk_upload(classifier)
+
+
+def main():
+    """
+    Main application function that sets up the Streamlit UI and handles user interactions.
+    
+    This function orchestrates the entire application flow:
+    1. Configure page settings (title, icon, layout)
+    2. Display header and model information
+    3. Load and cache the ML model
+    4. Create input interface for text entry
+    5. Handle analysis button click
+    6. Validate user input
+    7. Perform text analysis
+    8. Display results with visualizations
+    9. Provide interpretation guidance
+    
+    The function uses Streamlit's reactive programming model where the entire
+    script reruns on each user interaction. State is preserved using caching.
+    
+    Returns:
+        None: This function manages the UI and doesn't return a value.
+    """
+    # Page configuration - must be the first Streamlit command
+    # Sets browser tab title, favicon, and page width
+    st.set_page_config(
+        page_title="AI Content Detector",  # Browser tab title
+        page_icon="🔍",                     # Browser tab icon
+        layout="centered"                   # Content width: centered or wide
+    )
+    
+    # Header Section
+    st.title("🔍 AI Content Detector")
+    st.markdown("""
+    This tool helps you detect whether text was generated by AI (ChatGPT) or written by a human.
+    Simply paste your text below and click **Analyze Text** to see the results.
+    """)
+    
+    if ENABLE_MODEL_SWITCHING:
+        registry = load_model_registry()
+        render_model_switcher(registry)
+        try:
+            with st.spinner("Loading AI detection model..."):
+                lease = registry.acquire()
+        except Exception as e:
+            st.error(f"Failed to load model: {str(e)}")
+            st.stop()
+        st.info(f"**Model**: {lease.name} (trained to detect AI-generated text)")
+        # This run keeps its model even if another session switches models meanwhile
+        try:
+            render_analysis(lease.model['classifier'], lease.model['scheduler'])
+        finally:
+            lease.release()
+    else:
+        st.info(f"**Model**: {MODEL_NAME} (trained to detect AI-generated text)")
+        
+        # Load model
+        try:
+            with st.spinner("Loading AI detection model..."):
+                classifier = load_model()
+        except Exception:
+            st.stop()
+        render_analysis(classifier)
+    
+    if SHOW_METRICS_SIDEBAR:
+        render_metrics_sidebar()
     
     # Footer
     st.markdown("---")
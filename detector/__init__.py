@@ -0,0 +1,8 @@
+"""
+Supporting modules for the AI vs Human Text Detector.
+
+app.py holds the Streamlit UI and the analysis entry points. Most modules
+here are the pieces it builds on and have no Streamlit dependency; cli.py,
+server.py and pool.py drive app.py itself, so they import it (and with it
+Streamlit) when they run.
+"""
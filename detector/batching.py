@@ -0,0 +1,262 @@
+"""
+Micro-batching: coalesce concurrent scoring requests into one model call.
+
+Each request waits at most max_wait_ms for other requests to arrive; all
+texts collected in that window (up to max_texts) are scored together and
+every caller receives its own slice of the results. Requests that queue up
+while a batch is being scored join the next batch without waiting. By
+default scoring runs on a single background thread, so model calls never
+contend with each other; with a pool of model replicas (detector.pool),
+one batch per replica is scored concurrently.
+
+AsyncMicroBatcher serves asyncio callers (the HTTP service);
+ThreadMicroBatcher serves plain threads (Streamlit sessions).
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ScoreBatch = Callable[[List[str]], List[Dict[str, Any]]]
+
+
+class AsyncMicroBatcher:
+    """
+    asyncio request queue in front of a batch scoring function.
+
+    Args:
+        score_batch (ScoreBatch): Scores a list of texts, returning one result each
+        max_wait_ms (float): How long the first request in a batch waits for others
+        max_texts (int): Texts at which a batch is sent without waiting further
+        concurrency (int): Batches scored at the same time (one per model replica)
+    """
+
+    def __init__(self, score_batch: ScoreBatch, max_wait_ms: float, max_texts: int, concurrency: int = 1):
+        self.score_batch = score_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_texts = max_texts
+        self.concurrency = concurrency
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: set = set()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="microbatch")
+        self._counters = {'requests': 0, 'texts': 0, 'batches': 0}
+
+    async def submit(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Queue texts for scoring and wait for their results.
+
+        Args:
+            texts (List[str]): Texts from one request
+
+        Returns:
+            List[Dict[str, Any]]: One result per text, in order
+
+        Raises:
+            Exception: Whatever the scoring function raised for this batch
+        """
+        if self._worker is None:
+            # Started lazily so the queue belongs to the serving event loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[List[str], asyncio.Future]]:
+        """Wait for one request, then gather more until max_wait or max_texts."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        count = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+
+        while count < self.max_texts:
+            if not self._queue.empty():
+                # Requests that queued up while the previous batch ran join immediately
+                item = self._queue.get_nowait()
+            else:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            batch.append(item)
+            count += len(item[0])
+        return batch
+
+    async def _run(self) -> None:
+        # A batch is only collected once a scoring slot is free, so requests
+        # keep queuing (and coalescing) while every slot is busy
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            await slots.acquire()
+            batch = await self._collect()
+            task = asyncio.create_task(self._score(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _score(self, batch: List[Tuple[List[str], asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        texts = [text for request_texts, _ in batch for text in request_texts]
+
+        self._counters['requests'] += len(batch)
+        self._counters['texts'] += len(texts)
+        self._counters['batches'] += 1
+
+        try:
+            results = await loop.run_in_executor(self._executor, self.score_batch, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for request_texts, future in batch:
+            if not future.done():
+                future.set_result(results[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report how well requests are being coalesced.
+
+        Returns:
+            dict: requests, texts, batches and mean texts_per_batch
+        """
+        stats: Dict[str, Any] = dict(self._counters)
+        stats['texts_per_batch'] = stats['texts'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+
+class ThreadMicroBatcher:
+    """
+    Thread-safe request queue in front of a batch scoring function.
+
+    Daemon worker threads collect requests from any number of caller
+    threads and resolve each caller's Future with its slice of the results.
+
+    Args:
+        score_batch (ScoreBatch): Scores a list of texts, returning one result each
+        max_wait_ms (float): How long the first request in a batch waits for others
+        max_texts (int): Texts at which a batch is sent without waiting further
+        workers (int): Worker threads, i.e. batches scored at the same time
+    """
+
+    _STOP = object()
+
+    def __init__(self, score_batch: ScoreBatch, max_wait_ms: float, max_texts: int, workers: int = 1):
+        self.score_batch = score_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_texts = max_texts
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._counters = {'requests': 0, 'texts': 0, 'batches': 0}
+        self._workers = [threading.Thread(target=self._run, name=f"microbatch-{index}", daemon=True)
+                         for index in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, texts: List[str]) -> "Future[List[Dict[str, Any]]]":
+        """
+        Queue texts for scoring.
+
+        Args:
+            texts (List[str]): Texts from one caller
+
+        Returns:
+            Future[List[Dict[str, Any]]]: Resolves to one result per text, in order
+        """
+        future: Future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def score(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Queue texts and block until their results are ready.
+
+        Args:
+            texts (List[str]): Texts from one caller
+
+        Returns:
+            List[Dict[str, Any]]: One result per text, in order
+
+        Raises:
+            Exception: Whatever the scoring function raised for this batch
+        """
+        return self.submit(texts).result()
+
+    def close(self) -> None:
+        """Stop the worker threads once the requests already queued are done."""
+        # Each worker exits after taking exactly one stop marker
+        for _ in self._workers:
+            self._queue.put(self._STOP)
+        for worker in self._workers:
+            worker.join()
+
+    def _collect(self, first: Tuple[List[str], Future]) -> Tuple[List[Tuple[List[str], Future]], bool]:
+        """Gather more requests after the first until max_wait or max_texts."""
+        batch = [first]
+        count = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while count < self.max_texts:
+            # Requests that queued up while the previous batch ran join immediately;
+            # otherwise wait for new ones until the deadline
+            timeout = 0 if not self._queue.empty() else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is self._STOP:
+                return batch, True
+            batch.append(item)
+            count += len(item[0])
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is self._STOP:
+                break
+            batch, stopping = self._collect(first)
+            texts = [text for request_texts, _ in batch for text in request_texts]
+
+            with self._lock:
+                self._counters['requests'] += len(batch)
+                self._counters['texts'] += len(texts)
+                self._counters['batches'] += 1
+
+            try:
+                results = self.score_batch(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for request_texts, future in batch:
+                future.set_result(results[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report how well requests are being coalesced.
+
+        Returns:
+            dict: requests, texts, batches and mean texts_per_batch
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+        stats['texts_per_batch'] = stats['texts'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
@@ -0,0 +1,231 @@
+"""
+Content-addressed result cache for detector scores.
+
+Scores are stored under an opaque key built by the caller (see
+app._cache_key), which hashes the model, its revision, the normalized text
+and every setting that affects the score. Changing any of those produces a
+new key, so stale entries are never returned; they simply age out.
+
+Two tiers are used:
+- An in-process LRU (OrderedDict) for repeat requests within one server.
+- An SQLite file that survives restarts and is shared between processes.
+
+Both tiers honour the same TTL; the SQLite tier is also capped in rows,
+evicting the least recently used entries first.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Evictions on disk run every this many writes rather than on every write
+_EVICTION_INTERVAL = 256
+
+# SQLite limits the number of bound parameters per statement
+_SQLITE_CHUNK = 500
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a cache key from any JSON-serializable parts.
+
+    Args:
+        *parts: Values that identify a score (model, revision, settings, text hash...)
+
+    Returns:
+        str: Hex SHA-256 digest of the parts
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier (memory LRU + SQLite) cache mapping keys to score dictionaries.
+
+    Safe to share between threads (e.g. Streamlit sessions); several
+    processes may also point at the same SQLite file.
+
+    Args:
+        path (Optional[str]): SQLite database file. None keeps only the memory tier.
+        memory_entries (int): Maximum entries held in the in-process LRU
+        max_rows (int): Maximum rows kept in the SQLite tier
+        ttl_seconds (Optional[float]): Entry lifetime; None means entries never expire
+    """
+
+    def __init__(self, path: Optional[str], memory_entries: int = 1024,
+                 max_rows: int = 100_000, ttl_seconds: Optional[float] = None):
+        self.memory_entries = memory_entries
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0}
+
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+            self._db.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, value: Dict[str, Any], created_at: float) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up several keys at once.
+
+        Args:
+            keys (Iterable[str]): Keys to look up
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Found entries by key; missing or expired
+                                       keys are absent
+        """
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+        found = {}
+
+        with self._lock:
+            pending = []
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is not None and not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                    self._counters['memory_hits'] += 1
+                else:
+                    self._memory.pop(key, None)
+                    pending.append(key)
+
+            if self._db is not None and pending:
+                disk_hits = []
+                for start in range(0, len(pending), _SQLITE_CHUNK):
+                    chunk = pending[start:start + _SQLITE_CHUNK]
+                    rows = self._db.execute(
+                        f"SELECT key, value, created_at FROM results "
+                        f"WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, value, created_at in rows:
+                        if self._expired(created_at, now):
+                            continue
+                        found[key] = json.loads(value)
+                        self._remember(key, found[key], created_at)
+                        disk_hits.append(key)
+
+                if disk_hits:
+                    self._db.executemany("UPDATE results SET accessed_at = ? WHERE key = ?",
+                                         [(now, key) for key in disk_hits])
+                    self._db.commit()
+                self._counters['disk_hits'] += len(disk_hits)
+
+            self._counters['misses'] += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up one key.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached value, or None on a miss
+        """
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Store several entries at once (both tiers).
+
+        Args:
+            items (Dict[str, Dict[str, Any]]): JSON-serializable values by key
+        """
+        if not items:
+            return
+        now = time.time()
+
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value, now)
+            self._counters['writes'] += len(items)
+
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(key, json.dumps(value), now, now) for key, value in items.items()]
+                )
+                self._writes_since_eviction += len(items)
+                if self._writes_since_eviction >= _EVICTION_INTERVAL:
+                    self._evict(now)
+                self._db.commit()
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store one entry.
+
+        Args:
+            key (str): Cache key
+            value (Dict[str, Any]): JSON-serializable value
+        """
+        self.put_many({key: value})
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then the least recently used rows beyond max_rows."""
+        self._writes_since_eviction = 0
+        if self.ttl_seconds is not None:
+            self._db.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._db.execute(
+            "DELETE FROM results WHERE key IN ("
+            " SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,)
+        )
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report hit/miss counters since this cache was created.
+
+        Returns:
+            dict: memory_hits, disk_hits, misses, writes, hit_rate (0-1)
+                  and memory_entries (current LRU size)
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,214 @@
+"""
+Cheap pre-classifier for a two-stage cascade in front of the transformer.
+
+Most texts are clearly human or clearly AI, yet every one pays for a full
+RoBERTa forward pass. HashedNgramModel is a logistic regression over hashed
+word 1- and 2-grams (feature hashing: no vocabulary to store). It is
+trained offline on the transformer's own outputs (python -m detector
+train-cascade) and scores thousands of texts per second with numpy alone.
+
+escalate() decides which texts the cheap model may answer. Texts whose
+probability lies clearly beyond AI_THRESHOLD or HUMAN_THRESHOLD are
+answered. Texts in the uncertainty band around and between the thresholds
+go on to the transformer.
+"""
+
+import re
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Words and single punctuation marks; punctuation habits are a useful style signal
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Multiplier for combining token hashes into n-gram hashes
+_NGRAM_PRIME = 1000003
+
+
+def _sigmoid(values: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-np.clip(values, -30, 30)))
+
+
+class HashedNgramModel:
+    """
+    Logistic regression over L2-normalized, log-scaled hashed n-gram counts.
+
+    Args:
+        dimensions (int): Size of the hashed feature space
+        max_ngram (int): Longest word n-gram used as a feature
+    """
+
+    def __init__(self, dimensions: int = 2 ** 18, max_ngram: int = 2):
+        self.dimensions = dimensions
+        self.max_ngram = max_ngram
+        self.weights = np.zeros(dimensions, dtype=np.float32)
+        self.bias = 0.0
+
+    def features(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Hash texts into a sparse matrix in CSR form.
+
+        Args:
+            texts (List[str]): Input texts
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: indptr (rows + 1 offsets),
+                indices (feature ids) and values (feature weights)
+        """
+        indptr = [0]
+        indices = []
+        values = []
+        for text in texts:
+            tokens = _TOKEN_PATTERN.findall(text.lower())
+            hashes = np.array([zlib.crc32(token.encode('utf-8')) for token in tokens], dtype=np.int64)
+            grams = [hashes]
+            for size in range(2, self.max_ngram + 1):
+                if len(hashes) < size:
+                    break
+                count = len(hashes) - size + 1
+                combined = hashes[:count].copy()
+                for offset in range(1, size):
+                    combined = (combined * _NGRAM_PRIME + hashes[offset:offset + count]) & 0xFFFFFFFF
+                grams.append(combined ^ size)
+            ids, counts = np.unique(np.concatenate(grams) % self.dimensions, return_counts=True)
+            weights = np.log1p(counts)
+            norm = np.sqrt(np.dot(weights, weights))
+            indices.append(ids)
+            values.append(weights / norm if norm else weights)
+            indptr.append(indptr[-1] + len(ids))
+        return (np.array(indptr, dtype=np.int64),
+                np.concatenate(indices).astype(np.int64) if indices else np.zeros(0, dtype=np.int64),
+                np.concatenate(values).astype(np.float32) if values else np.zeros(0, dtype=np.float32))
+
+    def _decision(self, matrix: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+        indptr, indices, values = matrix
+        products = np.zeros(len(indptr) - 1, dtype=np.float64)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        np.add.at(products, rows, self.weights[indices] * values)
+        return products + self.bias
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """
+        Args:
+            texts (List[str]): Input texts
+
+        Returns:
+            np.ndarray: AI probability (0-1) of each text
+        """
+        if not texts:
+            return np.zeros(0)
+        return _sigmoid(self._decision(self.features(texts)))
+
+    def fit(self, texts: List[str], targets: List[float], epochs: int = 30, batch_size: int = 64,
+            learning_rate: float = 0.05, l2: float = 1e-6, seed: int = 0) -> "HashedNgramModel":
+        """
+        Train with mini-batch Adam on cross-entropy against soft targets.
+
+        Args:
+            texts (List[str]): Training texts
+            targets (List[float]): Transformer AI probability (0-1) of each text
+            epochs (int): Passes over the data
+            batch_size (int): Texts per update
+            learning_rate (float): Adam step size
+            l2 (float): L2 penalty on the weights
+            seed (int): Shuffling seed
+
+        Returns:
+            HashedNgramModel: self
+        """
+        indptr, indices, values = self.features(texts)
+        targets = np.asarray(targets, dtype=np.float64)
+        rng = np.random.default_rng(seed)
+        moments = np.zeros((2, self.dimensions), dtype=np.float32)
+        bias_moments = [0.0, 0.0]
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+        step = 0
+
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                # Slice the batch's rows out of the CSR matrix
+                spans = [np.arange(indptr[row], indptr[row + 1]) for row in batch]
+                positions = np.concatenate(spans)
+                batch_matrix = (np.concatenate([[0], np.cumsum([len(span) for span in spans])]),
+                                indices[positions], values[positions])
+                errors = _sigmoid(self._decision(batch_matrix)) - targets[batch]
+
+                rows = np.repeat(np.arange(len(batch)), np.diff(batch_matrix[0]))
+                gradient = np.zeros(self.dimensions, dtype=np.float32)
+                np.add.at(gradient, batch_matrix[1], batch_matrix[2] * errors[rows] / len(batch))
+                gradient += l2 * self.weights
+                bias_gradient = float(errors.mean())
+
+                step += 1
+                moments[0] = beta1 * moments[0] + (1 - beta1) * gradient
+                moments[1] = beta2 * moments[1] + (1 - beta2) * gradient ** 2
+                bias_moments[0] = beta1 * bias_moments[0] + (1 - beta1) * bias_gradient
+                bias_moments[1] = beta2 * bias_moments[1] + (1 - beta2) * bias_gradient ** 2
+                correction = np.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+                self.weights -= learning_rate * correction * moments[0] / (np.sqrt(moments[1]) + epsilon)
+                self.bias -= learning_rate * correction * bias_moments[0] / (np.sqrt(bias_moments[1]) + epsilon)
+        return self
+
+    def save(self, path: str) -> None:
+        """
+        Args:
+            path (str): Destination .npz file
+        """
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, weights=self.weights, bias=np.float64(self.bias),
+                                dimensions=np.int64(self.dimensions), max_ngram=np.int64(self.max_ngram))
+
+    @classmethod
+    def load(cls, path: str) -> "HashedNgramModel":
+        """
+        Args:
+            path (str): File written by save()
+
+        Returns:
+            HashedNgramModel: The trained model
+        """
+        with np.load(path) as data:
+            model = cls(int(data['dimensions']), int(data['max_ngram']))
+            model.weights = data['weights'].astype(np.float32)
+            model.bias = float(data['bias'])
+        return model
+
+
+def escalate(probabilities: np.ndarray, ai_threshold: float, human_threshold: float,
+             margin: float) -> np.ndarray:
+    """
+    Decide which texts the pre-classifier must hand on to the transformer.
+
+    Args:
+        probabilities (np.ndarray): Pre-classifier AI probability (0-1) of each text
+        ai_threshold (float): AI probability above which a text is "AI Generated"
+        human_threshold (float): Human probability above which a text is "Human Written"
+        margin (float): How far beyond a threshold the pre-classifier must be
+                        for its answer to be kept
+
+    Returns:
+        np.ndarray: True for every text that needs the transformer
+    """
+    confident_ai = probabilities > ai_threshold + margin
+    confident_human = 1 - probabilities > human_threshold + margin
+    return ~(confident_ai | confident_human)
+
+
+def agreement(labels: List[str], reference: List[str], mask: Optional[np.ndarray] = None) -> Optional[float]:
+    """
+    Args:
+        labels (List[str]): Classifications to check
+        reference (List[str]): Classifications of the full model
+        mask (Optional[np.ndarray]): Only compare where True
+
+    Returns:
+        Optional[float]: Share of texts with the same classification (None if none compared)
+    """
+    pairs = [(label, expected) for index, (label, expected) in enumerate(zip(labels, reference))
+             if mask is None or mask[index]]
+    if not pairs:
+        return None
+    return sum(label == expected for label, expected in pairs) / len(pairs)
@@ -0,0 +1,898 @@
+"""
+Headless command-line interface for the detector.
+
+Usage:
+    python -m detector score in.jsonl -o out.jsonl --workers 8
+    python -m detector serve --port 8000
+    python -m detector train-cascade texts.jsonl
+    python -m detector cascade-report texts.jsonl
+    python -m detector distill corpus.jsonl -o ./student --layers 6
+    python -m detector reclassify texts.jsonl --ai-threshold 0.8 --human-threshold 0.6
+    python -m detector evaluate labeled.jsonl --metric f1 -o report.json --config thresholds.py
+
+The score command streams a CSV, TXT or JSONL file (same formats as the
+bulk upload tab) through app.analyze_texts. Rows are sent in chunks to a
+pool of worker processes, each with its own model and a fixed number of
+torch threads, and results are written in input order as JSON lines as soon
+as they are ready. Throughput is reported on stderr.
+
+The serve command starts the HTTP service in detector.server.
+
+The train-cascade command scores a file of texts with the transformer and
+trains the cascade's pre-classifier (detector.cascade) on those scores.
+cascade-report measures a trained pre-classifier against the transformer:
+escalation rate, throughput gain and agreement.
+
+The distill command trains a smaller student detector on the current
+model's predictions over a local corpus (detector.distill), saves it as a
+checkpoint MODEL_NAME can point at, and compares it with the teacher.
+
+The reclassify command re-reads a corpus under other thresholds, confidence
+bands or window aggregation. Raw logits come from the logit store
+(detector.logits); only texts not stored yet go through the model, so
+repeated runs over the same corpus are pure NumPy.
+
+The evaluate command measures the detector on a labeled JSONL file
+(accuracy, precision/recall, ROC/AUC, throughput) and searches every
+AI_THRESHOLD/HUMAN_THRESHOLD pair on a grid for the one that maximizes a
+metric, emitting it as a candidate config. Texts are scored through the
+logit store as for reclassify.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Per-process state set by _init_worker
+_classifier = None
+_app = None
+
+
+def quiet_streamlit_logging() -> None:
+    """
+    Silence Streamlit's bare-mode warnings (e.g. "missing ScriptRunContext").
+
+    app.py's cached functions work outside `streamlit run` but log a warning
+    from every thread that calls them. Call this after importing app.
+    """
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def _init_worker(threads: int, model_name: Optional[str]) -> None:
+    """
+    Prepare a worker process: limit torch threads and load the model once.
+
+    Args:
+        threads (int): Intra-op threads for this worker
+        model_name (Optional[str]): Overrides app.MODEL_NAME when given
+    """
+    global _classifier, _app
+
+    # Must happen before torch spins up its thread pools
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+
+    _app = _configure_app(model_name)
+    _classifier = _app.load_model()
+
+
+def _configure_app(model_name: Optional[str]):
+    """
+    Import app and apply the settings every scoring process shares.
+
+    Args:
+        model_name (Optional[str]): Overrides app.MODEL_NAME when given
+
+    Returns:
+        The configured app module
+    """
+    import app
+    quiet_streamlit_logging()
+
+    if model_name:
+        app.use_model(model_name)
+    # Workers are already one process each; a replica pool per worker would oversubscribe
+    app.MODEL_REPLICAS = 1
+    return app
+
+
+def _score_chunk(chunk: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    """
+    Score one chunk of rows in the current worker.
+
+    Args:
+        chunk (List[Tuple[int, str]]): (row number, text) pairs
+
+    Returns:
+        List[Dict[str, Any]]: analyze_texts results with a leading 'row' key
+    """
+    results = _app.analyze_texts([text for _, text in chunk], _classifier)
+    return [{'row': row_number, **result} for (row_number, _), result in zip(chunk, results)]
+
+
+def _score_in_order(chunks: Iterator[List[Tuple[int, str]]], workers: int,
+                    threads: int, model_name: Optional[str]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Score chunks on a process pool and yield their results in input order.
+
+    At most two chunks per worker are in flight, so the input is read only
+    as fast as it is scored and memory stays bounded.
+
+    Args:
+        chunks (Iterator[List[Tuple[int, str]]]): Chunks of (row number, text)
+        workers (int): Number of worker processes; 1 scores in this process
+        threads (int): Torch threads per worker
+        model_name (Optional[str]): Overrides app.MODEL_NAME when given
+
+    Yields:
+        List[Dict[str, Any]]: Results for each chunk
+    """
+    if workers <= 1:
+        _init_worker(threads, model_name)
+        for chunk in chunks:
+            yield _score_chunk(chunk)
+        return
+
+    # Snapshot and export once here: workers starting on a cold cache would
+    # all download and write the same directories at once. The parent does
+    # not score, so its copy is released before the workers load theirs.
+    app = _configure_app(model_name)
+    app.load_model()
+    app.load_model.clear()
+
+    # spawn: forking a process that already initialized torch can deadlock
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                             initializer=_init_worker, initargs=(threads, model_name)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def score_command(args: argparse.Namespace) -> int:
+    """
+    Run the score subcommand.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    import app
+    quiet_streamlit_logging()
+
+    workers = max(args.workers, 1)
+    threads = args.threads or max((os.cpu_count() or 1) // workers, 1)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+
+    print(f"Scoring {args.input} with {workers} worker(s) x {threads} thread(s)", file=sys.stderr)
+    rows = 0
+    skipped = []
+    start_time = time.perf_counter()
+    try:
+        with open(args.input, 'rb') as source:
+            chunks = app._chunked(app._iter_upload_rows(source, skipped), args.chunk_size or app.BULK_CHUNK_SIZE)
+            for results in _score_in_order(chunks, workers, threads, args.model):
+                for result in results:
+                    output.write(json.dumps(result, ensure_ascii=False) + '\n')
+                output.flush()
+                rows += len(results)
+                elapsed = time.perf_counter() - start_time
+                print(f"\r{rows} rows · {rows / elapsed:.1f} rows/sec · {len(skipped)} skipped", end='',
+                      file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\nDone: {rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.1f} rows/sec, "
+          f"{rows / max(elapsed, 1e-9) / (workers * threads):.2f} rows/sec/core)", file=sys.stderr)
+    if skipped:
+        print(f"⚠️ Skipped {len(skipped)} malformed row(s) (first: row {skipped[0]})", file=sys.stderr)
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    """
+    Run the serve subcommand: load the model and start the HTTP service.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    import uvicorn
+    import app
+    from detector.server import create_app
+    quiet_streamlit_logging()
+
+    if args.model:
+        app.use_model(args.model)
+    if args.replicas:
+        app.MODEL_REPLICAS = args.replicas
+    if args.threads:
+        app.THREADS_PER_REPLICA = args.threads
+    service = create_app(
+        app.load_model(),
+        max_wait_ms=app.MICROBATCH_MAX_WAIT_MS if args.max_wait_ms is None else args.max_wait_ms,
+        max_batch_texts=args.max_batch or app.MICROBATCH_MAX_TEXTS
+    )
+    uvicorn.run(service, host=args.host, port=args.port)
+    return 0
+
+
+def _read_texts(path: str, limit: Optional[int] = None) -> List[str]:
+    """Read the texts of a CSV, TXT or JSONL file (same formats as the score command)."""
+    import app
+    skipped = []
+    with open(path, 'rb') as source:
+        texts = [app._normalize_text(text) for _, text in app._iter_upload_rows(source, skipped)]
+    if skipped:
+        print(f"⚠️ Skipped {len(skipped)} malformed row(s) in {path} (first: row {skipped[0]})", file=sys.stderr)
+    return texts[:limit] if limit else texts
+
+
+def _cascade_report(cascade, texts: List[str], classifier) -> Dict[str, Any]:
+    """
+    Score texts with and without the cascade and compare.
+
+    Args:
+        cascade (detector.cascade.HashedNgramModel): Trained pre-classifier
+        texts (List[str]): Normalized texts
+        classifier: Loaded transformer (pipeline, OnnxClassifier or ModelPool)
+
+    Returns:
+        dict: texts, escalation_rate, full_texts_per_second,
+              cascade_texts_per_second, speedup, agreement (all texts) and
+              answered_agreement (texts the pre-classifier answered)
+    """
+    import app
+    from detector.cascade import agreement
+
+    def score(subset):
+        return app._dispatch(app._analyze_batch, classifier, subset, aggregation=app.WINDOW_AGGREGATION,
+                             batch_size=app.BATCH_SIZE, windowed=app.ENABLE_WINDOWING)
+
+    # Warm up both paths so one-off allocation costs are not measured
+    score(texts[:4])
+    app._apply_cascade(texts[:4], cascade)
+
+    start = time.perf_counter()
+    full = score(texts)
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    answered, escalated = app._apply_cascade(texts, cascade)
+    escalated_results = score([texts[index] for index in escalated]) if escalated else []
+    cascade_seconds = time.perf_counter() - start
+
+    labels = [None] * len(texts)
+    for index, result in answered.items():
+        labels[index] = result['classification']
+    for index, result in zip(escalated, escalated_results):
+        labels[index] = result['classification']
+    reference = [result['classification'] for result in full]
+    answered_mask = [index in answered for index in range(len(texts))]
+    return {
+        'texts': len(texts),
+        'escalation_rate': len(escalated) / len(texts),
+        'full_texts_per_second': len(texts) / full_seconds,
+        'cascade_texts_per_second': len(texts) / cascade_seconds,
+        'speedup': full_seconds / cascade_seconds,
+        'agreement': agreement(labels, reference),
+        'answered_agreement': agreement(labels, reference, answered_mask)
+    }
+
+
+def _print_cascade_report(report: Dict[str, Any]) -> None:
+    """Print a _cascade_report result to stderr."""
+    answered_agreement = report['answered_agreement']
+    print(f"Texts: {report['texts']} | Escalated to the transformer: {report['escalation_rate']:.1%}\n"
+          f"Throughput: {report['full_texts_per_second']:.1f} texts/sec transformer only, "
+          f"{report['cascade_texts_per_second']:.1f} texts/sec with the cascade ({report['speedup']:.2f}x)\n"
+          f"Agreement with the transformer: {report['agreement']:.1%} overall, "
+          + (f"{answered_agreement:.1%} on texts the pre-classifier answered"
+             if answered_agreement is not None else "no texts answered by the pre-classifier"),
+          file=sys.stderr)
+
+
+def train_cascade_command(args: argparse.Namespace) -> int:
+    """
+    Run the train-cascade subcommand: label texts with the transformer, then fit the pre-classifier.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    import random
+    import app
+    from detector.cascade import HashedNgramModel
+    quiet_streamlit_logging()
+
+    if args.model:
+        app.use_model(args.model)
+    if args.margin is not None:
+        app.CASCADE_MARGIN = args.margin
+    # Targets must be the transformer's own scores
+    app.ENABLE_CASCADE = False
+    app.NEAR_DUPLICATE_MODE = "off"
+    output = args.output or app.CASCADE_MODEL_PATH
+
+    texts = _read_texts(args.input)
+    if len(texts) < 10:
+        print("❌ Need at least 10 texts to train and evaluate the pre-classifier", file=sys.stderr)
+        return 1
+    random.Random(0).shuffle(texts)
+    holdout = max(int(len(texts) * args.holdout), 1)
+    train_texts, test_texts = texts[holdout:], texts[:holdout]
+
+    classifier = app.load_model()
+    print(f"Scoring {len(train_texts)} training texts with the transformer...", file=sys.stderr)
+    targets = []
+    for chunk in app._chunked(train_texts, app.BULK_CHUNK_SIZE):
+        targets.extend(result['ai_probability'] / 100 for result in app.analyze_texts(chunk, classifier))
+        print(f"\r{len(targets)}/{len(train_texts)}", end='', file=sys.stderr)
+
+    print(f"\nTraining the pre-classifier ({args.epochs} epochs)...", file=sys.stderr)
+    cascade = HashedNgramModel(dimensions=2 ** args.hash_bits).fit(train_texts, targets, epochs=args.epochs)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    cascade.save(output)
+    print(f"Saved to {output}\nHeld-out evaluation:", file=sys.stderr)
+    _print_cascade_report(_cascade_report(cascade, test_texts, classifier))
+    return 0
+
+
+def cascade_report_command(args: argparse.Namespace) -> int:
+    """
+    Run the cascade-report subcommand.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    import app
+    from detector.cascade import HashedNgramModel
+    quiet_streamlit_logging()
+
+    if args.model:
+        app.use_model(args.model)
+    if args.margin is not None:
+        app.CASCADE_MARGIN = args.margin
+    texts = _read_texts(args.input, args.limit)
+    if not texts:
+        print("❌ No texts to evaluate", file=sys.stderr)
+        return 1
+    cascade = HashedNgramModel.load(args.cascade or app.CASCADE_MODEL_PATH)
+    classifier = app.load_model()
+    report = _cascade_report(cascade, texts, classifier)
+    _print_cascade_report(report)
+    print(json.dumps(report))
+    return 0
+
+
+def _distillation_report(models: Dict[str, Any], tokenizer, texts: List[str],
+                         latency_texts: int) -> Dict[str, Any]:
+    """
+    Compare models on held-out texts, scoring them as app.analyze_texts does.
+
+    Args:
+        models (Dict[str, Any]): "teacher" and "student" sequence classification models
+        tokenizer: Their shared tokenizer
+        texts (List[str]): Normalized held-out texts
+        latency_texts (int): Texts scored one at a time for the latency figures
+
+    Returns:
+        dict: Per model: parameters_mb, texts_per_second (batched),
+              p50_ms and p95_ms (one text per call); plus agreement
+              (same classification) and mean_abs_difference (AI probability points)
+    """
+    import numpy as np
+    import app
+    from transformers import pipeline
+    from detector.memory import parameter_bytes
+
+    def score(classifier, subset, batch_size):
+        return app._analyze_batch(subset, classifier, app.WINDOW_AGGREGATION, batch_size, app.ENABLE_WINDOWING)
+
+    report = {}
+    results = {}
+    for name, model in models.items():
+        classifier = pipeline(task=app.TASK, model=model, tokenizer=tokenizer, device=-1)
+        score(classifier, texts[:2], app.BATCH_SIZE)  # Warm-up
+        start = time.perf_counter()
+        results[name] = score(classifier, texts, app.BATCH_SIZE)
+        seconds = time.perf_counter() - start
+        latencies = []
+        for text in texts[:latency_texts]:
+            start = time.perf_counter()
+            score(classifier, [text], None)
+            latencies.append((time.perf_counter() - start) * 1000)
+        report[name] = {
+            'parameters_mb': round(parameter_bytes(model) / (1024 * 1024), 1),
+            'texts_per_second': round(len(texts) / seconds, 2),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 1),
+            'p95_ms': round(float(np.percentile(latencies, 95)), 1)
+        }
+
+    pairs = list(zip(results['teacher'], results['student']))
+    report['agreement'] = sum(t['classification'] == s['classification'] for t, s in pairs) / len(pairs)
+    report['mean_abs_difference'] = sum(abs(t['ai_probability'] - s['ai_probability']) for t, s in pairs) / len(pairs)
+    return report
+
+
+def distill_command(args: argparse.Namespace) -> int:
+    """
+    Run the distill subcommand: train, save and evaluate a student detector.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    import random
+    import app
+    from transformers import AutoModelForSequenceClassification
+    from detector.distill import distill, save_student
+    from detector.snapshot import create_snapshot, has_snapshot, load_snapshot
+    quiet_streamlit_logging()
+
+    if args.model:
+        app.use_model(args.model)
+    texts = _read_texts(args.input, args.limit)
+    if len(texts) < 10:
+        print("❌ Need at least 10 texts to train and evaluate a student", file=sys.stderr)
+        return 1
+    random.Random(0).shuffle(texts)
+    holdout = max(int(len(texts) * args.holdout), 1)
+    train_texts, test_texts = texts[holdout:], texts[:holdout]
+
+    if not has_snapshot(app.MODEL_SNAPSHOT_DIR, app.MODEL_REVISION):
+        create_snapshot(app.MODEL_NAME, app.MODEL_SNAPSHOT_DIR, revision=app.MODEL_REVISION,
+                        cache_dir=app.MODEL_CACHE_DIR)
+    teacher, tokenizer = load_snapshot(app.MODEL_SNAPSHOT_DIR)
+
+    print(f"Distilling {app.MODEL_NAME} into {args.layers} layer(s) on {len(train_texts)} texts...",
+          file=sys.stderr)
+    student = distill(teacher, tokenizer, train_texts, layers=args.layers, hidden_size=args.hidden_size,
+                      epochs=args.epochs, batch_size=args.batch_size, learning_rate=args.learning_rate,
+                      temperature=args.temperature, max_length=args.max_length,
+                      progress=lambda epoch, epochs, loss: print(f"Epoch {epoch}/{epochs}: loss {loss:.4f}",
+                                                                 file=sys.stderr))
+    save_student(student, tokenizer, args.output, details={
+        'teacher': app.MODEL_NAME, 'texts': len(train_texts), 'epochs': args.epochs,
+        'temperature': args.temperature, 'max_length': args.max_length
+    })
+
+    # Evaluate the saved checkpoint, exactly as load_model() will read it
+    student = AutoModelForSequenceClassification.from_pretrained(args.output)
+    report = _distillation_report({'teacher': teacher, 'student': student}, tokenizer, test_texts,
+                                  args.latency_texts)
+    with open(os.path.join(args.output, "distillation_report.json"), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'Model':<8} {'Params (MB)':>12} {'Texts/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9}", file=sys.stderr)
+    for name in ('teacher', 'student'):
+        row = report[name]
+        print(f"{name:<8} {row['parameters_mb']:>12.1f} {row['texts_per_second']:>9.1f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f}", file=sys.stderr)
+    print(f"Agreement with the teacher: {report['agreement']:.1%} "
+          f"(mean AI probability difference {report['mean_abs_difference']:.1f} points)\n"
+          f"Student saved to {args.output}; serve it with app.MODEL_NAME = \"{args.output}\"", file=sys.stderr)
+    return 0
+
+
+def _distribution(codes, names) -> Dict[str, int]:
+    """Count integer codes by name."""
+    import numpy as np
+    counts = np.bincount(codes, minlength=len(names))
+    return {name: int(count) for name, count in zip(names, counts)}
+
+
+def reclassify_command(args: argparse.Namespace) -> int:
+    """
+    Run the reclassify subcommand: compare classifications under current and new settings from stored logits.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    import app
+    from detector.evaluation import (CLASSIFICATIONS, CONFIDENCE_LEVELS, classify, confidence_levels,
+                                     confusion_matrix)
+    quiet_streamlit_logging()
+
+    if args.model:
+        app.use_model(args.model)
+    texts = _read_texts(args.input, args.limit)
+    if not texts:
+        print("❌ No texts to reclassify", file=sys.stderr)
+        return 1
+    classifier = app.load_model()
+    store = app.open_logit_store(classifier)
+
+    start = time.perf_counter()
+    stored_before = len(store)
+    rows = []
+    for chunk in app._chunked(texts, args.chunk_size):
+        rows.extend(app.record_logits(chunk, classifier, store))
+    scoring_seconds = time.perf_counter() - start
+    newly_scored = len(store) - stored_before
+
+    start = time.perf_counter()
+    settings = {
+        'current': {'ai_threshold': app.AI_THRESHOLD, 'human_threshold': app.HUMAN_THRESHOLD,
+                    'high_confidence': app.HIGH_CONFIDENCE, 'medium_confidence': app.MEDIUM_CONFIDENCE,
+                    'aggregation': app.WINDOW_AGGREGATION},
+    }
+    settings['new'] = {
+        'ai_threshold': args.ai_threshold if args.ai_threshold is not None else app.AI_THRESHOLD,
+        'human_threshold': args.human_threshold if args.human_threshold is not None else app.HUMAN_THRESHOLD,
+        'high_confidence': args.high_confidence if args.high_confidence is not None else app.HIGH_CONFIDENCE,
+        'medium_confidence': args.medium_confidence if args.medium_confidence is not None else app.MEDIUM_CONFIDENCE,
+        'aggregation': args.aggregation or app.WINDOW_AGGREGATION
+    }
+    codes = {}
+    report: Dict[str, Any] = {'texts': len(texts), 'store': store.directory, 'newly_scored': newly_scored,
+                              'scoring_seconds': scoring_seconds}
+    for name, setting in settings.items():
+        probabilities = store.probabilities(rows, setting['aggregation'])
+        codes[name] = classify(probabilities, setting['ai_threshold'], setting['human_threshold'])
+        confidence = confidence_levels(probabilities, setting['high_confidence'], setting['medium_confidence'])
+        report[name] = dict(setting, classifications=_distribution(codes[name], CLASSIFICATIONS),
+                            confidence_levels=_distribution(confidence, CONFIDENCE_LEVELS))
+    matrix = confusion_matrix(codes['current'], codes['new'], len(CLASSIFICATIONS))
+    report['changed'] = int(len(texts) - matrix.trace())
+    report['transitions'] = {f"{CLASSIFICATIONS[before]} -> {CLASSIFICATIONS[after]}": int(matrix[before, after])
+                             for before in range(len(CLASSIFICATIONS)) for after in range(len(CLASSIFICATIONS))
+                             if before != after and matrix[before, after]}
+    report['reclassify_seconds'] = time.perf_counter() - start
+
+    print(f"Texts: {len(texts)} | Scored by the model: {newly_scored} in {scoring_seconds:.1f}s | "
+          f"Reclassified from stored logits in {report['reclassify_seconds'] * 1000:.1f} ms", file=sys.stderr)
+    print("\n" + f"{'Current / new':<18}" + "".join(f"{name:>18}" for name in CLASSIFICATIONS), file=sys.stderr)
+    for before, name in enumerate(CLASSIFICATIONS):
+        print(f"{name:<18}" + "".join(f"{int(count):>18}" for count in matrix[before]), file=sys.stderr)
+    print(f"\n{report['changed']} of {len(texts)} texts change classification", file=sys.stderr)
+    print(json.dumps(report))
+    return 0
+
+
+def _read_labeled(path: str, text_field: str, label_field: str,
+                  limit: Optional[int] = None) -> Tuple[List[str], List[bool]]:
+    """
+    Read texts and labels from a JSONL file.
+
+    Args:
+        path (str): One {"text": ..., "label": "ai" | "human"} object per line
+                    (1/0 and true/false are accepted as labels too)
+        text_field (str): Key holding the text
+        label_field (str): Key holding the label
+        limit (Optional[int]): Read only the first N texts
+
+    Returns:
+        Tuple[List[str], List[bool]]: Texts and whether each is AI-written
+
+    Raises:
+        ValueError: If a line has no text or an unknown label
+    """
+    labels = {'ai': True, 'human': False, '1': True, '0': False, 'true': True, 'false': False}
+    texts, positives = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            label = str(record.get(label_field)).strip().lower()
+            if not isinstance(record.get(text_field), str) or label not in labels:
+                raise ValueError(f"Line {number}: expected a '{text_field}' string and a '{label_field}' "
+                                 f"of ai/human, got {record.get(label_field)!r}")
+            texts.append(record[text_field])
+            positives.append(labels[label])
+            if limit and len(texts) >= limit:
+                break
+    return texts, positives
+
+
+def _print_evaluation(report: Dict[str, Any]) -> None:
+    """Print an evaluate report to stderr."""
+    throughput = report['throughput']
+    scored_rate = throughput['scored_texts_per_second']
+    print(f"Texts: {report['texts']} ({report['ai_texts']} AI, {report['human_texts']} human) | "
+          f"Scored by the model: {throughput['scored_texts']}"
+          + (f" at {scored_rate:.1f} texts/sec" if scored_rate else " (all read from the logit store)")
+          + (f" | Answered by the cascade: {report['cascade_texts']}" if report['cascade_texts'] else "")
+          + f" | Evaluated at {throughput['evaluated_texts_per_second']:,.0f} texts/sec", file=sys.stderr)
+    print(f"ROC AUC: {report['auc']:.4f}", file=sys.stderr)
+    print(f"\n{'Thresholds (AI / human)':<26} {'Accuracy':>9} {'Coverage':>9} {'AI prec':>8} {'AI rec':>8} "
+          f"{'Hum prec':>9} {'Hum rec':>8} {'F1':>7}", file=sys.stderr)
+    for name in ('current', 'best'):
+        row = report[name]
+        if row is None:
+            continue
+        label = f"{name}: {row['ai_threshold']:.2f} / {row['human_threshold']:.2f}"
+        print(f"{label:<26} {row['accuracy']:>9.1%} {row['coverage']:>9.1%} {row['ai_precision']:>8.1%} "
+              f"{row['ai_recall']:>8.1%} {row['human_precision']:>9.1%} {row['human_recall']:>8.1%} "
+              f"{row['f1']:>7.3f}", file=sys.stderr)
+    if report['candidate_config']:
+        print(f"\nCandidate config (best {report['metric']}):\n{report['candidate_config']}", file=sys.stderr)
+    else:
+        print(f"\nNo threshold pair reaches a coverage of {report['min_coverage']:.0%}", file=sys.stderr)
+
+
+def evaluate_command(args: argparse.Namespace) -> int:
+    """
+    Run the evaluate subcommand: score a labeled file and calibrate the thresholds.
+
+    Texts are scored as the app would score them: with ENABLE_CASCADE the
+    pre-classifier answers the clear-cut ones (chosen at the current
+    thresholds), the rest go to the model. A single model's logits are kept
+    in the logit store for later runs; an ensemble is scored from scratch
+    every run.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    import shutil
+    import tempfile
+    import numpy as np
+    import app
+    from detector.evaluation import auc, roc_curve, sweep_thresholds, threshold_metrics
+    quiet_streamlit_logging()
+
+    if args.model:
+        app.use_model(args.model)
+    try:
+        texts, positives = _read_labeled(args.input, args.text_field, args.label_field, args.limit)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    positives = np.array(positives, dtype=bool)
+    if positives.all() or not positives.any():
+        print("❌ Need both AI and human texts to evaluate", file=sys.stderr)
+        return 1
+    aggregation = args.aggregation or app.WINDOW_AGGREGATION
+    # An ensemble's members have logits of their own, so there is nothing to store
+    ensemble = bool(app.ENSEMBLE_MODELS)
+    if args.fresh and not ensemble:
+        # Every text goes through the model, so throughput is measured end to end
+        app.LOGIT_STORE_DIR = tempfile.mkdtemp(prefix="detector-logits-")
+    try:
+        try:
+            cascade = app.load_cascade()
+        except FileNotFoundError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        classifier = app.load_model()
+        start = time.perf_counter()
+        # The cascade answers clear-cut texts as the app does; its escalation depends on the current thresholds
+        normalized = [app._normalize_text(text) for text in texts]
+        answered, escalated = app._apply_cascade(normalized, cascade)
+        escalated_texts = [normalized[index] for index in escalated]
+        if ensemble:
+            escalated_probabilities = []
+            for chunk in app._chunked(escalated_texts, args.chunk_size):
+                results = app._dispatch(app._analyze_batch, classifier, chunk, aggregation=aggregation,
+                                        batch_size=app.BATCH_SIZE, windowed=app.ENABLE_WINDOWING)
+                escalated_probabilities.extend(result['ai_probability'] / 100 for result in results)
+            scored = len(escalated_texts)
+        else:
+            store = app.open_logit_store(classifier)
+            stored_before = len(store)
+            rows = []
+            for chunk in app._chunked(escalated_texts, args.chunk_size):
+                rows.extend(app.record_logits(chunk, classifier, store))
+            scored = len(store) - stored_before
+        scoring_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if not ensemble:
+            escalated_probabilities = store.probabilities(np.array(rows, dtype=np.int64), aggregation)
+        probabilities = np.empty(len(texts))
+        probabilities[escalated] = escalated_probabilities
+        for index, result in answered.items():
+            probabilities[index] = result['ai_probability'] / 100
+        fpr, tpr, _ = roc_curve(probabilities, positives)
+        grid = np.round(np.arange(args.grid_min, 1.0, args.grid_step), 6)
+        best = sweep_thresholds(probabilities, positives, grid, args.metric, args.min_coverage)
+        current = threshold_metrics(probabilities, positives, app.AI_THRESHOLD, app.HUMAN_THRESHOLD)
+        best_metrics = (threshold_metrics(probabilities, positives, best['ai_threshold'], best['human_threshold'])
+                        if best['ai_threshold'] is not None else None)
+        evaluation_seconds = time.perf_counter() - start
+    finally:
+        if args.fresh and not ensemble:
+            shutil.rmtree(app.LOGIT_STORE_DIR, ignore_errors=True)
+
+    report: Dict[str, Any] = {
+        'texts': len(texts),
+        'ai_texts': int(positives.sum()),
+        'human_texts': int((~positives).sum()),
+        'model': app.MODEL_NAME,
+        'ensemble': [spec['name'] for spec in app._ensemble_specs()] or None,
+        'cascade_texts': len(answered),
+        'aggregation': aggregation,
+        'metric': args.metric,
+        'min_coverage': args.min_coverage,
+        'auc': auc(fpr, tpr),
+        # ROC curve at 101 evenly spaced false positive rates, small enough for any corpus size
+        'roc': {'fpr': np.linspace(0, 1, 101).round(2).tolist(),
+                'tpr': np.interp(np.linspace(0, 1, 101), fpr, tpr).tolist()},
+        'current': dict(current, ai_threshold=app.AI_THRESHOLD, human_threshold=app.HUMAN_THRESHOLD),
+        'best': dict(best_metrics, ai_threshold=best['ai_threshold'], human_threshold=best['human_threshold'])
+                if best_metrics else None,
+        'candidate_config': (f"AI_THRESHOLD = {best['ai_threshold']:.2f}\n"
+                             f"HUMAN_THRESHOLD = {best['human_threshold']:.2f}")
+                            if best_metrics else None,
+        'throughput': {
+            'scored_texts': scored,
+            'scoring_seconds': scoring_seconds,
+            'scored_texts_per_second': scored / scoring_seconds if scored else None,
+            'evaluation_seconds': evaluation_seconds,
+            'evaluated_texts_per_second': len(texts) / max(evaluation_seconds, 1e-9)
+        }
+    }
+    _print_evaluation(report)
+
+    if args.config and report['candidate_config']:
+        with open(args.config, 'w', encoding='utf-8') as f:
+            f.write(f"# Best {args.metric} on {args.input} ({len(texts)} texts), "
+                    f"coverage {best['coverage']:.1%}\n{report['candidate_config']}\n")
+        print(f"📄 Candidate config written to {args.config}", file=sys.stderr)
+    if args.output == "-":
+        print(json.dumps(report))
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.output}", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser with one subparser per command."""
+    parser = argparse.ArgumentParser(prog="python -m detector",
+                                     description="AI vs Human Text Detector (headless)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="Score every row of a CSV, TXT or JSONL file")
+    score.add_argument("input", help="Input file (.csv with a 'text' column, .jsonl with a "
+                                     "'text' field, or .txt with one text per line)")
+    score.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout)")
+    score.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    score.add_argument("--threads", type=int, default=None,
+                       help="Torch threads per worker (default: CPU cores / workers)")
+    score.add_argument("--chunk-size", type=int, default=None,
+                       help="Rows sent to a worker at a time (default: app.BULK_CHUNK_SIZE)")
+    score.add_argument("--model", default=None, help="Hub name or local path (default: app.MODEL_NAME)")
+    score.set_defaults(handler=score_command)
+
+    serve = commands.add_parser("serve", help="Start the HTTP inference service")
+    serve.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    serve.add_argument("--max-wait-ms", type=float, default=None,
+                       help="Micro-batching wait window (default: app.MICROBATCH_MAX_WAIT_MS)")
+    serve.add_argument("--max-batch", type=int, default=None,
+                       help="Texts per coalesced batch (default: app.MICROBATCH_MAX_TEXTS)")
+    serve.add_argument("--replicas", type=int, default=None,
+                       help="Model replica processes, each on its own cores (default: app.MODEL_REPLICAS)")
+    serve.add_argument("--threads", type=int, default=None,
+                       help="Torch threads per replica (default: CPU cores / replicas)")
+    serve.add_argument("--model", default=None, help="Hub name or local path (default: app.MODEL_NAME)")
+    serve.set_defaults(handler=serve_command)
+
+    train = commands.add_parser("train-cascade",
+                                help="Train the cascade pre-classifier on the transformer's scores of a file")
+    train.add_argument("input", help="Training texts (.csv, .jsonl or .txt, as for score)")
+    train.add_argument("-o", "--output", default=None, help="Model file (default: app.CASCADE_MODEL_PATH)")
+    train.add_argument("--holdout", type=float, default=0.2,
+                       help="Share of texts kept back for the evaluation report (default: 0.2)")
+    train.add_argument("--epochs", type=int, default=30, help="Training passes (default: 30)")
+    train.add_argument("--hash-bits", type=int, default=18, help="Hashed feature space size in bits (default: 18)")
+    train.add_argument("--margin", type=float, default=None,
+                       help="Escalation margin for the report (default: app.CASCADE_MARGIN)")
+    train.add_argument("--model", default=None, help="Hub name or local path (default: app.MODEL_NAME)")
+    train.set_defaults(handler=train_cascade_command)
+
+    report = commands.add_parser("cascade-report",
+                                 help="Escalation rate, throughput gain and agreement of the cascade")
+    report.add_argument("input", help="Evaluation texts (.csv, .jsonl or .txt, as for score)")
+    report.add_argument("--cascade", default=None, help="Model file (default: app.CASCADE_MODEL_PATH)")
+    report.add_argument("--limit", type=int, default=None, help="Evaluate only the first N texts")
+    report.add_argument("--margin", type=float, default=None,
+                        help="Escalation margin (default: app.CASCADE_MARGIN)")
+    report.add_argument("--model", default=None, help="Hub name or local path (default: app.MODEL_NAME)")
+    report.set_defaults(handler=cascade_report_command)
+
+    student = commands.add_parser("distill", help="Train a smaller student detector on the current model's outputs")
+    student.add_argument("input", help="Unlabeled corpus (.csv, .jsonl or .txt, as for score)")
+    student.add_argument("-o", "--output", required=True, help="Directory for the student checkpoint")
+    student.add_argument("--layers", type=int, default=6, help="Encoder layers of the student (default: 6)")
+    student.add_argument("--hidden-size", type=int, default=None,
+                         help="Hidden size of the student (default: the teacher's, which reuses its weights)")
+    student.add_argument("--epochs", type=int, default=3, help="Training passes (default: 3)")
+    student.add_argument("--batch-size", type=int, default=16, help="Texts per update (default: 16)")
+    student.add_argument("--learning-rate", type=float, default=5e-5, help="AdamW learning rate (default: 5e-5)")
+    student.add_argument("--temperature", type=float, default=2.0, help="Distillation temperature (default: 2.0)")
+    student.add_argument("--max-length", type=int, default=256, help="Training tokens per text (default: 256)")
+    student.add_argument("--holdout", type=float, default=0.1,
+                         help="Share of texts kept back for the report (default: 0.1)")
+    student.add_argument("--limit", type=int, default=None, help="Use only the first N texts of the corpus")
+    student.add_argument("--latency-texts", type=int, default=50,
+                         help="Held-out texts timed one at a time (default: 50)")
+    student.add_argument("--model", default=None, help="Teacher: hub name or local path (default: app.MODEL_NAME)")
+    student.set_defaults(handler=distill_command)
+
+    reclassify = commands.add_parser("reclassify",
+                                     help="Reclassify a corpus under new thresholds from stored logits")
+    reclassify.add_argument("input", help="Texts (.csv, .jsonl or .txt, as for score)")
+    reclassify.add_argument("--ai-threshold", type=float, default=None,
+                            help="New AI threshold, 0-1 (default: app.AI_THRESHOLD)")
+    reclassify.add_argument("--human-threshold", type=float, default=None,
+                            help="New human threshold, 0-1 (default: app.HUMAN_THRESHOLD)")
+    reclassify.add_argument("--high-confidence", type=float, default=None,
+                            help="New high confidence band, 0-1 (default: app.HIGH_CONFIDENCE)")
+    reclassify.add_argument("--medium-confidence", type=float, default=None,
+                            help="New medium confidence band, 0-1 (default: app.MEDIUM_CONFIDENCE)")
+    reclassify.add_argument("--aggregation", choices=["mean", "max", "weighted"], default=None,
+                            help="New window aggregation (default: app.WINDOW_AGGREGATION)")
+    reclassify.add_argument("--chunk-size", type=int, default=1024,
+                            help="Texts sent to the model at a time when scoring (default: 1024)")
+    reclassify.add_argument("--limit", type=int, default=None, help="Use only the first N texts")
+    reclassify.add_argument("--model", default=None, help="Hub name or local path (default: app.MODEL_NAME)")
+    reclassify.set_defaults(handler=reclassify_command)
+
+    evaluate = commands.add_parser("evaluate",
+                                   help="Measure accuracy on a labeled JSONL file and calibrate the thresholds")
+    evaluate.add_argument("input", help="Labeled JSONL file: {\"text\": ..., \"label\": \"ai\" | \"human\"} per line")
+    evaluate.add_argument("-o", "--output", default="-", help="Report JSON file (default: stdout)")
+    evaluate.add_argument("--config", default=None,
+                          help="Also write the candidate AI_THRESHOLD/HUMAN_THRESHOLD to this file")
+    evaluate.add_argument("--metric", choices=["accuracy", "balanced_accuracy", "f1"], default="accuracy",
+                          help="Metric the threshold pair is chosen by (default: accuracy)")
+    evaluate.add_argument("--min-coverage", type=float, default=0.0,
+                          help="Least share of texts a threshold pair must not leave Mixed/Uncertain (default: 0)")
+    evaluate.add_argument("--grid-min", type=float, default=0.5, help="Lowest threshold tried (default: 0.5)")
+    evaluate.add_argument("--grid-step", type=float, default=0.01, help="Threshold grid step (default: 0.01)")
+    evaluate.add_argument("--aggregation", choices=["mean", "max", "weighted"], default=None,
+                          help="Window aggregation (default: app.WINDOW_AGGREGATION)")
+    evaluate.add_argument("--text-field", default="text", help="JSON key holding the text (default: text)")
+    evaluate.add_argument("--label-field", default="label", help="JSON key holding the label (default: label)")
+    evaluate.add_argument("--fresh", action="store_true",
+                          help="Score every text with the model instead of reusing stored logits "
+                               "(an ensemble always is)")
+    evaluate.add_argument("--chunk-size", type=int, default=1024,
+                          help="Texts sent to the model at a time when scoring (default: 1024)")
+    evaluate.add_argument("--limit", type=int, default=None, help="Use only the first N texts")
+    evaluate.add_argument("--model", default=None, help="Hub name or local path (default: app.MODEL_NAME)")
+    evaluate.set_defaults(handler=evaluate_command)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and dispatch to the selected command."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
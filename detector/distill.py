@@ -0,0 +1,183 @@
+"""
+Knowledge distillation of the detector into a smaller student model (CPU).
+
+The current detector (the teacher) labels an unlabeled local corpus with
+its logits. A student with fewer layers and/or a smaller hidden size is
+then trained to match the teacher's softened probabilities (KL divergence
+at a temperature, as in DistilBERT). No human labels are needed.
+
+A student as wide as the teacher starts from the teacher's embeddings,
+classifier head and evenly spaced encoder layers, so it needs far less
+training. A narrower student starts from random weights.
+
+The student is saved as an ordinary Hugging Face checkpoint (safetensors
+weights, config and tokenizer), which load_model() serves once MODEL_NAME
+points at it. See python -m detector distill.
+"""
+
+import copy
+import random
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+import torch
+import torch.nn.functional as F
+from transformers import AutoModelForSequenceClassification
+
+_LAYER_PATTERN = re.compile(r'^(.*\.layer\.)(\d+)(\..*)$')
+
+
+def build_student(teacher, layers: int, hidden_size: Optional[int] = None):
+    """
+    Create a smaller model of the teacher's architecture, with the same tokenizer and labels.
+
+    Args:
+        teacher: Teacher sequence classification model
+        layers (int): Encoder layers of the student
+        hidden_size (Optional[int]): Hidden size of the student (default: the teacher's).
+                                     Attention heads keep the teacher's head size.
+
+    Returns:
+        torch.nn.Module: The untrained student
+
+    Raises:
+        ValueError: If layers or hidden_size do not fit the teacher
+    """
+    config = copy.deepcopy(teacher.config)
+    teacher_layers = config.num_hidden_layers
+    if not 1 <= layers <= teacher_layers:
+        raise ValueError(f"layers must be between 1 and the teacher's {teacher_layers}")
+
+    head_size = config.hidden_size // config.num_attention_heads
+    hidden_size = hidden_size or config.hidden_size
+    if hidden_size % head_size:
+        raise ValueError(f"hidden_size must be a multiple of the teacher's head size ({head_size})")
+    same_width = hidden_size == config.hidden_size
+    config.intermediate_size = config.intermediate_size * hidden_size // config.hidden_size
+    config.num_attention_heads = hidden_size // head_size
+    config.hidden_size = hidden_size
+    config.num_hidden_layers = layers
+    student = AutoModelForSequenceClassification.from_config(config)
+
+    if same_width:
+        # Layer i of the student starts as an evenly spaced layer of the teacher, always including the last
+        if layers == 1:
+            layer_map = [teacher_layers - 1]
+        else:
+            layer_map = [round(index * (teacher_layers - 1) / (layers - 1)) for index in range(layers)]
+        teacher_state = teacher.state_dict()
+        student_state = student.state_dict()
+        for name in student_state:
+            match = _LAYER_PATTERN.match(name)
+            source = f"{match[1]}{layer_map[int(match[2])]}{match[3]}" if match else name
+            if source in teacher_state and teacher_state[source].shape == student_state[name].shape:
+                student_state[name] = teacher_state[source].clone()
+        student.load_state_dict(student_state)
+    return student
+
+
+def _batches(encodings: Dict[str, List[List[int]]], order: List[int], batch_size: int, tokenizer):
+    """Yield (row indices, padded tensors) for consecutive slices of order."""
+    for start in range(0, len(order), batch_size):
+        rows = order[start:start + batch_size]
+        longest = max(len(encodings['input_ids'][row]) for row in rows)
+        input_ids = torch.full((len(rows), longest), tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), longest), dtype=torch.long)
+        for index, row in enumerate(rows):
+            ids = encodings['input_ids'][row]
+            input_ids[index, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[index, :len(ids)] = 1
+        yield rows, {'input_ids': input_ids, 'attention_mask': attention_mask}
+
+
+def teacher_logits(teacher, tokenizer, texts: List[str], max_length: int = 256,
+                   batch_size: int = 16) -> torch.Tensor:
+    """
+    Label texts with the teacher.
+
+    Args:
+        teacher: Teacher sequence classification model
+        tokenizer: Its tokenizer
+        texts (List[str]): Unlabeled texts
+        max_length (int): Tokens per text (longer texts are truncated)
+        batch_size (int): Texts per forward pass
+
+    Returns:
+        torch.Tensor: Teacher logits, one row per text
+    """
+    encodings = tokenizer(texts, truncation=True, max_length=max_length)
+    # Similar lengths together, so batches need little padding
+    order = sorted(range(len(texts)), key=lambda row: len(encodings['input_ids'][row]))
+    logits = torch.zeros((len(texts), teacher.config.num_labels))
+    teacher.eval()
+    with torch.no_grad():
+        for rows, batch in _batches(encodings, order, batch_size, tokenizer):
+            logits[rows] = teacher(**batch).logits.float()
+    return logits
+
+
+def distill(teacher, tokenizer, texts: List[str], layers: int, hidden_size: Optional[int] = None,
+            epochs: int = 3, batch_size: int = 16, learning_rate: float = 5e-5, temperature: float = 2.0,
+            max_length: int = 256, seed: int = 0,
+            progress: Optional[Callable[[int, int, float], None]] = None):
+    """
+    Train a student to reproduce the teacher's predictions on texts.
+
+    Args:
+        teacher: Teacher sequence classification model
+        tokenizer: Its tokenizer (shared by the student)
+        texts (List[str]): Unlabeled training texts
+        layers (int): Encoder layers of the student
+        hidden_size (Optional[int]): Hidden size of the student (default: the teacher's)
+        epochs (int): Passes over texts
+        batch_size (int): Texts per update
+        learning_rate (float): AdamW learning rate
+        temperature (float): Softmax temperature of the distillation loss
+        max_length (int): Tokens per text (longer texts are truncated)
+        seed (int): Seed for initialization and shuffling
+        progress (Optional[Callable[[int, int, float], None]]): Called after each
+            epoch with (epoch, epochs, mean loss)
+
+    Returns:
+        torch.nn.Module: The trained student, in eval mode
+    """
+    torch.manual_seed(seed)
+    rng = random.Random(seed)
+    targets = torch.softmax(teacher_logits(teacher, tokenizer, texts, max_length, batch_size) / temperature, dim=-1)
+    encodings = tokenizer(texts, truncation=True, max_length=max_length)
+
+    student = build_student(teacher, layers, hidden_size)
+    student.train()
+    optimizer = torch.optim.AdamW(student.parameters(), lr=learning_rate)
+    for epoch in range(1, epochs + 1):
+        order = list(range(len(texts)))
+        rng.shuffle(order)
+        losses = []
+        for rows, batch in _batches(encodings, order, batch_size, tokenizer):
+            log_probabilities = F.log_softmax(student(**batch).logits / temperature, dim=-1)
+            # Scaled by T^2 so gradients keep their size whatever the temperature
+            loss = F.kl_div(log_probabilities, targets[rows], reduction='batchmean') * temperature ** 2
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            losses.append(loss.item())
+        if progress:
+            progress(epoch, epochs, sum(losses) / len(losses))
+    student.eval()
+    return student
+
+
+def save_student(student, tokenizer, output_dir: str, details: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Save the student as a Hugging Face checkpoint that load_model() can serve.
+
+    Args:
+        student: Trained student model
+        tokenizer: The teacher's tokenizer
+        output_dir (str): Destination directory
+        details (Optional[Dict[str, Any]]): Recorded in config.json as "distillation"
+    """
+    if details:
+        student.config.distillation = details
+    student.save_pretrained(output_dir, safe_serialization=True)
+    tokenizer.save_pretrained(output_dir)
@@ -0,0 +1,162 @@
+"""
+Direct tokenizer + model inference, without the transformers pipeline.
+
+The text-classification pipeline is convenient but adds work to every call:
+it re-checks arguments, walks preprocess/forward/postprocess stages, builds
+a list of label dicts per text and looks labels up by name. The detector
+only ever needs one number per window, the AI probability.
+
+DirectClassifier holds the tokenizer and model itself. It resolves the
+'Fake'/'Real' logit columns from id2label once, when it is created, runs the
+forward pass under torch.inference_mode and takes the softmax of the logits
+as a NumPy array. It exposes .tokenizer and .model (and can be called like
+the pipeline), so app.py serves it like any other backend. See
+INFERENCE_BACKEND = "direct" and test program/benchmark_engine.py.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+
+def label_indices(config) -> Dict[str, int]:
+    """
+    Map the detector's 'Fake'/'Real' labels to logit column indices.
+
+    Args:
+        config: A model config with id2label
+
+    Returns:
+        dict: {'Fake': index, 'Real': index}
+
+    Raises:
+        ValueError: If the config does not name both labels
+    """
+    label_to_index = {label.strip(): int(index) for index, label in config.id2label.items()}
+    if 'Fake' not in label_to_index or 'Real' not in label_to_index:
+        raise ValueError(f"Unexpected model labels: {list(label_to_index)}")
+    return {'Fake': label_to_index['Fake'], 'Real': label_to_index['Real']}
+
+
+def build_batch(tokenizer, windows: List[List[int]]) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Add special tokens around each window and pad to the longest one.
+
+    Tensors are built directly from the ids: the text is never re-tokenized.
+
+    Args:
+        tokenizer: The model's tokenizer
+        windows (List[List[int]]): Content token ids per window
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: input_ids and attention_mask
+    """
+    sequences = [tokenizer.build_inputs_with_special_tokens(window) for window in windows]
+    longest = max(len(sequence) for sequence in sequences)
+    input_ids = torch.full((len(sequences), longest), tokenizer.pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(sequences), longest), dtype=torch.long)
+    for row, sequence in enumerate(sequences):
+        input_ids[row, :len(sequence)] = torch.tensor(sequence, dtype=torch.long)
+        attention_mask[row, :len(sequence)] = 1
+    return input_ids, attention_mask
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        logits (np.ndarray): One row of logits per window
+
+    Returns:
+        np.ndarray: Probabilities per row (float64)
+    """
+    shifted = logits.astype(np.float64) - logits.max(axis=-1, keepdims=True)
+    exponentials = np.exp(shifted)
+    return exponentials / exponentials.sum(axis=-1, keepdims=True)
+
+
+class DirectClassifier:
+    """
+    Tokenizer and sequence classification model called directly.
+
+    Exposes .tokenizer and .model like a transformers pipeline, and can be
+    called as classifier(text, top_k=None, truncation=True).
+
+    Args:
+        model: Sequence classification model with 'Fake'/'Real' labels
+        tokenizer: Its tokenizer
+        device (int): -1 for CPU, 0+ for a GPU device ID
+
+    Raises:
+        ValueError: If the model does not name both labels
+    """
+
+    def __init__(self, model, tokenizer, device: int = -1):
+        self.device = torch.device('cpu') if device < 0 else torch.device(f'cuda:{device}')
+        self.model = model.to(self.device).eval()
+        self.tokenizer = tokenizer
+        indices = label_indices(model.config)
+        self.fake_index = indices['Fake']
+        self.real_index = indices['Real']
+
+    @classmethod
+    def from_pretrained(cls, model_name: str, device: int = -1, **from_pretrained_kwargs: Any) -> "DirectClassifier":
+        """
+        Args:
+            model_name (str): Hub name or local path of the checkpoint
+            device (int): -1 for CPU, 0+ for a GPU device ID
+            **from_pretrained_kwargs: Passed to from_pretrained (e.g. cache_dir, revision)
+
+        Returns:
+            DirectClassifier: The loaded classifier
+        """
+        tokenizer = AutoTokenizer.from_pretrained(model_name, **from_pretrained_kwargs)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name, **from_pretrained_kwargs)
+        return cls(model, tokenizer, device=device)
+
+    def logits(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> np.ndarray:
+        """
+        Args:
+            input_ids (torch.Tensor): Token ids, one row per sequence
+            attention_mask (torch.Tensor): 1 for real tokens, 0 for padding
+
+        Returns:
+            np.ndarray: Raw logits (float32), one row per sequence
+        """
+        with torch.inference_mode():
+            logits = self.model(input_ids=input_ids.to(self.device),
+                                attention_mask=attention_mask.to(self.device)).logits
+        return logits.float().cpu().numpy()
+
+    def probabilities(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> np.ndarray:
+        """
+        Args:
+            input_ids (torch.Tensor): Token ids, one row per sequence
+            attention_mask (torch.Tensor): 1 for real tokens, 0 for padding
+
+        Returns:
+            np.ndarray: Label probabilities, one row per sequence
+        """
+        return softmax(self.logits(input_ids, attention_mask))
+
+    def score_windows(self, windows: List[List[int]]) -> np.ndarray:
+        """
+        Score windows in one forward pass.
+
+        Args:
+            windows (List[List[int]]): Content token ids per window
+
+        Returns:
+            np.ndarray: AI probability (0-1) of each window, in input order
+        """
+        return self.probabilities(*build_batch(self.tokenizer, windows))[:, self.fake_index]
+
+    def __call__(self, text: str, top_k: Optional[int] = None,
+                 truncation: bool = True) -> List[List[Dict[str, Any]]]:
+        inputs = self.tokenizer(text, truncation=truncation, return_tensors='pt')
+        probabilities = self.probabilities(inputs['input_ids'], inputs['attention_mask'])[0]
+        scores = [{'label': self.model.config.id2label[index], 'score': float(score)}
+                  for index, score in enumerate(probabilities)]
+        scores.sort(key=lambda item: item['score'], reverse=True)
+        return [scores[:top_k] if top_k else scores]
@@ -0,0 +1,144 @@
+"""
+Ensemble of detector models scored side by side.
+
+Detectors trained on different generators make different mistakes, so a
+weighted mean of several detectors is usually more robust than any one of
+them. Ensemble holds the member pipelines and runs work for every member
+on a thread pool: torch releases the GIL during forward passes, so members
+score concurrently and a batch costs about as long as the slowest member
+instead of the sum of all of them.
+
+Members fine-tuned from the same base model share a tokenizer. They are
+grouped by tokenizer (tokenizer_groups), so app.py tokenizes and windows a
+text once per distinct tokenizer rather than once per member.
+
+app.load_model() returns an Ensemble when ENSEMBLE_MODELS is set;
+app._analyze_batch and friends score it member by member and combine the
+members' probabilities with combine().
+"""
+
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+def tokenizer_key(tokenizer) -> str:
+    """
+    Identify a tokenizer by its vocabulary and rules, not by the model it came with.
+
+    Args:
+        tokenizer: A Hugging Face tokenizer
+
+    Returns:
+        str: Equal for tokenizers that produce the same token ids
+    """
+    if getattr(tokenizer, 'is_fast', False):
+        state = json.loads(tokenizer.backend_tokenizer.to_str())
+        # Truncation and padding are per-call settings, not part of the vocabulary
+        state.pop('truncation', None)
+        state.pop('padding', None)
+        payload = json.dumps(state, sort_keys=True)
+    else:
+        payload = json.dumps(sorted(tokenizer.get_vocab().items()))
+    return f"{type(tokenizer).__name__}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class EnsembleMember:
+    """
+    Args:
+        name (str): Hugging Face model name or local checkpoint path
+        weight (float): Relative weight of the member's probability
+        classifier: Its pipeline (provides model and tokenizer)
+    """
+
+    def __init__(self, name: str, weight: float, classifier):
+        self.name = name
+        self.weight = weight
+        self.classifier = classifier
+
+
+class Ensemble:
+    """
+    Several detector pipelines whose AI probabilities are averaged with weights.
+
+    Args:
+        members (Sequence[Tuple[str, float, Any]]): (name, weight, pipeline) of each member
+        workers (Optional[int]): Threads scoring members concurrently (default: one per member)
+
+    Raises:
+        ValueError: If there are no members, names repeat or a weight is not positive
+    """
+
+    def __init__(self, members: Sequence[Tuple[str, float, Any]], workers: Optional[int] = None):
+        if not members:
+            raise ValueError("An ensemble needs at least one member")
+        names = [name for name, _, _ in members]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Ensemble member names must be unique: {names}")
+        if any(weight <= 0 for _, weight, _ in members):
+            raise ValueError("Ensemble member weights must be positive")
+
+        self.members = [EnsembleMember(name, float(weight), classifier) for name, weight, classifier in members]
+        groups = {}
+        for member in self.members:
+            groups.setdefault(tokenizer_key(member.classifier.tokenizer), []).append(member)
+        self._groups = list(groups.values())
+        self._executor = ThreadPoolExecutor(max_workers=workers or len(self.members),
+                                            thread_name_prefix="ensemble-member")
+
+        # Cache keys must change whenever a member, its revision or its weight does
+        identity = [[member.name, getattr(member.classifier.model.config, '_commit_hash', None), member.weight]
+                    for member in self.members]
+        self.config = SimpleNamespace(name_or_path="ensemble:" + json.dumps(identity), _commit_hash=None)
+
+    @property
+    def model(self) -> SimpleNamespace:
+        """Exposes .config, like a pipeline's model, for cache keys and health checks."""
+        return SimpleNamespace(config=self.config)
+
+    def tokenizer_groups(self) -> List[List[EnsembleMember]]:
+        """
+        Returns:
+            List[List[EnsembleMember]]: Members grouped by identical tokenizer,
+                                        in member order
+        """
+        return self._groups
+
+    def map(self, function: Callable[[EnsembleMember], Any]) -> List[Tuple[Any, float]]:
+        """
+        Call function(member) for every member concurrently.
+
+        Args:
+            function (Callable[[EnsembleMember], Any]): Work for one member
+
+        Returns:
+            List[Tuple[Any, float]]: (return value, seconds taken) per member, in member order
+
+        Raises:
+            Exception: The first exception raised for any member
+        """
+        def timed(member: EnsembleMember) -> Tuple[Any, float]:
+            start = time.perf_counter()
+            value = function(member)
+            return value, time.perf_counter() - start
+
+        futures = [self._executor.submit(timed, member) for member in self.members]
+        return [future.result() for future in futures]
+
+    def combine(self, probabilities: Sequence[float]) -> float:
+        """
+        Args:
+            probabilities (Sequence[float]): One probability per member, in member order
+
+        Returns:
+            float: Their weighted mean
+        """
+        total = sum(member.weight for member in self.members)
+        return sum(member.weight * value for member, value in zip(self.members, probabilities)) / total
+
+    def close(self) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,232 @@
+"""
+Vectorized classification and evaluation over arrays of AI probabilities.
+
+classify() and confidence_levels() apply the same rules as
+app._build_result, but to a whole corpus at once, so scores read back from a
+LogitStore (detector.logits) can be re-classified under other thresholds
+in milliseconds. confusion_matrix() and roc_curve()/auc() compare those
+classifications and scores with each other or with known labels.
+threshold_metrics() scores one AI_THRESHOLD/HUMAN_THRESHOLD pair against
+known labels, and sweep_thresholds() finds the pair that maximizes a
+metric over a whole grid at once (see python -m detector evaluate).
+
+Classifications and confidence levels are returned as integer codes:
+indices into CLASSIFICATIONS and CONFIDENCE_LEVELS.
+"""
+
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+CLASSIFICATIONS = ("AI Generated", "Human Written", "Mixed/Uncertain")
+CONFIDENCE_LEVELS = ("High", "Medium", "Low")
+
+# Metrics a threshold pair can be chosen by (see sweep_thresholds)
+METRICS = ("accuracy", "balanced_accuracy", "f1")
+
+
+def classify(ai_probabilities: np.ndarray, ai_threshold: float, human_threshold: float) -> np.ndarray:
+    """
+    Args:
+        ai_probabilities (np.ndarray): AI probability (0-1) of each document
+        ai_threshold (float): AI probability above which a document is "AI Generated"
+        human_threshold (float): Human probability above which a document is "Human Written"
+
+    Returns:
+        np.ndarray: Index into CLASSIFICATIONS of each document
+    """
+    # Compared in percent, exactly as app._build_result does
+    ai_percent = np.asarray(ai_probabilities, dtype=np.float64) * 100
+    codes = np.full(len(ai_percent), 2, dtype=np.int64)
+    human = (100 - ai_percent) > human_threshold * 100
+    codes[human] = 1
+    codes[ai_percent > ai_threshold * 100] = 0
+    return codes
+
+
+def confidence_levels(ai_probabilities: np.ndarray, high: float, medium: float) -> np.ndarray:
+    """
+    Args:
+        ai_probabilities (np.ndarray): AI probability (0-1) of each document
+        high (float): Probability of the likelier class above which confidence is "High"
+        medium (float): Probability from which confidence is "Medium"
+
+    Returns:
+        np.ndarray: Index into CONFIDENCE_LEVELS of each document
+    """
+    ai_percent = np.asarray(ai_probabilities, dtype=np.float64) * 100
+    top = np.maximum(ai_percent, 100 - ai_percent)
+    return np.where(top > high * 100, 0, np.where(top >= medium * 100, 1, 2)).astype(np.int64)
+
+
+def confusion_matrix(actual: np.ndarray, predicted: np.ndarray, classes: int) -> np.ndarray:
+    """
+    Args:
+        actual (np.ndarray): Class index of each document (rows of the matrix)
+        predicted (np.ndarray): Class index of each document (columns of the matrix)
+        classes (int): Number of classes
+
+    Returns:
+        np.ndarray: classes x classes document counts
+    """
+    pairs = np.asarray(actual, dtype=np.int64) * classes + np.asarray(predicted, dtype=np.int64)
+    return np.bincount(pairs, minlength=classes * classes).reshape(classes, classes)
+
+
+def roc_curve(scores: np.ndarray, positives: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sweep a decision threshold over every distinct score.
+
+    Args:
+        scores (np.ndarray): Score of each document (higher means more likely positive)
+        positives (np.ndarray): True for the positive documents
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: False positive rates, true
+            positive rates and the thresholds they belong to (a document is
+            positive when its score >= threshold), starting at (0, 0) with an
+            infinite threshold
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    positives = np.asarray(positives, dtype=bool)
+    order = np.argsort(-scores, kind='stable')
+    sorted_scores = scores[order]
+    true_positives = np.cumsum(positives[order])
+    false_positives = np.arange(1, len(scores) + 1) - true_positives
+    # Only the last document of a run of equal scores is a threshold
+    last = np.r_[np.diff(sorted_scores) != 0, True] if len(scores) else np.zeros(0, dtype=bool)
+
+    positive_count = max(int(positives.sum()), 1)
+    negative_count = max(len(scores) - int(positives.sum()), 1)
+    fpr = np.r_[0.0, false_positives[last] / negative_count]
+    tpr = np.r_[0.0, true_positives[last] / positive_count]
+    return fpr, tpr, np.r_[np.inf, sorted_scores[last]]
+
+
+def auc(fpr: np.ndarray, tpr: np.ndarray) -> float:
+    """
+    Args:
+        fpr (np.ndarray): False positive rates, in increasing order
+        tpr (np.ndarray): Matching true positive rates
+
+    Returns:
+        float: Area under the curve (trapezoidal rule)
+    """
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+def _rates(counts: Dict[str, Any], positive_count: int, negative_count: int) -> Dict[str, Any]:
+    """Metrics from (arrays of) AI/human decision counts; Mixed/Uncertain counts as wrong."""
+    total = positive_count + negative_count
+    ai_decided, ai_correct = counts['ai_decided'], counts['ai_correct']
+    human_decided, human_correct = counts['human_decided'], counts['human_correct']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ai_precision = np.where(ai_decided > 0, ai_correct / np.maximum(ai_decided, 1), 0.0)
+        ai_recall = ai_correct / max(positive_count, 1)
+        human_precision = np.where(human_decided > 0, human_correct / np.maximum(human_decided, 1), 0.0)
+        human_recall = human_correct / max(negative_count, 1)
+        f1 = np.where(ai_precision + ai_recall > 0,
+                      2 * ai_precision * ai_recall / np.maximum(ai_precision + ai_recall, 1e-300), 0.0)
+    return {
+        'accuracy': (ai_correct + human_correct) / max(total, 1),
+        'balanced_accuracy': (ai_recall + human_recall) / 2,
+        'f1': f1,
+        'coverage': (ai_decided + human_decided) / max(total, 1),
+        'ai_precision': ai_precision,
+        'ai_recall': ai_recall,
+        'human_precision': human_precision,
+        'human_recall': human_recall
+    }
+
+
+def threshold_metrics(ai_probabilities: np.ndarray, positives: np.ndarray,
+                      ai_threshold: float, human_threshold: float) -> Dict[str, Any]:
+    """
+    Score the classifications one threshold pair produces against known labels.
+
+    "AI Generated" is correct for AI texts and "Human Written" for human
+    texts; "Mixed/Uncertain" is never correct.
+
+    Args:
+        ai_probabilities (np.ndarray): AI probability (0-1) of each document
+        positives (np.ndarray): True for the AI-written documents
+        ai_threshold (float): As app.AI_THRESHOLD
+        human_threshold (float): As app.HUMAN_THRESHOLD
+
+    Returns:
+        dict: accuracy, balanced_accuracy, f1 (of the AI class), coverage
+              (share not "Mixed/Uncertain"), ai/human precision and recall,
+              and confusion: rows AI/human texts, columns CLASSIFICATIONS
+    """
+    positives = np.asarray(positives, dtype=bool)
+    codes = classify(ai_probabilities, ai_threshold, human_threshold)
+    # Row 0: AI texts, row 1: human texts
+    matrix = confusion_matrix((~positives).astype(np.int64), codes, len(CLASSIFICATIONS))[:2]
+    counts = {'ai_decided': matrix[:, 0].sum(), 'ai_correct': matrix[0, 0],
+              'human_decided': matrix[:, 1].sum(), 'human_correct': matrix[1, 1]}
+    metrics = {name: float(value) for name, value in
+               _rates(counts, int(positives.sum()), int((~positives).sum())).items()}
+    metrics['confusion'] = matrix.tolist()
+    return metrics
+
+
+def sweep_thresholds(ai_probabilities: np.ndarray, positives: np.ndarray, grid: np.ndarray,
+                     metric: str = "accuracy", min_coverage: float = 0.0) -> Dict[str, Any]:
+    """
+    Find the threshold pair that maximizes a metric, trying every pair of grid values.
+
+    Documents are sorted once. A document is "AI Generated" above the AI
+    threshold, so the AI decisions of every AI threshold are a suffix of
+    the sorted order; "Human Written" documents are likewise a prefix.
+    Every pair is then counted from cumulative sums in O(1), without
+    classifying documents again.
+
+    Args:
+        ai_probabilities (np.ndarray): AI probability (0-1) of each document
+        positives (np.ndarray): True for the AI-written documents
+        grid (np.ndarray): Threshold values (0-1) tried for both thresholds
+        metric (str): One of METRICS
+        min_coverage (float): Only consider pairs that decide at least this
+                              share of documents (not "Mixed/Uncertain")
+
+    Returns:
+        dict: ai_threshold, human_threshold, value (of metric) and coverage of
+              the best pair; None thresholds if no pair reaches min_coverage
+
+    Raises:
+        ValueError: If metric is not one of METRICS
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric!r} (expected one of {METRICS})")
+    positives = np.asarray(positives, dtype=bool)
+    grid = np.asarray(grid, dtype=np.float64)
+    # Percentages computed exactly as classify() computes them
+    ai_percent = np.asarray(ai_probabilities, dtype=np.float64) * 100
+    order = np.argsort(ai_percent, kind='stable')
+    sorted_ai = ai_percent[order]
+    # 100 - x never increases as x grows, so human percentages are sorted in reverse
+    sorted_human = (100 - sorted_ai)[::-1]
+    positives_before = np.r_[0, np.cumsum(positives[order])]
+    total = len(ai_percent)
+    positive_count = int(positives.sum())
+
+    # Documents above each AI threshold (a suffix), and above each human threshold (a prefix)
+    ai_decided = total - np.searchsorted(sorted_ai, grid * 100, side='right')
+    human_candidates = total - np.searchsorted(sorted_human, grid * 100, side='right')
+    # A document above both thresholds is "AI Generated": the human prefix stops where the AI suffix starts
+    human_decided = np.minimum(human_candidates[None, :], (total - ai_decided)[:, None])
+    ai_decided = np.broadcast_to(ai_decided[:, None], human_decided.shape)
+    counts = {
+        'ai_decided': ai_decided,
+        'ai_correct': positive_count - positives_before[total - ai_decided],
+        'human_decided': human_decided,
+        'human_correct': human_decided - positives_before[human_decided]
+    }
+    rates = _rates(counts, positive_count, total - positive_count)
+
+    values = np.where(rates['coverage'] >= min_coverage, rates[metric], -np.inf)
+    best = np.unravel_index(np.argmax(values), values.shape)
+    if not np.isfinite(values[best]):
+        return {'ai_threshold': None, 'human_threshold': None, 'value': None, 'coverage': None}
+    return {'ai_threshold': float(grid[best[0]]), 'human_threshold': float(grid[best[1]]),
+            'value': float(values[best]), 'coverage': float(rates['coverage'][best])}
@@ -0,0 +1,217 @@
+"""
+Memory-mapped store of raw window logits per document.
+
+Changing AI_THRESHOLD/HUMAN_THRESHOLD, the confidence bands or the window
+aggregation does not change what the model outputs, only how it is read.
+LogitStore keeps the model's raw logits for every window of every scored
+document, so re-classification, confusion matrices and ROC sweeps over a
+whole corpus run as NumPy operations over memory-mapped arrays, without
+the model (see detector.evaluation and python -m detector reclassify).
+
+One store directory holds the logits of one model revision under one set
+of window settings (app.open_logit_store picks it). Documents are
+keyed by the SHA-256 of their normalized text. The directory holds
+append-only flat files:
+- keys.bin: hex text hash of each document
+- windows.bin: int32 window count of each document
+- lengths.bin: int32 content tokens of each window
+- logits.bin: float32 logits of each window (num_labels per row)
+plus meta.json. Keys are written last, so a document only counts as stored
+once all its rows are on disk; a store cut short by a crash is trimmed back
+to its last complete document when it is opened.
+
+A store has a single writer; any number of processes may read it.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from detector.engine import softmax
+
+_KEY_DTYPE = np.dtype('S64')
+_COUNT_DTYPE = np.dtype('<i4')
+_LOGIT_DTYPE = np.dtype('<f4')
+_FILES = ('keys.bin', 'windows.bin', 'lengths.bin', 'logits.bin')
+
+
+def _map(path: str, dtype: np.dtype, count: int, columns: Optional[int] = None) -> np.ndarray:
+    """Read-only memory map of the first count rows of a flat file (mmap cannot map empty files)."""
+    shape = (count, columns) if columns else (count,)
+    if count == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape)
+
+
+class LogitStore:
+    """
+    Raw window logits of scored documents, looked up by text hash.
+
+    Args:
+        directory (str): Store directory (created if missing)
+        num_labels (int): Logits per window
+        ai_index (int): Logit column of the AI ('Fake') label
+        identity (Optional[Dict[str, Any]]): Model and settings the logits
+            belong to; written to meta.json for reference
+
+    Raises:
+        ValueError: If the directory holds a store with other labels
+    """
+
+    def __init__(self, directory: str, num_labels: int, ai_index: int,
+                 identity: Optional[Dict[str, Any]] = None):
+        self.directory = directory
+        self.num_labels = num_labels
+        self.ai_index = ai_index
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if (meta['num_labels'], meta['ai_index']) != (num_labels, ai_index):
+                raise ValueError(f"{directory} holds logits of {meta['num_labels']} labels with the AI label "
+                                 f"at {meta['ai_index']}, not {num_labels} and {ai_index}")
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump({'num_labels': num_labels, 'ai_index': ai_index, 'identity': identity or {}}, f, indent=2)
+        for name in _FILES:
+            open(self._path(name), 'ab').close()
+        self._trim()
+        self._map_files()
+        self._order = np.argsort(self._keys, kind='stable')
+        self._sorted_keys = self._keys[self._order]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _trim(self) -> None:
+        """Drop rows written after the last complete document (an interrupted append)."""
+        documents = min(os.path.getsize(self._path('keys.bin')) // _KEY_DTYPE.itemsize,
+                        os.path.getsize(self._path('windows.bin')) // _COUNT_DTYPE.itemsize)
+        counts = _map(self._path('windows.bin'), _COUNT_DTYPE, documents)
+        windows = int(counts.sum(dtype=np.int64))
+        del counts
+        sizes = {'keys.bin': documents * _KEY_DTYPE.itemsize,
+                 'windows.bin': documents * _COUNT_DTYPE.itemsize,
+                 'lengths.bin': windows * _COUNT_DTYPE.itemsize,
+                 'logits.bin': windows * self.num_labels * _LOGIT_DTYPE.itemsize}
+        for name, size in sizes.items():
+            if os.path.getsize(self._path(name)) > size:
+                os.truncate(self._path(name), size)
+
+    def _map_files(self) -> None:
+        """Map the files again, up to their current size."""
+        documents = os.path.getsize(self._path('keys.bin')) // _KEY_DTYPE.itemsize
+        self._keys = _map(self._path('keys.bin'), _KEY_DTYPE, documents)
+        self._counts = _map(self._path('windows.bin'), _COUNT_DTYPE, documents)
+        self._offsets = np.concatenate([[0], np.cumsum(self._counts, dtype=np.int64)])
+        windows = int(self._offsets[-1])
+        self._lengths = _map(self._path('lengths.bin'), _COUNT_DTYPE, windows)
+        self._logits = _map(self._path('logits.bin'), _LOGIT_DTYPE, windows, self.num_labels)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, keys: Sequence[str]) -> np.ndarray:
+        """
+        Args:
+            keys (Sequence[str]): Hex text hashes
+
+        Returns:
+            np.ndarray: Row of each key in the store, -1 where it is not stored
+        """
+        wanted = np.asarray(keys, dtype=_KEY_DTYPE)
+        if len(self._sorted_keys) == 0 or len(wanted) == 0:
+            return np.full(len(wanted), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._sorted_keys, wanted), len(self._sorted_keys) - 1)
+        found = self._sorted_keys[positions] == wanted
+        return np.where(found, self._order[positions], -1).astype(np.int64)
+
+    def append(self, keys: Sequence[str], window_logits: Sequence[np.ndarray],
+               window_lengths: Sequence[Sequence[int]]) -> int:
+        """
+        Store the window logits of documents; keys already stored are skipped.
+
+        Args:
+            keys (Sequence[str]): Hex text hash of each document
+            window_logits (Sequence[np.ndarray]): Logits of each document's
+                windows, shape (windows, num_labels)
+            window_lengths (Sequence[Sequence[int]]): Content tokens of each window
+
+        Returns:
+            int: Documents added
+        """
+        with self._lock:
+            stored = self.lookup(keys) >= 0
+            seen = set()
+            rows = []
+            for index, key in enumerate(keys):
+                if not stored[index] and key not in seen:
+                    seen.add(key)
+                    rows.append(index)
+            if not rows:
+                return 0
+
+            logits = np.concatenate([np.asarray(window_logits[index], dtype=_LOGIT_DTYPE).reshape(-1, self.num_labels)
+                                     for index in rows])
+            lengths = np.concatenate([np.asarray(window_lengths[index], dtype=_COUNT_DTYPE) for index in rows])
+            counts = np.array([len(window_lengths[index]) for index in rows], dtype=_COUNT_DTYPE)
+            new_keys = np.asarray([keys[index] for index in rows], dtype=_KEY_DTYPE)
+            # Keys last: a document is only visible once everything it needs is written
+            for name, values in (('logits.bin', logits), ('lengths.bin', lengths), ('windows.bin', counts),
+                                 ('keys.bin', new_keys)):
+                with open(self._path(name), 'ab') as f:
+                    f.write(values.tobytes())
+
+            # Merge the new keys into the sorted index instead of sorting everything again
+            first_row = len(self._keys)
+            new_order = np.argsort(new_keys, kind='stable')
+            positions = np.searchsorted(self._sorted_keys, new_keys[new_order])
+            self._sorted_keys = np.insert(self._sorted_keys, positions, new_keys[new_order])
+            self._order = np.insert(self._order, positions, first_row + new_order)
+            self._map_files()
+            return len(rows)
+
+    def probabilities(self, rows: Optional[np.ndarray] = None, aggregation: str = "mean") -> np.ndarray:
+        """
+        AI probability of documents, recomputed from their window logits.
+
+        Args:
+            rows (Optional[np.ndarray]): Rows to read (from lookup); None for every document
+            aggregation (str): "mean", "max" or "weighted", as app._aggregate_window_scores
+
+        Returns:
+            np.ndarray: AI probability (0-1) of each document
+
+        Raises:
+            ValueError: If aggregation is not supported or a row is not stored
+        """
+        if rows is None:
+            rows = np.arange(len(self), dtype=np.int64)
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return np.zeros(0)
+        if rows.min() < 0 or rows.max() >= len(self):
+            raise ValueError("Every row must be a stored document")
+
+        # Gather the windows of the requested documents into one contiguous run each
+        counts = self._counts[rows].astype(np.int64)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        windows = np.arange(counts.sum()) - np.repeat(starts, counts) + np.repeat(self._offsets[rows], counts)
+        scores = softmax(self._logits[windows])[:, self.ai_index]
+
+        if aggregation == "mean":
+            return np.add.reduceat(scores, starts) / counts
+        if aggregation == "max":
+            return np.maximum.reduceat(scores, starts)
+        if aggregation == "weighted":
+            lengths = self._lengths[windows].astype(np.float64)
+            totals = np.add.reduceat(lengths, starts)
+            weighted = np.add.reduceat(scores * lengths, starts) / np.where(totals > 0, totals, 1)
+            return np.where(totals > 0, weighted, np.add.reduceat(scores, starts) / counts)
+        raise ValueError(f"Unknown window aggregation: {aggregation!r}")
@@ -0,0 +1,105 @@
+"""
+Process memory accounting for shared model weights (Linux).
+
+When several worker processes load the model from the same safetensors
+file with memory-mapped weights, the weight pages live once in the page
+cache and are shared by every process. Plain RSS counts shared pages in
+full for each process, so it cannot show the saving. USS (unique set size:
+pages only this process uses) and PSS (shared pages divided among their
+users) can. process_memory() reads them from /proc/<pid>/smaps_rollup, and
+file_backed_bytes() checks which model tensors really point into the mapped
+file rather than into private memory. parameter_bytes() counts what a
+model's tensors hold, whether mapped or private.
+"""
+
+import itertools
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Memory usage of a process, in bytes.
+
+    Args:
+        pid (Optional[int]): Process id (default: this process)
+
+    Returns:
+        dict: rss, pss, uss (private pages) and shared (pages also mapped elsewhere)
+
+    Raises:
+        OSError: If /proc/<pid>/smaps_rollup is unavailable (non-Linux, or the process is gone)
+    """
+    fields = {}
+    with open(f"/proc/{pid or 'self'}/smaps_rollup", 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    }
+
+
+def _mapped_ranges(path: str) -> List[Tuple[int, int]]:
+    """Address ranges at which this process has mapped path."""
+    target = os.path.realpath(path)
+    ranges = []
+    try:
+        with open("/proc/self/maps", 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split(maxsplit=5)
+                if len(parts) == 6 and parts[5].strip() == target:
+                    start, end = (int(address, 16) for address in parts[0].split('-'))
+                    ranges.append((start, end))
+    except OSError:
+        pass
+    return ranges
+
+
+def file_backed_bytes(module, path: str) -> Dict[str, int]:
+    """
+    Split a module's parameters and buffers by where their data lives.
+
+    Args:
+        module (torch.nn.Module): Loaded model
+        path (str): The weights file it was loaded from
+
+    Returns:
+        dict: 'file_backed' bytes (memory-mapped from path, shareable
+              between processes) and 'private' bytes (copied into this
+              process). Everything counts as private where /proc is unavailable.
+    """
+    ranges = _mapped_ranges(path)
+    counts = {'file_backed': 0, 'private': 0}
+    seen = set()
+    for tensor in itertools.chain(module.parameters(), module.buffers()):
+        pointer = tensor.data_ptr()
+        if pointer in seen:
+            continue  # Tied weights
+        seen.add(pointer)
+        size = tensor.numel() * tensor.element_size()
+        inside = any(start <= pointer < end for start, end in ranges)
+        counts['file_backed' if inside else 'private'] += size
+    return counts
+
+
+def parameter_bytes(model) -> int:
+    """
+    Args:
+        model (torch.nn.Module): Any model
+
+    Returns:
+        int: Bytes held by its parameters and buffers (tied weights counted once)
+    """
+    seen = set()
+    total = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        if tensor.data_ptr() in seen:
+            continue
+        seen.add(tensor.data_ptr())
+        total += tensor.numel() * tensor.element_size()
+    return total
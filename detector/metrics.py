@@ -0,0 +1,361 @@
+"""
+In-process latency histograms and counters with Prometheus text output.
+
+Stages of model loading and scoring are timed with timed(stage) into the
+detector_stage_seconds histogram; counters track texts, characters, tokens,
+classification outcomes and cache lookups. REGISTRY.render() produces the
+Prometheus text exposition format (served at GET /metrics by the HTTP
+service, or written to a file for node_exporter's textfile collector), and
+Histogram.quantiles() gives p50/p95/p99 over the most recent observations
+for the Streamlit admin sidebar.
+
+The registry lives in this module rather than in app.py because Streamlit
+re-executes app.py on every rerun; module state here survives for the life
+of the process, like other @st.cache_resource objects.
+"""
+
+import bisect
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Histogram bucket upper bounds in seconds; model loading can take minutes
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Observations kept per label set for quantiles
+RECENT_SAMPLES = 2048
+
+LabelKey = Tuple[str, ...]
+
+# Per-thread list that capture() collects observations into
+_capture = threading.local()
+
+
+def _captured(name: str, value: float, labels: Dict[str, str]) -> None:
+    sink = getattr(_capture, 'sink', None)
+    if sink is not None:
+        sink.append((name, value, labels))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    """Shared label handling for counters and histograms."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        Add amount to the counter for the given label values.
+
+        Args:
+            amount (float): Non-negative increment
+            **labels: One value per label name
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        _captured(self.name, amount, labels)
+
+    def values(self) -> Dict[LabelKey, float]:
+        """
+        Returns:
+            dict: Current value per label-value tuple
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class _HistogramSeries:
+    def __init__(self, bucket_count: int):
+        self.buckets = [0] * bucket_count
+        self.count = 0
+        self.sum = 0.0
+        self.recent: deque = deque(maxlen=RECENT_SAMPLES)
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram (Prometheus semantics) that also keeps the
+    most recent observations, so exact recent quantiles can be shown.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.bucket_bounds = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value (float): Observed value (seconds for timings)
+            **labels: One value per label name
+        """
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.bucket_bounds))
+            index = bisect.bisect_left(self.bucket_bounds, value)
+            if index < len(series.buckets):
+                series.buckets[index] += 1
+            series.count += 1
+            series.sum += value
+            series.recent.append(value)
+        _captured(self.name, value, labels)
+
+    def label_values(self) -> List[LabelKey]:
+        """
+        Returns:
+            List[LabelKey]: Label-value tuples that have observations
+        """
+        with self._lock:
+            return sorted(self._series)
+
+    def quantiles(self, quantiles: Sequence[float] = (0.5, 0.95, 0.99), **labels: str) -> Dict[str, float]:
+        """
+        Nearest-rank quantiles over the most recent RECENT_SAMPLES observations.
+
+        Args:
+            quantiles (Sequence[float]): Quantiles in (0, 1]
+            **labels: One value per label name
+
+        Returns:
+            dict: 'count' (all-time) and one entry per quantile keyed 'p50',
+                  'p95', ...; quantiles are absent when nothing was observed
+        """
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            samples = sorted(series.recent) if series else []
+            count = series.count if series else 0
+
+        result: Dict[str, float] = {'count': count}
+        for quantile in quantiles:
+            if samples:
+                rank = min(max(math.ceil(quantile * len(samples)) - 1, 0), len(samples) - 1)
+                result[f"p{quantile * 100:g}"] = samples[rank]
+        return result
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            series_items = sorted((key, (list(s.buckets), s.count, s.sum)) for key, s in self._series.items())
+        for key, (buckets, count, total) in series_items:
+            cumulative = 0
+            for bound, bucket in zip(self.bucket_bounds, buckets):
+                cumulative += bucket
+                labels = _format_labels(self.label_names + ('le',), key + (repr(float(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names + ('le',), key + ('+Inf',))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {repr(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Return the metric registered under name, or None."""
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: All metrics in the Prometheus text exposition format (0.0.4)
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """
+        Atomically write render() to path (for node_exporter's textfile collector).
+
+        Args:
+            path (str): Destination file, conventionally ending in .prom
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'detector_stage_seconds', 'Time spent in each stage of model loading and scoring', ('stage',))
+TEXTS = REGISTRY.counter('detector_texts_total', 'Texts analyzed, including result cache hits')
+CHARS = REGISTRY.counter('detector_chars_total', 'Characters of text analyzed')
+TOKENS = REGISTRY.counter('detector_tokens_total', 'Tokens run through the model')
+TOKENS_REUSED = REGISTRY.counter(
+    'detector_tokens_reused_total', 'Tokens of unchanged paragraphs whose cached scores were reused')
+CLASSIFICATIONS = REGISTRY.counter(
+    'detector_classifications_total', 'Analysis outcomes by classification', ('classification',))
+CACHE_LOOKUPS = REGISTRY.counter('detector_cache_lookups_total', 'Result cache lookups', ('result',))
+CASCADE_TEXTS = REGISTRY.counter(
+    'detector_cascade_texts_total', 'Texts by the cascade stage that answered them', ('stage',))
+NEAR_DUPLICATES = REGISTRY.counter(
+    'detector_near_duplicates_total', 'Cache misses matched to a near-duplicate of an earlier text')
+ENSEMBLE_MEMBER_SECONDS = REGISTRY.histogram(
+    'detector_ensemble_member_seconds', 'Time each ensemble member spent scoring one batch', ('member',))
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Time the enclosed block into detector_stage_seconds{stage=...}.
+
+    Args:
+        stage (str): Stage name, e.g. "tokenize" or "forward"
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+_last_export = {'time': 0.0}
+
+
+def export_textfile(path: str, min_interval_seconds: float) -> bool:
+    """
+    Write REGISTRY to path unless it was written less than min_interval_seconds ago.
+
+    Args:
+        path (str): Destination .prom file
+        min_interval_seconds (float): Minimum time between writes
+
+    Returns:
+        bool: True if the file was written
+    """
+    now = time.monotonic()
+    if now - _last_export['time'] < min_interval_seconds:
+        return False
+    _last_export['time'] = now
+    REGISTRY.write_textfile(path)
+    return True
+
+
+@contextmanager
+def capture() -> Iterator[List[Tuple[str, float, Dict[str, str]]]]:
+    """
+    Additionally collect every observation this thread makes in the block.
+
+    Used by model replica processes (detector.pool) to send their stage
+    timings and counts back to the serving process, which replay()s them.
+
+    Yields:
+        list: (metric name, value, labels) tuples, filled as the block runs
+    """
+    observed: List[Tuple[str, float, Dict[str, str]]] = []
+    previous = getattr(_capture, 'sink', None)
+    _capture.sink = observed
+    try:
+        yield observed
+    finally:
+        _capture.sink = previous
+
+
+def replay(observed: List[Tuple[str, float, Dict[str, str]]]) -> None:
+    """
+    Apply observations collected by capture() (possibly in another process) to REGISTRY.
+
+    Args:
+        observed (list): (metric name, value, labels) tuples
+    """
+    for name, value, labels in observed:
+        metric = REGISTRY.get(name)
+        if isinstance(metric, Histogram):
+            metric.observe(value, **labels)
+        elif isinstance(metric, Counter):
+            metric.inc(value, **labels)
@@ -0,0 +1,157 @@
+"""
+Near-duplicate lookup over previously analyzed texts (64-bit SimHash).
+
+Exact-hash caching misses lightly edited copies of a text: changed
+whitespace or punctuation, or a swapped word. fingerprint() reduces a text
+to a 64-bit SimHash over word shingles. Similar texts get fingerprints that
+differ in only a few bits, so near duplicates are texts whose fingerprints
+are within a small Hamming distance.
+
+Word bigrams are used as shingles. Single words make long unrelated texts
+look alike, because common words dominate them. Longer shingles let a single
+swapped word change too many features.
+
+SimHashIndex finds near duplicates without scanning every stored
+fingerprint. The 64 bits are cut into max_distance + 1 blocks. By the
+pigeonhole principle, two fingerprints within max_distance bits agree
+exactly on at least one block. Each block has a hash table from block value
+to rows. Only the rows that share a block with the query are compared, in
+one vectorized pass. With 6 blocks of 10-11 bits and 1M stored texts, that
+is a few thousand candidates.
+"""
+
+import array
+import hashlib
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+FINGERPRINT_BITS = 64
+
+# Case, whitespace and punctuation do not affect the fingerprint
+_WORD_PATTERN = re.compile(r'\w+')
+
+# Set bits in every byte value, for counting differing bits with numpy
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def fingerprint(text: str, shingle_size: int = 2) -> int:
+    """
+    64-bit SimHash of a text over its word shingles.
+
+    Args:
+        text (str): Input text
+        shingle_size (int): Words per shingle
+
+    Returns:
+        int: Fingerprint (0 <= value < 2**64)
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) <= shingle_size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[index:index + shingle_size]) for index in range(len(words) - shingle_size + 1)]
+
+    digests = b"".join(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles)
+    # One row of 64 bits per shingle; each fingerprint bit is the majority vote of its column
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(votes).tobytes(), 'big')
+
+
+def similarity(distance: int) -> float:
+    """
+    Args:
+        distance (int): Hamming distance between two fingerprints
+
+    Returns:
+        float: Share of fingerprint bits that agree (0-1)
+    """
+    return 1 - distance / FINGERPRINT_BITS
+
+
+class SimHashIndex:
+    """
+    In-memory index of (fingerprint, value) pairs with Hamming-radius lookup.
+
+    Safe to share between threads. Each stored text costs 8 bytes plus 4 per
+    block, plus its value.
+
+    Args:
+        max_distance (int): Largest Hamming distance that counts as a near duplicate
+        max_entries (Optional[int]): Stop indexing new texts beyond this many; None for no limit
+    """
+
+    def __init__(self, max_distance: int = 5, max_entries: Optional[int] = None):
+        if not 0 <= max_distance < FINGERPRINT_BITS:
+            raise ValueError(f"max_distance must be between 0 and {FINGERPRINT_BITS - 1}")
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+
+        blocks = max_distance + 1
+        bounds = [FINGERPRINT_BITS * index // blocks for index in range(blocks + 1)]
+        # (shift, mask) of every block
+        self._blocks = [(start, (1 << (end - start)) - 1) for start, end in zip(bounds, bounds[1:])]
+        self._tables: List[Dict[int, array.array]] = [{} for _ in self._blocks]
+        self._fingerprints = array.array('Q')
+        self._values: List[Any] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, fingerprint_value: int, value: Any) -> bool:
+        """
+        Store a fingerprint with the value to return for its near duplicates.
+
+        Args:
+            fingerprint_value (int): Output of fingerprint()
+            value (Any): E.g. the result cache key of the text
+
+        Returns:
+            bool: False if the index is full and nothing was stored
+        """
+        with self._lock:
+            if self.max_entries is not None and len(self._values) >= self.max_entries:
+                return False
+            row = len(self._values)
+            self._fingerprints.append(fingerprint_value)
+            self._values.append(value)
+            for table, (shift, mask) in zip(self._tables, self._blocks):
+                block = (fingerprint_value >> shift) & mask
+                rows = table.get(block)
+                if rows is None:
+                    rows = table[block] = array.array('I')
+                rows.append(row)
+            return True
+
+    def query(self, fingerprint_value: int) -> Optional[Tuple[Any, int]]:
+        """
+        Find the closest stored fingerprint within max_distance bits.
+
+        Args:
+            fingerprint_value (int): Output of fingerprint()
+
+        Returns:
+            Optional[Tuple[Any, int]]: (value, Hamming distance) of the nearest
+                                       match, or None if there is none
+        """
+        with self._lock:
+            buckets = [table.get((fingerprint_value >> shift) & mask)
+                       for table, (shift, mask) in zip(self._tables, self._blocks)]
+            buckets = [np.frombuffer(rows, dtype=np.uint32) for rows in buckets if rows is not None]
+            if not buckets:
+                return None
+            # A row sharing several blocks is compared more than once; that is cheaper than deduplicating
+            rows = np.concatenate(buckets)
+            stored = np.frombuffer(self._fingerprints, dtype=np.uint64)[rows]
+            differing = stored ^ np.uint64(fingerprint_value)
+            distances = _POPCOUNT[differing.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+            nearest = int(distances.argmin())
+            distance = int(distances[nearest])
+            del buckets, stored  # Release the buffers so the arrays can grow again
+            if distance > self.max_distance:
+                return None
+            return self._values[int(rows[nearest])], distance
@@ -0,0 +1,160 @@
+"""
+ONNX Runtime inference backend.
+
+export_onnx() converts the Hugging Face checkpoint into a self-contained
+directory (model.onnx + tokenizer + config). OnnxClassifier loads that
+directory and exposes the same .tokenizer/.model attributes (and call
+signature) that app.py uses from a transformers pipeline, so the rest of the
+analysis code runs unchanged on either backend.
+
+Requires the optional onnxruntime package; export additionally needs torch.
+"""
+
+import inspect
+import os
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import onnxruntime as ort
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+from detector.snapshot import read_source, write_source
+
+ONNX_FILE_NAME = "model.onnx"
+ONNX_OPSET = 17
+
+
+def is_exported(output_dir: str, source_revision: Optional[str] = None) -> bool:
+    """
+    Check whether output_dir already holds an exported model.
+
+    Args:
+        output_dir (str): Export directory
+        source_revision (Optional[str]): Snapshot revision the export must have
+                                         been built from; None accepts any
+
+    Returns:
+        bool: True if model.onnx and config.json are present (and built from source_revision)
+    """
+    return (os.path.exists(os.path.join(output_dir, ONNX_FILE_NAME))
+            and os.path.exists(os.path.join(output_dir, "config.json"))
+            and (source_revision is None or read_source(output_dir) == source_revision))
+
+
+def export_onnx(model_name: str, output_dir: str, source_revision: Optional[str] = None,
+                **from_pretrained_kwargs: Any) -> str:
+    """
+    Export a sequence classification checkpoint to ONNX.
+
+    Batch size and sequence length are dynamic axes, so one graph serves any
+    window count and padded length.
+
+    Args:
+        model_name (str): Hub name or local path of the checkpoint
+        output_dir (str): Directory to write model.onnx, config and tokenizer to
+        source_revision (Optional[str]): Snapshot revision model_name holds,
+                                         recorded for is_exported and the loaded config
+        **from_pretrained_kwargs: Passed to from_pretrained (e.g. cache_dir, revision)
+
+    Returns:
+        str: Path of the written model.onnx
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, **from_pretrained_kwargs)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, **from_pretrained_kwargs)
+    model.eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    onnx_path = os.path.join(output_dir, ONNX_FILE_NAME)
+    export_kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        # The TorchScript exporter handles RoBERTa with dynamic axes without extra packages
+        export_kwargs['dynamo'] = False
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample['input_ids'], sample['attention_mask']),
+            onnx_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            },
+            opset_version=ONNX_OPSET,
+            **export_kwargs
+        )
+
+    model.config.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    write_source(output_dir, source_revision)
+    return onnx_path
+
+
+class OnnxSequenceClassifier:
+    """
+    ONNX Runtime session behind the call interface of a transformers model.
+
+    Calling it with input_ids/attention_mask tensors returns an object with
+    a .logits tensor, like AutoModelForSequenceClassification.
+
+    Args:
+        model_dir (str): Directory written by export_onnx
+        num_threads (Optional[int]): Intra-op threads; defaults to torch's setting
+    """
+
+    def __init__(self, model_dir: str, num_threads: Optional[int] = None):
+        self.config = AutoConfig.from_pretrained(model_dir)
+        # Keys cached scores by the revision the export was built from, like a snapshot
+        self.config._commit_hash = read_source(model_dir)
+        self.device = torch.device('cpu')
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads or torch.get_num_threads()
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, ONNX_FILE_NAME), options, providers=['CPUExecutionProvider']
+        )
+        self._input_names = [graph_input.name for graph_input in self.session.get_inputs()]
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: Optional[torch.Tensor] = None,
+                 **kwargs: Any) -> SimpleNamespace:
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_ids)
+        feeds = {
+            'input_ids': input_ids.cpu().numpy().astype(np.int64),
+            'attention_mask': attention_mask.cpu().numpy().astype(np.int64)
+        }
+        logits = self.session.run(['logits'], {name: feeds[name] for name in self._input_names})[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+class OnnxClassifier:
+    """
+    Drop-in replacement for the text-classification pipeline on ONNX Runtime.
+
+    Exposes .tokenizer and .model like a transformers pipeline, and can be
+    called as classifier(text, top_k=None, truncation=True).
+
+    Args:
+        model_dir (str): Directory written by export_onnx
+        num_threads (Optional[int]): Intra-op threads; defaults to torch's setting
+    """
+
+    def __init__(self, model_dir: str, num_threads: Optional[int] = None):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = OnnxSequenceClassifier(model_dir, num_threads)
+        self.device = self.model.device
+
+    def __call__(self, text: str, top_k: Optional[int] = None,
+                 truncation: bool = True) -> List[List[Dict[str, Any]]]:
+        inputs = self.tokenizer(text, truncation=truncation, return_tensors='pt')
+        probabilities = torch.softmax(self.model(**inputs).logits.float(), dim=-1)[0].tolist()
+        scores = [{'label': self.model.config.id2label[index], 'score': score}
+                  for index, score in enumerate(probabilities)]
+        scores.sort(key=lambda item: item['score'], reverse=True)
+        return [scores[:top_k] if top_k else scores]
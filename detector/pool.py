@@ -0,0 +1,281 @@
+"""
+Pool of model replicas in worker processes, each pinned to its own cores.
+
+One pipeline with default torch threading does not scale across many cores
+under concurrent load: torch's intra-op thread pool is per process, so
+threads in one process cannot each get their own thread count or cores.
+ModelPool therefore starts one spawned process per replica. Before torch is
+imported, each process is pinned to its own slice of cores and given an
+explicit intra-op thread count. ModelPool.run routes each call to whichever
+replica is idle (waiting if all are busy).
+
+app.load_model() returns a ModelPool instead of a pipeline when
+MODEL_REPLICAS > 1. app.analyze_texts and friends dispatch to it
+transparently (ModelPool.run); the result cache and metrics stay in the
+calling process.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from detector import metrics
+from detector.memory import process_memory
+
+
+def available_cores() -> List[int]:
+    """
+    Returns:
+        List[int]: CPU ids this process may run on
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def core_slices(replicas: int, threads_per_replica: int) -> List[List[int]]:
+    """
+    Assign each replica a contiguous slice of cores, one core per thread.
+
+    Args:
+        replicas (int): Number of replicas
+        threads_per_replica (int): Intra-op threads (and cores) per replica
+
+    Returns:
+        List[List[int]]: Core ids per replica. Slices wrap around (and
+                         overlap) when replicas * threads exceeds the cores.
+    """
+    cores = available_cores()
+    return [[cores[(index * threads_per_replica + offset) % len(cores)] for offset in range(threads_per_replica)]
+            for index in range(replicas)]
+
+
+def _replica_main(conn, cores: Optional[List[int]], threads: int, model_name: Optional[str],
+                  settings: Dict[str, Any]) -> None:
+    """Entry point of a replica process: load one model, then serve requests from conn."""
+    try:
+        if cores is not None and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, cores)
+        # Must happen before torch spins up its thread pools
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+        import torch
+        torch.set_num_threads(threads)
+
+        import app
+        from detector.cli import quiet_streamlit_logging
+        quiet_streamlit_logging()
+        for name, value in settings.items():
+            setattr(app, name, value)
+        if model_name:
+            app.use_model(model_name)
+        app.MODEL_REPLICAS = 1
+        classifier = app.load_model()
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+        return
+    conn.send(('ready', classifier.model.config))
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        function_name, args, kwargs = request
+        try:
+            with metrics.capture() as observed:
+                results = getattr(app, function_name)(*args, classifier=classifier, **kwargs)
+            conn.send(('ok', results, observed))
+        except Exception as e:
+            try:
+                conn.send(('error', e, []))
+            except Exception:
+                # The exception itself could not be pickled
+                conn.send(('error', RuntimeError(f"{type(e).__name__}: {e}"), []))
+
+
+class _Replica:
+    def __init__(self, index: int, process, conn, cores: Optional[List[int]]):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.cores = cores
+        self.requests = 0
+        # Replies to calls that were interrupted before reading them
+        self.unanswered = 0
+
+
+class ModelPool:
+    """
+    N model replicas behind a dispatcher that routes each call to an idle one.
+
+    The first replica starts alone, so any one-time preparation (snapshot,
+    ONNX export, quantization) happens once; the others then load in parallel.
+
+    Args:
+        replicas (int): Number of replica processes
+        threads_per_replica (int): Intra-op torch threads in each replica
+        model_name (Optional[str]): Model for the replicas (default: app.MODEL_NAME)
+        pin_cores (bool): Pin each replica to its own slice of cores (Linux only)
+        settings (Optional[Dict[str, Any]]): app module settings to apply in each
+                                             replica before it loads the model
+
+    Raises:
+        RuntimeError: If a replica fails to load its model
+    """
+
+    def __init__(self, replicas: int, threads_per_replica: int, model_name: Optional[str] = None,
+                 pin_cores: bool = True, settings: Optional[Dict[str, Any]] = None):
+        self.replicas = replicas
+        self.threads_per_replica = threads_per_replica
+        self._settings = dict(settings or {})
+        self.config = None
+
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[Optional[_Replica]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._members: List[_Replica] = []
+        self._alive = 0
+
+        slices = core_slices(replicas, threads_per_replica) if pin_cores else [None] * replicas
+        try:
+            self._start(0, slices[0], model_name)
+            for index in range(1, replicas):
+                self._start(index, slices[index], model_name, wait=False)
+            for member in self._members[1:]:
+                self._wait_ready(member)
+        except Exception:
+            self.close()
+            raise
+
+    def _start(self, index: int, cores: Optional[List[int]], model_name: Optional[str], wait: bool = True) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_replica_main, args=(child_conn, cores, self.threads_per_replica,
+                                                                    model_name, self._settings),
+                                        name=f"model-replica-{index}", daemon=True)
+        process.start()
+        child_conn.close()
+        member = _Replica(index, process, parent_conn, cores)
+        self._members.append(member)
+        if wait:
+            self._wait_ready(member)
+
+    def _wait_ready(self, member: _Replica) -> None:
+        try:
+            message = member.conn.recv()
+        except EOFError:
+            raise RuntimeError(f"Model replica {member.index} exited while loading")
+        if message[0] != 'ready':
+            raise RuntimeError(f"Model replica {member.index} failed to load: {message[1]}")
+        self.config = message[1]
+        self._alive += 1
+        self._idle.put(member)
+
+    @property
+    def model(self) -> SimpleNamespace:
+        """Exposes .config, like a pipeline's model, for cache keys and health checks."""
+        return SimpleNamespace(config=self.config)
+
+    def run(self, function_name: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Call an app function with a replica's model, on the next idle replica.
+
+        Args:
+            function_name (str): Name of an app function taking a classifier
+                                 keyword argument, e.g. "_analyze_batch"
+            *args: Positional arguments (must be picklable)
+            **kwargs: Keyword arguments (must be picklable)
+
+        Returns:
+            Any: What the function returned in the replica
+
+        Raises:
+            RuntimeError: If no replica is running or the replica died
+            Exception: Whatever scoring raised inside the replica
+        """
+        if self._alive == 0:
+            raise RuntimeError("No model replicas are running")
+        with metrics.timed("replica_wait"):
+            member = self._idle.get()
+        if member is None:
+            # Pass the sentinel on to the next waiter
+            self._idle.put(None)
+            raise RuntimeError("No model replicas are running")
+
+        gone = False
+        try:
+            while member.unanswered:
+                member.conn.recv()
+                member.unanswered -= 1
+            # send pickles before writing, so an unpicklable argument leaves the pipe untouched
+            member.conn.send((function_name, args, kwargs))
+            member.unanswered += 1
+            message = member.conn.recv()
+            member.unanswered -= 1
+        except (EOFError, OSError):
+            gone = True
+            raise RuntimeError(f"Model replica {member.index} exited unexpectedly")
+        finally:
+            # Anything else (an unpicklable argument, KeyboardInterrupt) leaves the replica usable
+            self._release(member, gone or not member.process.is_alive())
+
+        with self._lock:
+            member.requests += 1
+
+        status, payload, observed = message
+        metrics.replay(observed)
+        if status == 'error':
+            raise payload
+        return payload
+
+    def _release(self, member: _Replica, gone: bool) -> None:
+        """Return a replica to the idle queue, or retire it if its process is gone."""
+        if not gone:
+            self._idle.put(member)
+            return
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last:
+            # Wake the callers waiting for a replica that will never come back
+            self._idle.put(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report replica placement and load.
+
+        Returns:
+            dict: replicas, threads_per_replica, idle and per-replica
+                  pid, cores, requests, alive and memory (rss, pss, uss and
+                  shared bytes; None where unavailable)
+        """
+        with self._lock:
+            members = [{'index': m.index, 'pid': m.process.pid, 'cores': m.cores,
+                        'requests': m.requests, 'alive': m.process.is_alive()} for m in self._members]
+        for member in members:
+            try:
+                member['memory'] = process_memory(member['pid'])
+            except OSError:
+                member['memory'] = None
+        return {'replicas': self.replicas, 'threads_per_replica': self.threads_per_replica,
+                'idle': self._idle.qsize(), 'members': members}
+
+    def close(self) -> None:
+        """Stop every replica process."""
+        for member in self._members:
+            try:
+                member.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for member in self._members:
+            member.process.join(timeout=10)
+            if member.process.is_alive():
+                member.process.terminate()
+            member.conn.close()
+        self._members = []
+        self._alive = 0
+        self._idle.put(None)
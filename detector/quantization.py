@@ -0,0 +1,90 @@
+"""
+Dynamic INT8 quantized model variant for CPU serving.
+
+quantize_model() applies PyTorch dynamic quantization to every nn.Linear
+layer (weights stored as int8, activations quantized on the fly) and saves
+the result next to the fp32 cache. load_quantized() rebuilds the model from
+that directory without touching the Hub. Only the CPU is supported.
+"""
+
+import os
+from typing import Any, Optional, Tuple
+
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+from detector.snapshot import read_source, write_source
+
+QUANTIZED_WEIGHTS_FILE = "quantized_state_dict.pt"
+
+
+def _quantize(model: torch.nn.Module) -> torch.nn.Module:
+    """Replace the model's Linear layers with dynamically quantized int8 versions."""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def is_quantized(output_dir: str, source_revision: Optional[str] = None) -> bool:
+    """
+    Check whether output_dir already holds a quantized model.
+
+    Args:
+        output_dir (str): Quantized model directory
+        source_revision (Optional[str]): Snapshot revision the model must have
+                                         been quantized from; None accepts any
+
+    Returns:
+        bool: True if the weights and config.json are present (and built from source_revision)
+    """
+    return (os.path.exists(os.path.join(output_dir, QUANTIZED_WEIGHTS_FILE))
+            and os.path.exists(os.path.join(output_dir, "config.json"))
+            and (source_revision is None or read_source(output_dir) == source_revision))
+
+
+def quantize_model(model_name: str, output_dir: str, source_revision: Optional[str] = None,
+                   **from_pretrained_kwargs: Any) -> str:
+    """
+    Quantize a sequence classification checkpoint and save it to disk.
+
+    Args:
+        model_name (str): Hub name or local path of the fp32 checkpoint
+        output_dir (str): Directory to write weights, config and tokenizer to
+        source_revision (Optional[str]): Snapshot revision model_name holds,
+                                         recorded for is_quantized and load_quantized
+        **from_pretrained_kwargs: Passed to from_pretrained (e.g. cache_dir, revision)
+
+    Returns:
+        str: Path of the written weights file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, **from_pretrained_kwargs)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, **from_pretrained_kwargs)
+    model.eval()
+
+    weights_path = os.path.join(output_dir, QUANTIZED_WEIGHTS_FILE)
+    torch.save(_quantize(model).state_dict(), weights_path)
+    model.config.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    write_source(output_dir, source_revision)
+    return weights_path
+
+
+def load_quantized(output_dir: str) -> Tuple[torch.nn.Module, Any]:
+    """
+    Load a model saved by quantize_model.
+
+    The fp32 architecture is built from the saved config (no weights are
+    downloaded), quantized the same way, then filled with the int8 weights.
+
+    Args:
+        output_dir (str): Directory written by quantize_model
+
+    Returns:
+        Tuple[torch.nn.Module, Any]: The quantized model (in eval mode) and its tokenizer.
+                                     The config's _commit_hash is the recorded source revision.
+    """
+    config = AutoConfig.from_pretrained(output_dir)
+    config._commit_hash = read_source(output_dir)
+    model = _quantize(AutoModelForSequenceClassification.from_config(config).eval())
+    model.load_state_dict(torch.load(os.path.join(output_dir, QUANTIZED_WEIGHTS_FILE),
+                                     map_location='cpu', weights_only=True))
+    return model, AutoTokenizer.from_pretrained(output_dir)
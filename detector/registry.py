@@ -0,0 +1,311 @@
+"""
+Registry of loaded models that can be swapped and unloaded at runtime.
+
+Without it, serving another model means changing MODEL_NAME and restarting,
+which clears every cached resource and pays a full cold load. ModelRegistry
+loads models by name on first use and keeps at most max_models of them
+(and, optionally, at most max_bytes of weights) resident. The least recently
+used model is unloaded first.
+
+Requests lease a model for as long as they use it (ModelRegistry.use or
+acquire). activate() switches the model that new requests get, but a request that
+already holds the old model keeps it: an unloaded or evicted model is only
+released (and its unloader called) once its last lease is returned. The
+registry never loads a model while holding its lock, so requests on other
+models are not held up by a slow load.
+"""
+
+import gc
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from detector.memory import process_memory
+
+
+class _Entry:
+    def __init__(self, name: str, model: Any, size: int, load_seconds: float):
+        self.name = name
+        self.model = model
+        self.size = size
+        self.load_seconds = load_seconds
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.evicted = False
+
+
+class ModelLease:
+    """
+    A model held for one request; it stays loaded until release().
+
+    Attributes:
+        name (str): Name of the model
+        model (Any): The loaded model
+    """
+
+    def __init__(self, registry: "ModelRegistry", entry: _Entry):
+        self.name = entry.name
+        self.model = entry.model
+        self._registry = registry
+        self._entry: Optional[_Entry] = entry
+
+    def release(self) -> None:
+        """Return the model to the registry (later calls do nothing)."""
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._registry._release(entry)
+
+
+class ModelRegistry:
+    """
+    Models loaded on demand by name, with least-recently-used unloading.
+
+    Safe to share between threads.
+
+    Args:
+        loader (Callable[[str], Any]): Loads a model by name
+        default (str): Name of the model requests get before any activate()
+        max_models (int): Models kept loaded at once
+        max_bytes (Optional[int]): Unload least recently used models while the
+                                   loaded models hold more; None for no limit
+        size (Optional[Callable[[Any], Optional[int]]]): Bytes a loaded model
+            holds; when missing or returning None, the growth of this
+            process's resident memory during the load is used
+        unloader (Optional[Callable[[Any], None]]): Called with a model once it
+            is unloaded and no request uses it any more
+
+    Raises:
+        ValueError: If max_models is less than 1
+    """
+
+    def __init__(self, loader: Callable[[str], Any], default: str, max_models: int = 2,
+                 max_bytes: Optional[int] = None, size: Optional[Callable[[Any], Optional[int]]] = None,
+                 unloader: Optional[Callable[[Any], None]] = None):
+        if max_models < 1:
+            raise ValueError("max_models must be at least 1")
+        self.loader = loader
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.size = size
+        self.unloader = unloader
+        self.active = default
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._loading: Dict[str, Future] = {}
+        self._counters = {'loads': 0, 'unloads': 0, 'hits': 0}
+
+    def acquire(self, name: Optional[str] = None) -> ModelLease:
+        """
+        Lease a model, loading it if needed.
+
+        Args:
+            name (Optional[str]): Model to use (default: the active model)
+
+        Returns:
+            ModelLease: The model stays loaded until the lease is released,
+                        even if it is unloaded or evicted meanwhile
+
+        Raises:
+            Exception: Whatever the loader raised
+        """
+        return ModelLease(self, self._acquire(name or self.active))
+
+    @contextmanager
+    def use(self, name: Optional[str] = None) -> Iterator[Any]:
+        """
+        Lease a model for the duration of the block (see acquire).
+
+        Args:
+            name (Optional[str]): Model to use (default: the active model)
+
+        Yields:
+            Any: The loaded model
+        """
+        lease = self.acquire(name)
+        try:
+            yield lease.model
+        finally:
+            lease.release()
+
+    def load(self, name: str) -> None:
+        """
+        Make sure a model is loaded, without switching to it.
+
+        Args:
+            name (str): Model to load
+        """
+        with self.use(name):
+            pass
+
+    def activate(self, name: str) -> None:
+        """
+        Load a model and make it the one new requests get.
+
+        Requests still running on the previous model finish on it.
+
+        Args:
+            name (str): Model to switch to
+
+        Raises:
+            Exception: Whatever the loader raised (the active model is then unchanged)
+        """
+        self.load(name)
+        with self._lock:
+            self.active = name
+            # The previous model may now be the one over the limits
+            released = self._evict_over_limit(self.max_models, self.max_bytes, keep=name)
+        self._release_models(released)
+
+    def unload(self, name: str) -> bool:
+        """
+        Unload a model; requests using it finish first.
+
+        Args:
+            name (str): Model to unload
+
+        Returns:
+            bool: False if the model was not loaded
+
+        Raises:
+            ValueError: If name is the active model
+        """
+        with self._lock:
+            if name == self.active:
+                raise ValueError("The active model cannot be unloaded; activate another model first")
+            entry = self._entries.get(name)
+            if entry is None:
+                return False
+            released = self._evict(entry)
+        self._release_models(released)
+        return True
+
+    def loaded(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            List[Dict[str, Any]]: Per loaded model, most recently used first:
+                name, size_bytes, load_seconds, leases (requests using it) and active
+        """
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry.last_used, reverse=True)
+            return [{'name': entry.name, 'size_bytes': entry.size, 'load_seconds': entry.load_seconds,
+                     'leases': entry.leases, 'active': entry.name == self.active} for entry in entries]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: loads, unloads, hits (requests served by an already loaded
+                  model), loaded (model count) and loaded_bytes
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats['loaded'] = len(self._entries)
+            stats['loaded_bytes'] = sum(entry.size for entry in self._entries.values())
+        return stats
+
+    def close(self) -> None:
+        """Unload every model; models in use are released when their requests finish."""
+        with self._lock:
+            released = []
+            for entry in list(self._entries.values()):
+                released.extend(self._evict(entry))
+        self._release_models(released)
+
+    def _acquire(self, name: str) -> _Entry:
+        while True:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    entry.leases += 1
+                    entry.last_used = time.monotonic()
+                    self._counters['hits'] += 1
+                    return entry
+                pending = self._loading.get(name)
+                if pending is None:
+                    # This thread loads the model; others asking for it wait on pending
+                    pending = self._loading[name] = Future()
+                    # Make room first, so max_models holds even while loading
+                    released = self._evict_over_limit(self.max_models - 1, self.max_bytes, keep=name)
+                    loading = True
+                else:
+                    loading = False
+
+            if not loading:
+                # Raises the loader's exception if that load failed
+                pending.result()
+                continue
+
+            self._release_models(released)
+            try:
+                entry = self._load(name)
+            except BaseException as e:
+                with self._lock:
+                    del self._loading[name]
+                pending.set_exception(e)
+                raise
+            with self._lock:
+                del self._loading[name]
+                entry.leases += 1
+                self._entries[name] = entry
+                self._counters['loads'] += 1
+                released = self._evict_over_limit(self.max_models, self.max_bytes, keep=name)
+            pending.set_result(None)
+            self._release_models(released)
+            return entry
+
+    def _load(self, name: str) -> _Entry:
+        rss_before = self._rss()
+        start = time.perf_counter()
+        model = self.loader(name)
+        load_seconds = time.perf_counter() - start
+        size = self.size(model) if self.size else None
+        if size is None:
+            rss_after = self._rss()
+            size = max(rss_after - rss_before, 0) if rss_before is not None and rss_after is not None else 0
+        return _Entry(name, model, size, load_seconds)
+
+    @staticmethod
+    def _rss() -> Optional[int]:
+        try:
+            return process_memory(os.getpid())['rss']
+        except (OSError, KeyError, TypeError):
+            return None
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            released = [entry] if entry.evicted and entry.leases == 0 else []
+        self._release_models(released)
+
+    def _evict_over_limit(self, max_models: int, max_bytes: Optional[int], keep: str) -> List[_Entry]:
+        """Evict least recently used models (never keep or the active one) beyond the limits. Holds the lock."""
+        released = []
+        candidates = sorted((entry for entry in self._entries.values() if entry.name not in (keep, self.active)),
+                            key=lambda entry: entry.last_used)
+        for entry in candidates:
+            too_many = len(self._entries) > max_models
+            too_large = max_bytes is not None and sum(e.size for e in self._entries.values()) > max_bytes
+            if not (too_many or too_large):
+                break
+            released.extend(self._evict(entry))
+        return released
+
+    def _evict(self, entry: _Entry) -> List[_Entry]:
+        """Remove entry from the registry; return it if it can be released now. Holds the lock."""
+        del self._entries[entry.name]
+        entry.evicted = True
+        self._counters['unloads'] += 1
+        return [entry] if entry.leases == 0 else []
+
+    def _release_models(self, entries: List[_Entry]) -> None:
+        """Call the unloader outside the lock and let the memory go."""
+        for entry in entries:
+            if self.unloader:
+                self.unloader(entry.model)
+            entry.model = None
+        if entries:
+            gc.collect()
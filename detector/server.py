@@ -0,0 +1,118 @@
+"""
+HTTP inference service (ASGI) with server-side micro-batching.
+
+Endpoints:
+    POST /analyze        {"text": "..."}          -> analyze_text result dict
+    POST /analyze/batch  {"texts": ["...", ...]}  -> {"results": [result dict, ...]}
+    GET  /health                                  -> model name and batching stats
+    GET  /metrics                                 -> Prometheus text format (detector.metrics)
+
+Concurrent requests are coalesced by an AsyncMicroBatcher into a single
+app.analyze_texts call. Run it with:
+    python -m detector serve --port 8000
+
+Requires the optional starlette and uvicorn packages.
+"""
+
+from typing import Any, Dict, List
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from detector import metrics
+from detector.batching import AsyncMicroBatcher
+
+# Largest number of texts accepted in one /analyze/batch request
+MAX_REQUEST_TEXTS = 256
+
+
+class _BadRequest(Exception):
+    """Raised for invalid request bodies; turned into an error response."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _validate_text(text: Any, max_chars: int) -> str:
+    if not isinstance(text, str) or not text.strip():
+        raise _BadRequest("'text' must be a non-empty string")
+    if len(text) > max_chars:
+        raise _BadRequest(f"Text exceeds {max_chars} characters", status_code=413)
+    return text
+
+
+async def _read_json(request: Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise _BadRequest("Request body must be valid JSON")
+    if not isinstance(body, dict):
+        raise _BadRequest("Request body must be a JSON object")
+    return body
+
+
+def create_app(classifier, max_wait_ms: float, max_batch_texts: int) -> Starlette:
+    """
+    Build the ASGI application around a loaded classifier.
+
+    Args:
+        classifier: Pipeline, OnnxClassifier or ModelPool returned by app.load_model()
+        max_wait_ms (float): How long a request waits for others to batch with
+        max_batch_texts (int): Texts at which a batch is sent without waiting
+
+    Returns:
+        Starlette: The ASGI application; its batcher is at .state.batcher
+    """
+    import app
+
+    def score_batch(texts: List[str]) -> List[Dict[str, Any]]:
+        return app.analyze_texts(texts, classifier, batch_size=max(max_batch_texts, app.BATCH_SIZE))
+
+    # With a ModelPool, keep every replica busy with its own batch
+    batcher = AsyncMicroBatcher(score_batch, max_wait_ms=max_wait_ms, max_texts=max_batch_texts,
+                                concurrency=getattr(classifier, 'replicas', 1))
+
+    async def analyze(request: Request) -> JSONResponse:
+        try:
+            body = await _read_json(request)
+            text = _validate_text(body.get('text'), app.MAX_CHAR_LIMIT)
+        except _BadRequest as e:
+            return JSONResponse({'error': str(e)}, status_code=e.status_code)
+        results = await batcher.submit([text])
+        return JSONResponse(results[0])
+
+    async def analyze_batch(request: Request) -> JSONResponse:
+        try:
+            body = await _read_json(request)
+            texts = body.get('texts')
+            if not isinstance(texts, list) or not texts:
+                raise _BadRequest("'texts' must be a non-empty list of strings")
+            if len(texts) > MAX_REQUEST_TEXTS:
+                raise _BadRequest(f"At most {MAX_REQUEST_TEXTS} texts per request", status_code=413)
+            texts = [_validate_text(text, app.MAX_CHAR_LIMIT) for text in texts]
+        except _BadRequest as e:
+            return JSONResponse({'error': str(e)}, status_code=e.status_code)
+        return JSONResponse({'results': await batcher.submit(texts)})
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({
+            'status': 'ok',
+            'model': classifier.model.config.name_or_path,
+            'batching': batcher.stats()
+        })
+
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(metrics.REGISTRY.render(),
+                                 media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    service = Starlette(routes=[
+        Route('/analyze', analyze, methods=['POST']),
+        Route('/analyze/batch', analyze_batch, methods=['POST']),
+        Route('/health', health, methods=['GET']),
+        Route('/metrics', metrics_endpoint, methods=['GET'])
+    ])
+    service.state.batcher = batcher
+    return service
@@ -0,0 +1,255 @@
+"""
+Pinned, self-contained local model snapshots.
+
+create_snapshot() downloads the model once at a given revision and saves
+config, tokenizer and safetensors weights into one directory together with
+a manifest.json recording the resolved commit hash and a SHA-256 checksum
+and size for every file. load_snapshot() then loads strictly from that
+directory (local_files_only, no Hub requests, no cache re-validation), with
+the safetensors weights memory-mapped rather than read through Python.
+has_snapshot() with a revision only accepts a snapshot taken at that
+revision, so changing the pin downloads the model again.
+
+Files derived from a snapshot (the ONNX export, the int8 model) record the
+revision they were built from with write_source(), and are rebuilt when
+read_source() no longer matches the snapshot.
+
+Memory-mapped weights are also what lets several worker processes share
+one copy: clean pages of the mapped file stay in the page cache and are
+mapped into every process instead of being copied into each. load_snapshot
+checks that the weights really are file-backed (some transformers versions
+and dtype conversions copy them) and re-maps them if they are not.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from safetensors.torch import load_file
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from detector.memory import file_backed_bytes
+
+MANIFEST_FILE = "manifest.json"
+WEIGHTS_FILE = "model.safetensors"
+SOURCE_FILE = "source.json"
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def has_snapshot(snapshot_dir: str, revision: Optional[str] = None) -> bool:
+    """
+    Check whether snapshot_dir holds a finished snapshot.
+
+    Args:
+        snapshot_dir (str): Snapshot directory
+        revision (Optional[str]): Branch, tag or commit hash the snapshot must
+                                  have been taken at; None accepts any
+
+    Returns:
+        bool: True if the manifest exists (it is written last) and, when a
+              revision is given, records it as requested or resolved
+    """
+    if not os.path.exists(os.path.join(snapshot_dir, MANIFEST_FILE)):
+        return False
+    if revision is None:
+        return True
+    manifest = read_manifest(snapshot_dir)
+    return revision in (manifest.get('requested_revision'), manifest['revision'])
+
+
+def read_manifest(snapshot_dir: str) -> Dict[str, Any]:
+    """
+    Read a snapshot's manifest.
+
+    Args:
+        snapshot_dir (str): Snapshot directory
+
+    Returns:
+        dict: model_name, revision (commit hash), requested_revision (as
+              passed to create_snapshot), created_at and
+              files ({name: {'sha256': ..., 'size': ...}})
+    """
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def create_snapshot(model_name: str, snapshot_dir: str, revision: Optional[str] = None,
+                    cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Download a model at a pinned revision and save it as a local snapshot.
+
+    An existing snapshot in snapshot_dir is replaced. The new files are
+    written next to it and renamed into place, so processes that still have
+    the old weights memory-mapped keep reading them.
+
+    Args:
+        model_name (str): Hub name of the model
+        snapshot_dir (str): Directory to write the snapshot to
+        revision (Optional[str]): Branch, tag or commit hash; None means the default branch
+        cache_dir (Optional[str]): Hugging Face download cache used during the download
+
+    Returns:
+        dict: The written manifest
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, revision=revision, cache_dir=cache_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=revision,
+                                                                cache_dir=cache_dir)
+
+    # Until the new manifest is written, the directory is not a finished snapshot
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=os.path.dirname(os.path.abspath(snapshot_dir)))
+    try:
+        # Always safetensors, even if the Hub only has pytorch_model.bin
+        model.save_pretrained(staging_dir, safe_serialization=True)
+        tokenizer.save_pretrained(staging_dir)
+
+        files = {}
+        for name in sorted(os.listdir(staging_dir)):
+            path = os.path.join(staging_dir, name)
+            if os.path.isfile(path):
+                files[name] = {'sha256': _sha256(path), 'size': os.path.getsize(path)}
+                os.replace(path, os.path.join(snapshot_dir, name))
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    # Files of an earlier snapshot that this revision does not have
+    for name in os.listdir(snapshot_dir):
+        path = os.path.join(snapshot_dir, name)
+        if name not in files and os.path.isfile(path):
+            os.remove(path)
+
+    manifest = {
+        'model_name': model_name,
+        # The concrete commit the revision resolved to (None for local paths)
+        'revision': getattr(model.config, '_commit_hash', None) or revision,
+        'requested_revision': revision,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'files': files
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def write_source(output_dir: str, revision: Optional[str]) -> None:
+    """
+    Record the snapshot revision that the files in output_dir were built from.
+
+    Args:
+        output_dir (str): Directory of files derived from a snapshot
+        revision (Optional[str]): The snapshot's revision (manifest['revision'])
+    """
+    with open(os.path.join(output_dir, SOURCE_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'revision': revision}, f, indent=2)
+
+
+def read_source(output_dir: str) -> Optional[str]:
+    """
+    Args:
+        output_dir (str): Directory of files derived from a snapshot
+
+    Returns:
+        Optional[str]: The revision recorded by write_source, None if none was recorded
+    """
+    path = os.path.join(output_dir, SOURCE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['revision']
+
+
+def verify_snapshot(snapshot_dir: str, checksums: bool = False) -> Dict[str, Any]:
+    """
+    Check that every file listed in the manifest is present and intact.
+
+    Sizes are always checked (cheap); SHA-256 checksums only when asked,
+    since hashing the weights takes about a second per 500MB.
+
+    Args:
+        snapshot_dir (str): Snapshot directory
+        checksums (bool): Also compare SHA-256 checksums
+
+    Returns:
+        dict: The manifest
+
+    Raises:
+        FileNotFoundError: If the manifest or a listed file is missing
+        ValueError: If a file's size or checksum does not match
+    """
+    if not has_snapshot(snapshot_dir):
+        raise FileNotFoundError(f"No model snapshot in {snapshot_dir}")
+    manifest = read_manifest(snapshot_dir)
+
+    for name, expected in manifest['files'].items():
+        path = os.path.join(snapshot_dir, name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Snapshot file missing: {path}")
+        if os.path.getsize(path) != expected['size']:
+            raise ValueError(f"Snapshot file has the wrong size: {path}")
+        if checksums and _sha256(path) != expected['sha256']:
+            raise ValueError(f"Snapshot file checksum mismatch: {path}")
+    return manifest
+
+
+def _share_weights(model, weights_path: str) -> None:
+    """Point any weights that were copied into private memory back at the mapped file."""
+    # Non-persistent buffers (e.g. position_ids) are not in the file and always private
+    buffer_bytes = sum(buffer.numel() * buffer.element_size() for buffer in model.buffers())
+    if file_backed_bytes(model, weights_path)['private'] <= buffer_bytes:
+        return
+    # load_file memory-maps the tensors; assign=True adopts them instead of copying
+    model.load_state_dict(load_file(weights_path), strict=False, assign=True)
+    model.tie_weights()
+
+
+def _copy_weights(model) -> None:
+    """Copy memory-mapped weights into private process memory."""
+    for parameter in model.parameters():
+        parameter.data = parameter.data.clone()
+
+
+def load_snapshot(snapshot_dir: str, checksums: bool = False, share_weights: bool = True) -> Tuple[Any, Any]:
+    """
+    Load model and tokenizer strictly from a local snapshot.
+
+    Args:
+        snapshot_dir (str): Snapshot directory written by create_snapshot
+        checksums (bool): Verify SHA-256 checksums before loading
+        share_weights (bool): Keep the weights memory-mapped from the snapshot
+                              file, so processes loading the same snapshot share
+                              one copy. False copies them into this process
+                              (needed only if the file may be modified in place).
+
+    Returns:
+        Tuple[Any, Any]: The model (in eval mode) and its tokenizer. The model
+                         config's _commit_hash is set to the pinned revision.
+
+    Raises:
+        FileNotFoundError: If the snapshot is missing or incomplete
+        ValueError: If a file fails verification
+    """
+    manifest = verify_snapshot(snapshot_dir, checksums=checksums)
+    tokenizer = AutoTokenizer.from_pretrained(snapshot_dir, local_files_only=True)
+    model = AutoModelForSequenceClassification.from_pretrained(snapshot_dir, local_files_only=True,
+                                                               use_safetensors=True)
+    model.eval()
+    if share_weights:
+        _share_weights(model, os.path.join(snapshot_dir, WEIGHTS_FILE))
+    else:
+        _copy_weights(model)
+    # Same attribute transformers sets for Hub downloads; keys the result cache by revision
+    model.config._commit_hash = manifest['revision']
+    return model, tokenizer
@@ -1,40 +1,55 @@
 """
 Pre-download model script
 
-This script downloads and caches the Hugging Face model locally
-so that users don't need to download it every time the app starts.
+This script downloads the Hugging Face model at a pinned revision and saves
+it as a self-contained local snapshot (safetensors weights plus a checksum
+manifest), so the app starts without contacting the Hub.
 
 Run this script once before deploying or running the app:
     python download_model.py
+
+To also export the model for the ONNX Runtime backend (INFERENCE_BACKEND = "onnx"):
+    python download_model.py --onnx
+
+To pin a specific commit of the model:
+    python download_model.py --revision <commit-hash>
 """
 
 from transformers import pipeline
+import argparse
 import os
+import time
+
+from detector.snapshot import create_snapshot, load_snapshot
 
 # Configuration
 MODEL_NAME = "openai-community/roberta-base-openai-detector"
+MODEL_REVISION = "main"  # Branch, tag or commit hash; keep in sync with app.py
 TASK = "text-classification"
 MODEL_CACHE_DIR = "./model_cache"
+MODEL_SNAPSHOT_DIR = os.path.join(MODEL_CACHE_DIR, "snapshot", MODEL_NAME.replace("/", "--"))
+ONNX_MODEL_DIR = os.path.join(MODEL_CACHE_DIR, "onnx", MODEL_NAME.replace("/", "--"))
 
-def download_model():
-    """Download and cache the model locally."""
-    print(f"📥 Downloading model: {MODEL_NAME}")
-    print(f"📁 Cache directory: {MODEL_CACHE_DIR}")
+def download_model(export_onnx_model=False, revision=MODEL_REVISION):
+    """Download the model at a pinned revision into a local snapshot, optionally exporting it to ONNX."""
+    print(f"📥 Downloading model: {MODEL_NAME} @ {revision}")
+    print(f"📁 Snapshot directory: {MODEL_SNAPSHOT_DIR}")
     
     # Create cache directory
     os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
     
-    # Set the Hugging Face cache directory via environment variable
-    os.environ['TRANSFORMERS_CACHE'] = MODEL_CACHE_DIR
-    
     try:
-        # Download model
+        # Download model and save config, tokenizer and safetensors weights with a checksum manifest
         print("⏳ This may take a few minutes on first run...")
-        classifier = pipeline(
-            task=TASK,
-            model=MODEL_NAME,
-            device=-1  # CPU
-        )
+        manifest = create_snapshot(MODEL_NAME, MODEL_SNAPSHOT_DIR, revision=revision,
+                                   cache_dir=MODEL_CACHE_DIR)
+        print(f"📌 Pinned commit: {manifest['revision']}")
+        
+        # Load it back exactly the way the app does (offline, checksums verified)
+        start = time.perf_counter()
+        model, tokenizer = load_snapshot(MODEL_SNAPSHOT_DIR, checksums=True)
+        classifier = pipeline(task=TASK, model=model, tokenizer=tokenizer, device=-1)  # CPU
+        print(f"⚡ Offline load from snapshot: {time.perf_counter() - start:.2f}s")
         
         # Test the model
         print("\n🧪 Testing model...")
@@ -43,8 +58,16 @@ def download_model():
         print(f"✅ Model test successful!")
         print(f"   Result: {result}")
         
+        if export_onnx_model:
+            # Imported lazily: onnxruntime is only needed for the ONNX backend
+            from detector.onnx_backend import export_onnx
+            print(f"\n📦 Exporting ONNX model to {ONNX_MODEL_DIR}...")
+            export_onnx(MODEL_SNAPSHOT_DIR, ONNX_MODEL_DIR, source_revision=manifest['revision'],
+                        local_files_only=True)
+            print("✅ ONNX export successful!")
+        
         print(f"\n✅ Model downloaded and cached successfully!")
-        print(f"📁 Cache location: {os.path.abspath(MODEL_CACHE_DIR)}")
+        print(f"📁 Snapshot location: {os.path.abspath(MODEL_SNAPSHOT_DIR)}")
         print(f"\n💡 You can now run: streamlit run app.py")
         
     except Exception as e:
@@ -56,4 +79,10 @@ def download_model():
         raise
 
 if __name__ == "__main__":
-    download_model()
+    parser = argparse.ArgumentParser(description="Download and cache the detector model")
+    parser.add_argument("--onnx", action="store_true",
+                        help="Also export the model to ONNX for the ONNX Runtime backend")
+    parser.add_argument("--revision", default=MODEL_REVISION,
+                        help="Branch, tag or commit hash to download (default: %(default)s)")
+    args = parser.parse_args()
+    download_model(export_onnx_model=args.onnx, revision=args.revision)
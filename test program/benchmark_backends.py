@@ -0,0 +1,108 @@
+"""
+Inference Backend Comparison
+
+Scores the same texts with the transformers pipeline (torch) and the ONNX
+Runtime backend, checks that their probabilities agree within tolerance, and
+reports p50/p99 single-text latency and batch throughput for each.
+
+Usage:
+    python "test program/benchmark_backends.py"
+    python "test program/benchmark_backends.py" --model ./local/checkpoint --json report.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+from transformers import pipeline
+
+import app
+from benchmark_batching import build_texts
+from detector.onnx_backend import OnnxClassifier, export_onnx, is_exported
+
+# Maximum allowed difference in AI probability (percentage points)
+TOLERANCE = 0.01
+
+
+def measure(classifier, texts, batch_size):
+    """Return AI probabilities, per-call latencies (ms) and batch throughput (texts/s)"""
+    app.analyze_texts(texts[:4], classifier, batch_size=batch_size)  # Warm-up
+
+    probabilities = []
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        result = app.analyze_text(text, classifier)
+        latencies.append((time.perf_counter() - start) * 1000)
+        probabilities.append(result['ai_probability'])
+
+    start = time.perf_counter()
+    app.analyze_texts(texts, classifier, batch_size=batch_size)
+    throughput = len(texts) / (time.perf_counter() - start)
+    return np.array(probabilities), np.array(latencies), throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare torch and ONNX Runtime backends")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--onnx-dir", default=app.ONNX_MODEL_DIR, help="Exported ONNX model directory")
+    parser.add_argument("--texts", type=int, default=100, help="Number of texts to score")
+    parser.add_argument("--batch-size", type=int, default=app.BATCH_SIZE, help="Windows per forward pass")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    # Every call must reach the model, otherwise we would be timing the cache
+    app.ENABLE_RESULT_CACHE = False
+
+    if not is_exported(args.onnx_dir):
+        print(f"📦 Exporting {args.model} to {args.onnx_dir}...")
+        export_onnx(args.model, args.onnx_dir)
+
+    texts = build_texts(args.texts)
+    backends = {
+        'torch': pipeline(task=app.TASK, model=args.model, device=app.DEVICE),
+        'onnx': OnnxClassifier(args.onnx_dir)
+    }
+
+    report = {'texts': len(texts), 'batch_size': args.batch_size,
+              'threads': torch.get_num_threads(), 'backends': {}}
+    probabilities = {}
+    for name, classifier in backends.items():
+        print(f"⏱️  Measuring {name}...")
+        probabilities[name], latencies, throughput = measure(classifier, texts, args.batch_size)
+        report['backends'][name] = {
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'throughput_texts_per_s': throughput
+        }
+
+    max_difference = float(np.max(np.abs(probabilities['torch'] - probabilities['onnx'])))
+    report['max_ai_probability_difference'] = max_difference
+    report['within_tolerance'] = max_difference <= TOLERANCE
+
+    print("\n" + "=" * 60)
+    print(f"Texts: {len(texts)} | Batch size: {args.batch_size} | Threads: {report['threads']}")
+    print("=" * 60)
+    print(f"{'Backend':<8} {'p50 (ms)':>10} {'p99 (ms)':>10} {'Throughput (texts/s)':>22}")
+    for name, stats in report['backends'].items():
+        print(f"{name:<8} {stats['p50_ms']:>10.2f} {stats['p99_ms']:>10.2f} "
+              f"{stats['throughput_texts_per_s']:>22.1f}")
+    status = "✅" if report['within_tolerance'] else "❌"
+    print(f"\n{status} Max AI probability difference: {max_difference:.5f} points (tolerance {TOLERANCE})")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+    return 0 if report['within_tolerance'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Batch Scoring Benchmark
+
+Compares throughput of analyze_texts (length-bucketed batches) against a
+per-item analyze_text loop on the same set of texts.
+
+Usage:
+    python "test program/benchmark_batching.py" --texts 200 --batch-size 16
+    python "test program/benchmark_batching.py" --model ./path/to/local/checkpoint
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from transformers import pipeline
+
+import app
+
+SAMPLE_SENTENCES = [
+    "Artificial intelligence has revolutionized numerous industries in recent years.",
+    "Machine learning algorithms can now analyze vast amounts of data to identify patterns.",
+    "Hey! So I went to that new coffee shop yesterday and omg their latte was amazing!!",
+    "The old house stood at the end of the lane, its windows dark and brooding.",
+    "Make sure to implement proper error handling in your code to avoid unexpected crashes.",
+]
+
+
+def build_texts(count, seed=0):
+    """Build texts of varied length (1 to 40 sentences) to exercise bucketing"""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(1, 40)))
+            for _ in range(count)]
+
+
+def time_call(func):
+    """Return wall-clock seconds taken by func()"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched vs per-item scoring")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--texts", type=int, default=100, help="Number of texts to score")
+    parser.add_argument("--batch-size", type=int, default=app.BATCH_SIZE, help="Windows per forward pass")
+    args = parser.parse_args()
+
+    print("Loading model...")
+    classifier = pipeline(task=app.TASK, model=args.model, device=app.DEVICE)
+    texts = build_texts(args.texts)
+    threads = torch.get_num_threads()
+
+    # Every call must reach the model, otherwise we would be timing the cache
+    app.ENABLE_RESULT_CACHE = False
+
+    # Warm up both paths so one-off allocation costs are not measured
+    app.analyze_texts(texts[:4], classifier, batch_size=args.batch_size)
+    app.analyze_text(texts[0], classifier)
+
+    loop_seconds = time_call(lambda: [app.analyze_text(text, classifier) for text in texts])
+    batch_seconds = time_call(lambda: app.analyze_texts(texts, classifier, batch_size=args.batch_size))
+
+    print("=" * 60)
+    print(f"Texts: {len(texts)} | Batch size: {args.batch_size} | Torch threads: {threads}")
+    print("=" * 60)
+    for name, seconds in [("Per-item loop", loop_seconds), ("analyze_texts", batch_seconds)]:
+        throughput = len(texts) / seconds
+        print(f"{name:<14} {seconds:8.2f}s  {throughput:8.1f} texts/s  "
+              f"{throughput / threads:8.2f} texts/s/core")
+    print(f"\n⚡ Speedup: {loop_seconds / batch_seconds:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Cold Start Benchmark
+
+Times model loading in fresh Python processes, the way the app starts:
+  - Hub pipeline:    pipeline(model=MODEL_NAME), which resolves the model
+                     through the Hugging Face cache (and the Hub, if reachable)
+  - Local snapshot:  load_snapshot() from the pinned safetensors snapshot,
+                     strictly offline with memory-mapped weights
+
+Each mode runs in several new processes and the median is reported, both
+for the load call alone and for the whole process (imports included).
+
+Usage:
+    python "test program/benchmark_cold_start.py" --runs 5
+    python "test program/benchmark_cold_start.py" --model ./local/checkpoint
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Run in a child process; prints the load time as JSON
+CHILD_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from transformers import pipeline
+from detector.snapshot import load_snapshot
+start = time.perf_counter()
+if {mode!r} == "hub":
+    classifier = pipeline(task="text-classification", model={source!r}, device=-1)
+else:
+    model, tokenizer = load_snapshot({source!r})
+    classifier = pipeline(task="text-classification", model=model, tokenizer=tokenizer, device=-1)
+load = time.perf_counter() - start
+classifier("Warm-up sentence.")
+print(json.dumps({{"load": load}}))
+"""
+
+
+def time_cold_start(mode, source, env):
+    """Start a fresh interpreter, load the model once, and return (load, total) seconds"""
+    script = CHILD_SCRIPT.format(root=ROOT, mode=mode, source=source)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", script], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    total = time.perf_counter() - start
+    return json.loads(output.strip().splitlines()[-1])['load'], total
+
+
+def main():
+    import app
+    from detector.snapshot import create_snapshot, has_snapshot, read_manifest
+
+    parser = argparse.ArgumentParser(description="Compare cold-start time of Hub and snapshot loading")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per mode")
+    args = parser.parse_args()
+
+    app.use_model(args.model)
+    if not has_snapshot(app.MODEL_SNAPSHOT_DIR, app.MODEL_REVISION):
+        print(f"📦 Creating snapshot in {app.MODEL_SNAPSHOT_DIR}...")
+        create_snapshot(args.model, app.MODEL_SNAPSHOT_DIR, revision=app.MODEL_REVISION,
+                        cache_dir=app.MODEL_CACHE_DIR)
+
+    # Same cache the Hub pipeline would have used before the snapshot existed
+    hub_env = dict(os.environ, HF_HUB_CACHE=os.path.abspath(app.MODEL_CACHE_DIR))
+    offline_env = dict(os.environ, HF_HUB_OFFLINE="1")
+    modes = {
+        'Hub pipeline': ("hub", args.model, hub_env),
+        'Local snapshot': ("snapshot", app.MODEL_SNAPSHOT_DIR, offline_env)
+    }
+
+    print("=" * 60)
+    print(f"Model: {args.model} (revision {read_manifest(app.MODEL_SNAPSHOT_DIR)['revision']})")
+    print(f"Runs per mode: {args.runs}")
+    print("=" * 60)
+    print(f"{'Mode':<16} {'Load (s)':>10} {'Process (s)':>12}")
+    medians = {}
+    for name, (mode, source, env) in modes.items():
+        timings = [time_cold_start(mode, source, env) for _ in range(args.runs)]
+        medians[name] = statistics.median(load for load, _ in timings)
+        print(f"{name:<16} {medians[name]:>10.2f} {statistics.median(total for _, total in timings):>12.2f}")
+
+    print(f"\n⚡ Snapshot load speedup: {medians['Hub pipeline'] / medians['Local snapshot']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Direct Engine Overhead Benchmark
+
+Measures what the transformers pipeline adds to every call, compared with
+DirectClassifier (detector.engine), on a short and a long (truncated to
+512 tokens) input. Both wrap the same model and tokenizer. Per-call
+overhead is a path's p50 latency minus the p50 of the bare work every
+path must do: tokenize, then one forward pass under torch.inference_mode.
+Also checks that both paths return the same AI probability.
+
+Usage:
+    python "test program/benchmark_engine.py"
+    python "test program/benchmark_engine.py" --model ./local/checkpoint --calls 500 --json report.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+import app
+from benchmark_batching import SAMPLE_SENTENCES
+from detector.engine import DirectClassifier
+
+# Maximum allowed difference in AI probability (0-1 scale)
+TOLERANCE = 1e-5
+
+
+def latencies_ms(func, calls):
+    """Call func() calls times after a warm-up; return each call's latency in ms"""
+    for _ in range(5):
+        func()
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def pipeline_ai_probability(classifier, text):
+    """AI probability the way a pipeline caller reads it: search the label dicts for 'Fake'"""
+    for item in classifier(text, top_k=None, truncation=True):
+        if item['label'] == 'Fake':
+            return item['score']
+    raise ValueError("No 'Fake' label in the pipeline output")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-call overhead of the pipeline and DirectClassifier")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--calls", type=int, default=200, help="Timed calls per input and path")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    print("Loading model...")
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model).eval()
+    paths = {
+        'pipeline': pipeline(task=app.TASK, model=model, tokenizer=tokenizer, device=app.DEVICE),
+        'direct': DirectClassifier(model, tokenizer, device=app.DEVICE)
+    }
+    inputs = {
+        'short': SAMPLE_SENTENCES[0],
+        'long': " ".join(SAMPLE_SENTENCES * 40)
+    }
+
+    def bare(text):
+        encoded = tokenizer(text, truncation=True, return_tensors='pt')
+        with torch.inference_mode():
+            model(**encoded)
+
+    def direct(text):
+        classifier = paths['direct']
+        return classifier(text, top_k=None, truncation=True)[0][0]
+
+    report = {'calls': args.calls, 'threads': torch.get_num_threads(), 'inputs': {}}
+    max_difference = 0.0
+    for input_name, text in inputs.items():
+        tokens = len(tokenizer(text, truncation=True)['input_ids'])
+        print(f"⏱️  Measuring {input_name} input ({tokens} tokens)...")
+        floor = float(np.percentile(latencies_ms(lambda: bare(text), args.calls), 50))
+        stats = {'tokens': tokens, 'bare_p50_ms': floor, 'paths': {}}
+        timed = {'pipeline': lambda: pipeline_ai_probability(paths['pipeline'], text),
+                 'direct': lambda: direct(text)}
+        for path_name, func in timed.items():
+            latencies = latencies_ms(func, args.calls)
+            p50 = float(np.percentile(latencies, 50))
+            stats['paths'][path_name] = {'p50_ms': p50, 'p99_ms': float(np.percentile(latencies, 99)),
+                                         'overhead_ms': p50 - floor}
+        report['inputs'][input_name] = stats
+
+        direct_probability = paths['direct'].score_windows(
+            [tokenizer(text, add_special_tokens=False, truncation=True,
+                       max_length=tokenizer.model_max_length - 2)['input_ids']])[0]
+        difference = abs(pipeline_ai_probability(paths['pipeline'], text) - float(direct_probability))
+        max_difference = max(max_difference, difference)
+
+    report['max_ai_probability_difference'] = max_difference
+    report['within_tolerance'] = max_difference <= TOLERANCE
+
+    print("\n" + "=" * 60)
+    print(f"Calls per measurement: {args.calls} | Torch threads: {report['threads']}")
+    print("=" * 60)
+    print(f"{'Input':<7} {'Path':<9} {'p50 (ms)':>10} {'p99 (ms)':>10} {'Overhead (ms)':>14}")
+    for input_name, stats in report['inputs'].items():
+        print(f"{input_name:<7} {'bare':<9} {stats['bare_p50_ms']:>10.3f} {'':>10} {'':>14}")
+        for path_name, path_stats in stats['paths'].items():
+            print(f"{input_name:<7} {path_name:<9} {path_stats['p50_ms']:>10.3f} {path_stats['p99_ms']:>10.3f} "
+                  f"{path_stats['overhead_ms']:>14.3f}")
+    status = "✅" if report['within_tolerance'] else "❌"
+    print(f"\n{status} Max AI probability difference: {max_difference:.2e} (tolerance {TOLERANCE})")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+    return 0 if report['within_tolerance'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Incremental Rescoring Benchmark
+
+Simulates a reviewer who edits one paragraph of a document and clicks
+Analyze again, several times. Compares app.analyze_text_incremental (only
+changed paragraphs go through the model) with rescoring the full text, and
+reports the fraction of tokens re-inferred on every request.
+
+Usage:
+    python "test program/benchmark_incremental.py" --paragraphs 8 --edits 5
+    python "test program/benchmark_incremental.py" --model ./path/to/local/checkpoint
+"""
+
+import os
+import sys
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transformers import pipeline
+
+import app
+from benchmark_batching import SAMPLE_SENTENCES, time_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental vs full rescoring of an edited document")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--paragraphs", type=int, default=8, help="Paragraphs in the document")
+    parser.add_argument("--sentences", type=int, default=12, help="Sentences per paragraph")
+    parser.add_argument("--edits", type=int, default=5, help="Edit-and-reanalyze rounds")
+    args = parser.parse_args()
+
+    print("Loading model...")
+    classifier = pipeline(task=app.TASK, model=args.model, device=app.DEVICE)
+    rng = random.Random(0)
+    paragraphs = [" ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(args.sentences))
+                  for _ in range(args.paragraphs)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        # A fresh cache, so only this run's paragraphs can be reused
+        app.RESULT_CACHE_PATH = os.path.join(directory, "results.sqlite3")
+        app.analyze_text(paragraphs[0], classifier)  # Warm-up
+        app.analyze_text_incremental("\n\n".join(paragraphs), classifier)
+
+        print("=" * 64)
+        print(f"{'Edit':>4} {'Full (ms)':>10} {'Incremental (ms)':>17} {'Re-inferred':>12}")
+        print("=" * 64)
+        full_total = incremental_total = 0.0
+        for edit in range(1, args.edits + 1):
+            index = rng.randrange(len(paragraphs))
+            paragraphs[index] += f" Edit number {edit} adds this sentence."
+            document = "\n\n".join(paragraphs)
+
+            # The edited document is new, so analyze_text misses the cache and scores it all
+            full_seconds = time_call(lambda: app.analyze_text(document, classifier))
+            result = {}
+            incremental_seconds = time_call(
+                lambda: result.update(app.analyze_text_incremental(document, classifier)))
+
+            full_total += full_seconds
+            incremental_total += incremental_seconds
+            print(f"{edit:>4} {full_seconds * 1000:>10.1f} {incremental_seconds * 1000:>17.1f} "
+                  f"{result['reinferred_fraction']:>11.1%}")
+        app.load_result_cache.clear()
+
+    print(f"\n⚡ Speedup over full rescoring: {full_total / incremental_total:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
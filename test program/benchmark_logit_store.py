@@ -0,0 +1,94 @@
+"""
+Raw-Logit Store Benchmark
+
+Fills a LogitStore with synthetic logits for 1M documents (1 to 4 windows
+each; no model needed) and times what a threshold re-evaluation costs
+once the logits are stored: reopening the memory-mapped store, looking up
+every document, recomputing document probabilities, re-classifying under
+new thresholds, the confusion matrix against the old classification and a
+full ROC sweep.
+
+Usage:
+    python "test program/benchmark_logit_store.py"
+    python "test program/benchmark_logit_store.py" --documents 200000 --aggregation weighted
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from detector.evaluation import CLASSIFICATIONS, auc, classify, confusion_matrix, roc_curve
+from detector.logits import LogitStore
+
+
+def timed(label, func, timings):
+    """Run func(), record its wall-clock seconds under label and return its result"""
+    start = time.perf_counter()
+    result = func()
+    timings[label] = time.perf_counter() - start
+    return result
+
+
+def fill(store, documents, seed=0, chunk=100_000):
+    """Append synthetic documents in chunks; returns their keys"""
+    rng = np.random.default_rng(seed)
+    keys = []
+    for start in range(0, documents, chunk):
+        count = min(chunk, documents - start)
+        chunk_keys = [hashlib.sha256(str(index).encode()).hexdigest() for index in range(start, start + count)]
+        windows = rng.integers(1, 5, size=count)
+        logits = np.split(rng.normal(0, 2, size=(int(windows.sum()), 2)).astype(np.float32), np.cumsum(windows)[:-1])
+        lengths = [rng.integers(1, 511, size=window).tolist() for window in windows]
+        store.append(chunk_keys, logits, lengths)
+        keys.extend(chunk_keys)
+    return keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time threshold re-evaluation over stored logits")
+    parser.add_argument("--documents", type=int, default=1_000_000, help="Documents in the store")
+    parser.add_argument("--aggregation", choices=["mean", "max", "weighted"], default="mean",
+                        help="Window aggregation")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"📦 Writing logits of {args.documents:,} documents...")
+        start = time.perf_counter()
+        keys = fill(LogitStore(directory, num_labels=2, ai_index=0), args.documents)
+        fill_seconds = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)) / 2 ** 20
+
+        timings = {}
+        store = timed("Open store", lambda: LogitStore(directory, num_labels=2, ai_index=0), timings)
+        rows = timed("Look up every key", lambda: store.lookup(keys), timings)
+        probabilities = timed(f"Probabilities ({args.aggregation})",
+                              lambda: store.probabilities(rows, args.aggregation), timings)
+        before = timed("Classify (0.70 / 0.70)", lambda: classify(probabilities, 0.70, 0.70), timings)
+        after = timed("Classify (0.60 / 0.80)", lambda: classify(probabilities, 0.60, 0.80), timings)
+        matrix = timed("Confusion matrix", lambda: confusion_matrix(before, after, len(CLASSIFICATIONS)), timings)
+        positives = np.random.default_rng(1).random(len(probabilities)) < probabilities
+        fpr, tpr, thresholds = timed("ROC sweep", lambda: roc_curve(probabilities, positives), timings)
+
+    print("=" * 60)
+    print(f"Documents: {args.documents:,} | Store size: {size_mb:.0f} MB | Written in {fill_seconds:.1f}s")
+    print("=" * 60)
+    for label, seconds in timings.items():
+        print(f"{label:<28} {seconds * 1000:>10.1f} ms")
+    total = sum(timings.values())
+    print(f"{'Total':<28} {total * 1000:>10.1f} ms")
+    print(f"\nReclassified documents: {int(len(before) - matrix.trace()):,} | "
+          f"ROC thresholds: {len(thresholds):,} | AUC: {auc(fpr, tpr):.3f}")
+    status = "✅" if (rows >= 0).all() else "❌"
+    print(f"{status} Every document found in the store")
+    return 0 if (rows >= 0).all() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
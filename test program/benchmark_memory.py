@@ -0,0 +1,82 @@
+"""
+Shared Model Weights Memory Report
+
+Starts a pool of model replica processes twice: once with each process
+copying the weights into its own memory, and once with the weights
+memory-mapped from the snapshot's safetensors file (SHARE_MODEL_WEIGHTS).
+For every process it reports RSS, PSS and USS (unique set size: memory no
+other process shares). With shared weights the per-process USS drops by
+about the size of the weights, and the total PSS (the real footprint of
+the whole pool) grows by one copy instead of one copy per process.
+
+Usage:
+    python "test program/benchmark_memory.py" --replicas 4
+    python "test program/benchmark_memory.py" --model ./local/checkpoint
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from benchmark_batching import build_texts
+from detector.cli import quiet_streamlit_logging
+from detector.pool import ModelPool
+from detector.snapshot import WEIGHTS_FILE, create_snapshot, has_snapshot
+
+MB = 1024 * 1024
+
+
+def measure(replicas, share_weights):
+    """Start a pool, score a text on every replica, and return its members' memory"""
+    settings = app._replica_settings()
+    settings.update({'SHARE_MODEL_WEIGHTS': share_weights, 'MODEL_REPLICAS': 1})
+    pool = ModelPool(replicas, threads_per_replica=1, pin_cores=False, settings=settings)
+    try:
+        for text in build_texts(replicas * 2):
+            app.analyze_texts([text], pool)
+        return [member['memory'] for member in pool.stats()['members']]
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-process memory with copied vs shared model weights")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--replicas", type=int, default=4, help="Worker processes")
+    args = parser.parse_args()
+
+    app.ENABLE_RESULT_CACHE = False
+    quiet_streamlit_logging()
+    app.use_model(args.model)
+    if not has_snapshot(app.MODEL_SNAPSHOT_DIR, app.MODEL_REVISION):
+        create_snapshot(args.model, app.MODEL_SNAPSHOT_DIR, revision=app.MODEL_REVISION,
+                        cache_dir=app.MODEL_CACHE_DIR)
+    weights_mb = os.path.getsize(os.path.join(app.MODEL_SNAPSHOT_DIR, WEIGHTS_FILE)) / MB
+
+    print("=" * 64)
+    print(f"Model: {args.model} | Weights: {weights_mb:.0f} MB | Processes: {args.replicas}")
+    print("=" * 64)
+    totals = {}
+    for name, share_weights in [('Copied weights', False), ('Shared weights', True)]:
+        memories = measure(args.replicas, share_weights)
+        if any(memory is None for memory in memories):
+            print("❌ /proc/<pid>/smaps_rollup is unavailable; this report needs Linux")
+            return 1
+        print(f"\n{name}")
+        print(f"{'Process':>8} {'RSS (MB)':>10} {'PSS (MB)':>10} {'USS (MB)':>10}")
+        for index, memory in enumerate(memories):
+            print(f"{index:>8} {memory['rss'] / MB:>10.0f} {memory['pss'] / MB:>10.0f} {memory['uss'] / MB:>10.0f}")
+        totals[name] = {key: sum(memory[key] for memory in memories) / MB for key in ('pss', 'uss')}
+        print(f"{'Total':>8} {'':>10} {totals[name]['pss']:>10.0f} {totals[name]['uss']:>10.0f}")
+
+    saved = totals['Copied weights']['pss'] - totals['Shared weights']['pss']
+    print(f"\n💾 Pool footprint (total PSS) reduced by {saved:.0f} MB "
+          f"(ideal: {weights_mb * (args.replicas - 1):.0f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
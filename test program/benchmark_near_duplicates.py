@@ -0,0 +1,81 @@
+"""
+Near-Duplicate Lookup Benchmark
+
+Fills a SimHashIndex with random fingerprints (1M by default) and times
+lookups that hit (a stored fingerprint with a few bits flipped) and lookups
+that miss. Also times fingerprinting a text of MAX_CHAR_LIMIT characters.
+No model is needed.
+
+Usage:
+    python "test program/benchmark_near_duplicates.py"
+    python "test program/benchmark_near_duplicates.py" --texts 5000000 --queries 5000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import app
+from benchmark_batching import SAMPLE_SENTENCES
+from detector.neardup import SimHashIndex, fingerprint
+
+
+def time_each(func, items):
+    """Return per-call latencies of func(item) in microseconds"""
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate index lookups")
+    parser.add_argument("--texts", type=int, default=1_000_000, help="Fingerprints stored in the index")
+    parser.add_argument("--queries", type=int, default=2000, help="Lookups of each kind")
+    parser.add_argument("--max-distance", type=int, default=app.NEAR_DUPLICATE_MAX_DISTANCE,
+                        help="Hamming radius of a near duplicate")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    stored = [rng.getrandbits(64) for _ in range(args.texts)]
+    index = SimHashIndex(args.max_distance)
+    start = time.perf_counter()
+    for row, value in enumerate(stored):
+        index.add(value, row)
+    build_seconds = time.perf_counter() - start
+
+    def near_copy(value):
+        for bit in rng.sample(range(64), args.max_distance):
+            value ^= 1 << bit
+        return value
+
+    hits = [near_copy(value) for value in rng.sample(stored, args.queries)]
+    misses = [rng.getrandbits(64) for _ in range(args.queries)]
+    found = sum(index.query(value) is not None for value in hits)
+    hit_latencies = time_each(index.query, hits)
+    miss_latencies = time_each(index.query, misses)
+
+    text = " ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(200))[:app.MAX_CHAR_LIMIT]
+    fingerprint_latencies = time_each(fingerprint, [text] * 200)
+
+    print("=" * 64)
+    print(f"Stored: {args.texts:,} | Radius: {args.max_distance} bits | Build: {build_seconds:.1f}s")
+    print("=" * 64)
+    print(f"{'Operation':<26} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for name, latencies in [("Lookup (near duplicate)", hit_latencies), ("Lookup (no match)", miss_latencies),
+                            (f"Fingerprint {len(text)} chars", fingerprint_latencies)]:
+        print(f"{name:<26} {np.percentile(latencies, 50):>10.1f} {np.percentile(latencies, 99):>10.1f}")
+    print(f"\n🎯 Near duplicates found: {found}/{len(hits)}")
+    return 0 if found == len(hits) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Model Pool Scaling Benchmark
+
+Measures throughput under concurrent load for every replicas x threads
+combination that fits on this host (replicas * threads <= CPU cores), giving
+a scaling curve for choosing MODEL_REPLICAS and THREADS_PER_REPLICA. Each
+combination starts a fresh ModelPool and is hit by many client threads
+sending one text per request, like independent users.
+
+Usage:
+    python "test program/benchmark_pool.py" --requests 256 --clients 32
+    python "test program/benchmark_pool.py" --configs 1x8 2x4 4x2 8x1 --output scaling.json
+    python "test program/benchmark_pool.py" --model ./local/checkpoint
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import app
+from benchmark_batching import build_texts
+from detector.cli import quiet_streamlit_logging
+from detector.pool import ModelPool, available_cores
+
+
+def default_configs(cores):
+    """Every power-of-two replicas x threads split with replicas * threads <= cores"""
+    powers = [2 ** exponent for exponent in range(cores.bit_length()) if 2 ** exponent <= cores]
+    return [(replicas, threads) for replicas in powers for threads in powers if replicas * threads <= cores]
+
+
+def run_load(pool, texts, clients):
+    """Send one analyze_texts call per text from many threads; return (texts/s, latencies ms)"""
+    def request(text):
+        start = time.perf_counter()
+        app.analyze_texts([text], pool)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        latencies = list(executor.map(request, texts))
+    return len(texts) / (time.perf_counter() - start), np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput vs model replicas x threads per replica")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--configs", nargs="+", default=None,
+                        help="REPLICASxTHREADS pairs, e.g. 1x8 2x4 (default: all that fit)")
+    parser.add_argument("--requests", type=int, default=128, help="Requests per configuration")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent client threads")
+    parser.add_argument("--no-pin", action="store_true", help="Do not pin replicas to cores")
+    parser.add_argument("--output", default=None, help="Write the scaling curve to this JSON file")
+    args = parser.parse_args()
+
+    # Every request must reach the model, otherwise we would be timing the cache
+    app.ENABLE_RESULT_CACHE = False
+    quiet_streamlit_logging()
+
+    cores = len(available_cores())
+    if args.configs:
+        configs = [tuple(int(part) for part in config.lower().split("x")) for config in args.configs]
+    else:
+        configs = default_configs(cores)
+    texts = build_texts(args.requests)
+
+    print("=" * 72)
+    print(f"Cores: {cores} | Requests: {args.requests} | Clients: {args.clients}")
+    print("=" * 72)
+    print(f"{'Replicas':>8} {'Threads':>8} {'Texts/s':>9} {'p50 (ms)':>10} {'p99 (ms)':>10} {'Speedup':>8}")
+    curve = []
+    for replicas, threads in configs:
+        pool = ModelPool(replicas, threads, model_name=args.model, pin_cores=not args.no_pin)
+        try:
+            run_load(pool, texts[:replicas * 2], args.clients)  # Warm-up every replica
+            throughput, latencies = run_load(pool, texts, args.clients)
+        finally:
+            pool.close()
+        baseline = curve[0]['texts_per_second'] if curve else throughput
+        curve.append({
+            'replicas': replicas,
+            'threads_per_replica': threads,
+            'texts_per_second': round(throughput, 2),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 1),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 1)
+        })
+        print(f"{replicas:>8} {threads:>8} {throughput:>9.1f} {curve[-1]['p50_ms']:>10.1f} "
+              f"{curve[-1]['p99_ms']:>10.1f} {throughput / baseline:>7.2f}x")
+
+    best = max(curve, key=lambda point: point['texts_per_second'])
+    print(f"\n🏆 Best: MODEL_REPLICAS = {best['replicas']}, THREADS_PER_REPLICA = {best['threads_per_replica']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'cores': cores, 'requests': args.requests, 'clients': args.clients, 'curve': curve}, f, indent=2)
+        print(f"📄 Scaling curve written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
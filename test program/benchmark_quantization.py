@@ -0,0 +1,118 @@
+"""
+INT8 Quantization Drift Report
+
+Scores a labeled sample with the fp32 model and its dynamic INT8 variant and
+reports accuracy, agreement, probability drift, latency and weight size, so
+we can decide whether QUANTIZED_MODEL is safe to enable.
+
+The sample is a JSONL file with one {"text": ..., "label": "ai" | "human"}
+object per line (defaults to labeled_sample.jsonl next to this script).
+
+Usage:
+    python "test program/benchmark_quantization.py"
+    python "test program/benchmark_quantization.py" --data my_sample.jsonl --json drift.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+from transformers import pipeline
+
+import app
+from detector.quantization import QUANTIZED_WEIGHTS_FILE, is_quantized, load_quantized, quantize_model
+
+DEFAULT_SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "labeled_sample.jsonl")
+
+
+def load_sample(path):
+    """Read texts and labels (1 = AI, 0 = human) from a labeled JSONL file"""
+    texts, labels = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                texts.append(record['text'])
+                labels.append(1 if record['label'] == 'ai' else 0)
+    return texts, np.array(labels)
+
+
+def score(classifier, texts, batch_size):
+    """Return AI probabilities (0-100), classifications and ms per text"""
+    app.analyze_texts(texts[:2], classifier, batch_size=batch_size)  # Warm-up
+    start = time.perf_counter()
+    results = app.analyze_texts(texts, classifier, batch_size=batch_size)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return (np.array([result['ai_probability'] for result in results]),
+            [result['classification'] for result in results],
+            elapsed_ms / len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32 and dynamic INT8 detectors")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--quantized-dir", default=app.QUANTIZED_MODEL_DIR, help="Quantized model directory")
+    parser.add_argument("--data", default=DEFAULT_SAMPLE, help="Labeled JSONL sample")
+    parser.add_argument("--batch-size", type=int, default=app.BATCH_SIZE, help="Windows per forward pass")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    # Every call must reach the model, otherwise we would be measuring the cache
+    app.ENABLE_RESULT_CACHE = False
+
+    if not is_quantized(args.quantized_dir):
+        print(f"📦 Quantizing {args.model} into {args.quantized_dir}...")
+        quantize_model(args.model, args.quantized_dir)
+
+    fp32 = pipeline(task=app.TASK, model=args.model, device=-1)
+    model, tokenizer = load_quantized(args.quantized_dir)
+    int8 = pipeline(task=app.TASK, model=model, tokenizer=tokenizer, device=-1)
+
+    texts, labels = load_sample(args.data)
+    fp32_probs, fp32_classes, fp32_ms = score(fp32, texts, args.batch_size)
+    int8_probs, int8_classes, int8_ms = score(int8, texts, args.batch_size)
+
+    fp32_bytes = sum(tensor.numel() * tensor.element_size() for tensor in fp32.model.state_dict().values())
+    int8_bytes = os.path.getsize(os.path.join(args.quantized_dir, QUANTIZED_WEIGHTS_FILE))
+    drift = np.abs(fp32_probs - int8_probs)
+
+    report = {
+        'samples': len(texts),
+        'threads': torch.get_num_threads(),
+        'fp32_accuracy': float(np.mean((fp32_probs > 50) == labels)),
+        'int8_accuracy': float(np.mean((int8_probs > 50) == labels)),
+        'classification_agreement': float(np.mean([a == b for a, b in zip(fp32_classes, int8_classes)])),
+        'mean_probability_drift': float(drift.mean()),
+        'max_probability_drift': float(drift.max()),
+        'fp32_ms_per_text': fp32_ms,
+        'int8_ms_per_text': int8_ms,
+        'fp32_weights_mb': fp32_bytes / 1e6,
+        'int8_weights_mb': int8_bytes / 1e6
+    }
+
+    print("=" * 60)
+    print(f"Quantization Drift Report ({report['samples']} samples, {report['threads']} threads)")
+    print("=" * 60)
+    print(f"{'':<24} {'fp32':>10} {'int8':>10}")
+    print(f"{'Accuracy':<24} {report['fp32_accuracy']:>10.1%} {report['int8_accuracy']:>10.1%}")
+    print(f"{'Latency (ms/text)':<24} {fp32_ms:>10.2f} {int8_ms:>10.2f}")
+    print(f"{'Weights (MB)':<24} {report['fp32_weights_mb']:>10.1f} {report['int8_weights_mb']:>10.1f}")
+    print(f"\nClassification agreement: {report['classification_agreement']:.1%}")
+    print(f"AI probability drift:     mean {report['mean_probability_drift']:.2f} / "
+          f"max {report['max_probability_drift']:.2f} points")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Sentence Heatmap Benchmark
+
+Times app.analyze_sentences (every sentence of a document in one batched
+forward pass) against calling the classifier pipeline once per sentence,
+on documents of 50 sentences by default.
+
+Usage:
+    python "test program/benchmark_sentences.py" --sentences 50 --documents 5
+    python "test program/benchmark_sentences.py" --context 1
+    python "test program/benchmark_sentences.py" --model ./path/to/local/checkpoint
+"""
+
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from transformers import pipeline
+
+import app
+from benchmark_batching import SAMPLE_SENTENCES, time_call
+
+
+def build_document(sentences, seed=0):
+    """Build one document of the given number of sentences"""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(sentences))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched sentence scoring vs one call per sentence")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--sentences", type=int, default=50, help="Sentences per document")
+    parser.add_argument("--documents", type=int, default=5, help="Documents to score")
+    parser.add_argument("--context", type=int, default=app.SENTENCE_CONTEXT,
+                        help="Neighbouring sentences on each side in each window")
+    args = parser.parse_args()
+
+    print("Loading model...")
+    classifier = pipeline(task=app.TASK, model=args.model, device=app.DEVICE)
+    documents = [build_document(args.sentences, seed) for seed in range(args.documents)]
+    sentences = [[document[start:end] for start, end in app._split_sentences(document)] for document in documents]
+
+    # Warm up both paths so one-off allocation costs are not measured
+    app.analyze_sentences(documents[0], classifier, context=args.context)
+    classifier(sentences[0][0])
+
+    loop_seconds = time_call(lambda: [classifier(sentence) for document in sentences for sentence in document])
+    batch_seconds = time_call(lambda: [app.analyze_sentences(document, classifier, context=args.context)
+                                       for document in documents])
+
+    print("=" * 60)
+    print(f"Documents: {args.documents} | Sentences each: {args.sentences} | "
+          f"Context: {args.context} | Torch threads: {torch.get_num_threads()}")
+    print("=" * 60)
+    for name, seconds in [("Per-sentence calls", loop_seconds), ("analyze_sentences", batch_seconds)]:
+        print(f"{name:<19} {seconds:8.3f}s  {seconds / args.documents * 1000:9.1f} ms/document")
+    print(f"\n⚡ Speedup: {loop_seconds / batch_seconds:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
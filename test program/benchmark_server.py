@@ -0,0 +1,91 @@
+"""
+HTTP Service Load Test
+
+Sends many concurrent /analyze requests to the ASGI app (in-process, via
+httpx's ASGI transport) with micro-batching off and on, and reports
+throughput, latency and how many requests were coalesced per batch.
+
+Usage:
+    python "test program/benchmark_server.py" --requests 200 --concurrency 32
+    python "test program/benchmark_server.py" --model ./local/checkpoint
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import numpy as np
+from transformers import pipeline
+
+import app
+from benchmark_batching import build_texts
+from detector.cli import quiet_streamlit_logging
+from detector.server import create_app
+
+
+async def run_load(service, texts, concurrency):
+    """Send one /analyze request per text with bounded concurrency"""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=service)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://detector") as client:
+        async def send(text):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/analyze", json={'text': text})
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(text) for text in texts))
+        elapsed = time.perf_counter() - start
+    return len(texts) / elapsed, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the HTTP service with and without coalescing")
+    parser.add_argument("--model", default=app.MODEL_NAME, help="Hub name or local checkpoint path")
+    parser.add_argument("--requests", type=int, default=200, help="Total /analyze requests")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+    parser.add_argument("--max-wait-ms", type=float, default=app.MICROBATCH_MAX_WAIT_MS)
+    parser.add_argument("--max-batch", type=int, default=app.MICROBATCH_MAX_TEXTS)
+    args = parser.parse_args()
+
+    # Every request must reach the model, otherwise we would be timing the cache
+    app.ENABLE_RESULT_CACHE = False
+    quiet_streamlit_logging()
+
+    classifier = pipeline(task=app.TASK, model=args.model, device=app.DEVICE)
+    texts = build_texts(args.requests)
+    modes = {
+        'No coalescing': (0, 1),
+        'Micro-batching': (args.max_wait_ms, args.max_batch)
+    }
+
+    print("=" * 72)
+    print(f"Requests: {args.requests} | Concurrency: {args.concurrency}")
+    print("=" * 72)
+    print(f"{'Mode':<16} {'Req/s':>8} {'p50 (ms)':>10} {'p99 (ms)':>10} {'Req/batch':>10}")
+    throughputs = {}
+    for name, (max_wait_ms, max_batch) in modes.items():
+        service = create_app(classifier, max_wait_ms=max_wait_ms, max_batch_texts=max_batch)
+        asyncio.run(run_load(service, texts[:8], args.concurrency))  # Warm-up
+        service = create_app(classifier, max_wait_ms=max_wait_ms, max_batch_texts=max_batch)
+        throughput, latencies = asyncio.run(run_load(service, texts, args.concurrency))
+        stats = service.state.batcher.stats()
+        throughputs[name] = throughput
+        print(f"{name:<16} {throughput:>8.1f} {np.percentile(latencies, 50):>10.1f} "
+              f"{np.percentile(latencies, 99):>10.1f} {stats['requests'] / stats['batches']:>10.1f}")
+
+    print(f"\n⚡ Coalescing speedup: {throughputs['Micro-batching'] / throughputs['No coalescing']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
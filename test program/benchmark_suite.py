@@ -0,0 +1,184 @@
+"""
+Detector Microbenchmark Suite
+
+Times the stages of analyze_text separately:
+  - tokenize:     the single tokenizer call plus window splitting
+  - forward:      padding, the model forward pass and softmax (_score_windows)
+  - postprocess:  window aggregation and result building
+  - end_to_end:   analyze_texts with the result cache off
+for every combination of text length (tokens), batch size (texts per call)
+and torch thread count, and writes the timings as JSON.
+
+By default it runs fully offline on a generated tiny random checkpoint with
+the detector's Fake/Real labels (see tiny_model.py), so it can run on any
+Linux host to track regressions; --model points it at a real checkpoint.
+--baseline compares against an earlier JSON run and exits with 1 if any
+stage got slower than the tolerance allows.
+
+Usage:
+    python "test program/benchmark_suite.py" --output results.json
+    python "test program/benchmark_suite.py" --preset base --threads 1 2 4
+    python "test program/benchmark_suite.py" --baseline results.json --tolerance 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+import transformers
+from transformers import pipeline
+
+import app
+from benchmark_batching import build_texts
+from detector.cli import quiet_streamlit_logging
+from tiny_model import PRESETS, make_tiny_checkpoint
+
+
+def texts_of_length(tokenizer, tokens, count):
+    """Build count distinct texts of about the given number of tokens"""
+    texts = []
+    for source in build_texts(count, seed=tokens):
+        # Repeat the source until it is long enough, then cut at the token budget
+        ids = tokenizer(source, add_special_tokens=False)['input_ids']
+        ids = (ids * (tokens // max(len(ids), 1) + 1))[:tokens]
+        texts.append(tokenizer.decode(ids))
+    return texts
+
+
+def measure(func, repeats):
+    """Run func repeats times after one warm-up; return timings in milliseconds"""
+    func()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def benchmark_stages(classifier, texts, repeats):
+    """Time each stage of analyze_texts on one batch; returns {stage: [ms, ...]}"""
+    tokenizer = classifier.tokenizer
+    body_size = app.WINDOW_TOKENS - tokenizer.num_special_tokens_to_add(pair=False)
+
+    def tokenize():
+        encodings = tokenizer(texts, add_special_tokens=False, return_attention_mask=False,
+                              return_offsets_mapping=tokenizer.is_fast, verbose=False)
+        return [app._split_windows(ids, body_size, app.WINDOW_OVERLAP) for ids in encodings['input_ids']]
+
+    windows_per_text = tokenize()
+    windows = [window for text_windows in windows_per_text for window in text_windows]
+    scores = app._score_windows(windows, classifier)
+
+    def postprocess():
+        offset = 0
+        for text_windows in windows_per_text:
+            text_scores = scores[offset:offset + len(text_windows)]
+            offset += len(text_windows)
+            ai_prob = app._aggregate_window_scores(text_scores, [len(w) for w in text_windows],
+                                                   app.WINDOW_AGGREGATION) * 100
+            app._build_result(ai_prob, 100 - ai_prob)
+
+    return {
+        'tokenize': measure(tokenize, repeats),
+        'forward': measure(lambda: app._score_windows(windows, classifier), repeats),
+        'postprocess': measure(postprocess, repeats),
+        'end_to_end': measure(lambda: app.analyze_texts(texts, classifier, batch_size=len(windows)), repeats)
+    }
+
+
+def compare(results, baseline_path, tolerance):
+    """Return the results whose median is slower than the baseline by more than tolerance"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['stage'], r['tokens'], r['batch_size'], r['threads']): r['median_ms']
+                    for r in json.load(f)['results']}
+    regressions = []
+    for result in results:
+        key = (result['stage'], result['tokens'], result['batch_size'], result['threads'])
+        if key in baseline and result['median_ms'] > baseline[key] * (1 + tolerance):
+            regressions.append((result, baseline[key]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage detector microbenchmarks (JSON output)")
+    parser.add_argument("--model", default=None,
+                        help="Checkpoint to benchmark (default: a generated random checkpoint)")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="tiny",
+                        help="Shape of the generated checkpoint")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[64, 256, 510, 2048],
+                        help="Text lengths in tokens")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32], help="Texts per call")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="torch thread counts")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per measurement")
+    parser.add_argument("--output", default=None, help="Write the JSON results to this file")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    # Every call must reach the model, otherwise we would be timing the cache
+    app.ENABLE_RESULT_CACHE = False
+    quiet_streamlit_logging()
+    transformers.logging.set_verbosity_error()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model or make_tiny_checkpoint(os.path.join(tmp, "detector"), preset=args.preset)
+        classifier = pipeline(task=app.TASK, model=model_path, device=app.DEVICE)
+
+        results = []
+        print(f"{'Stage':<12} {'Tokens':>7} {'Batch':>6} {'Threads':>8} {'Median (ms)':>12} {'Per text (ms)':>14}")
+        for threads in sorted(set(args.threads)):
+            torch.set_num_threads(threads)
+            for tokens in args.lengths:
+                for batch_size in args.batch_sizes:
+                    texts = texts_of_length(classifier.tokenizer, tokens, batch_size)
+                    for stage, timings in benchmark_stages(classifier, texts, args.repeats).items():
+                        median = statistics.median(timings)
+                        results.append({
+                            'stage': stage, 'tokens': tokens, 'batch_size': batch_size, 'threads': threads,
+                            'median_ms': round(median, 4), 'min_ms': round(min(timings), 4),
+                            'per_text_ms': round(median / batch_size, 4)
+                        })
+                        print(f"{stage:<12} {tokens:>7} {batch_size:>6} {threads:>8} "
+                              f"{median:>12.2f} {median / batch_size:>14.3f}")
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'torch': torch.__version__,
+            'transformers': transformers.__version__
+        },
+        'model': args.model or f"random:{args.preset}",
+        'repeats': args.repeats,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for result, previous in regressions:
+            print(f"❌ {result['stage']} ({result['tokens']} tokens, batch {result['batch_size']}, "
+                  f"{result['threads']} threads): {previous:.2f} -> {result['median_ms']:.2f} ms")
+        if regressions:
+            return 1
+        print(f"✅ No stage slower than baseline by more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Cascade Pre-Classifier Tests
+
+Verifies that the hashed n-gram pre-classifier of detector.cascade learns
+from soft targets, survives a save/load round trip, and that escalate()
+keeps only clear-cut texts away from the transformer. No model is needed:
+the targets are synthetic.
+"""
+
+import os
+import sys
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from detector.cascade import HashedNgramModel, agreement, escalate
+
+FORMAL = ["Furthermore, it is important to note that", "In conclusion, this clearly demonstrates that",
+          "Additionally, the proposed approach leverages", "Overall, these findings highlight that"]
+CASUAL = ["lol honestly i think", "so yeah we went there and", "ugh my cat literally just", "tbh no idea why"]
+FILLER = "the data people work time system new good way part world life team plan".split()
+
+
+def build_dataset(count, seed=0):
+    """Texts in a formal style (target 0.95), a casual style (0.05) or a mix (0.5)"""
+    rng = random.Random(seed)
+    texts, targets = [], []
+    for index in range(count):
+        openers, target = [(FORMAL, 0.95), (CASUAL, 0.05), (FORMAL + CASUAL, 0.5)][index % 3]
+        texts.append(" ".join(f"{rng.choice(openers)} {' '.join(rng.choice(FILLER) for _ in range(8))}."
+                              for _ in range(rng.randint(2, 5))))
+        targets.append(target)
+    return texts, np.array(targets)
+
+
+def test_training():
+    """Test fitting, prediction and persistence"""
+    print("=" * 60)
+    print("Hashed N-gram Pre-Classifier")
+    print("=" * 60)
+
+    texts, targets = build_dataset(600)
+    model = HashedNgramModel(dimensions=2 ** 16).fit(texts[:480], targets[:480], epochs=10)
+    predicted = model.predict_proba(texts[480:])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cascade.npz")
+        model.save(path)
+        reloaded = HashedNgramModel.load(path)
+
+    checks = {
+        'Learns the soft targets': float(np.abs(predicted - targets[480:]).mean()) < 0.2,
+        'Separates the two styles': predicted[targets[480:] == 0.95].min() > predicted[targets[480:] == 0.05].max(),
+        'Save/load round trip': np.allclose(reloaded.predict_proba(texts[:10]), model.predict_proba(texts[:10])),
+        'Empty input': model.predict_proba([]).shape == (0,)
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def test_escalation():
+    """Test the uncertainty band and the agreement measure"""
+    print("\n" + "=" * 60)
+    print("Escalation Band")
+    print("=" * 60)
+
+    probabilities = np.array([0.99, 0.86, 0.80, 0.50, 0.20, 0.14, 0.01])
+    escalated = escalate(probabilities, ai_threshold=0.70, human_threshold=0.70, margin=0.15)
+
+    checks = {
+        'Clear-cut texts answered': escalated.tolist() == [False, False, True, True, True, False, False],
+        'No margin: everything outside the mixed band answered': escalate(
+            probabilities, 0.70, 0.70, 0.0).tolist() == [False, False, False, True, False, False, False],
+        'Agreement': agreement(["AI", "Human", "AI"], ["AI", "AI", "AI"]) == 2 / 3,
+        'Masked agreement': agreement(["AI", "Human"], ["AI", "AI"], np.array([True, False])) == 1.0,
+        'Nothing to compare': agreement([], []) is None
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all cascade tests"""
+    results = [test_training(), test_escalation()]
+    print("\n" + ("✅ All cascade tests passed" if all(results) else "❌ Some cascade tests failed"))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Distillation Tests
+
+Distills a tiny random teacher (see tiny_model.py) into a narrower
+one-layer student and checks the student's shape, that training moves it
+towards the teacher, and that the saved checkpoint loads like any other
+model. Also checks that a same-width student starts from the teacher's
+layers. Runs offline in a few seconds.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from benchmark_batching import build_texts
+from detector.distill import build_student, distill, save_student, teacher_logits
+from detector.memory import parameter_bytes
+from tiny_model import make_tiny_checkpoint
+
+
+def kl_to_teacher(student, teacher_probabilities, tokenizer, texts):
+    """Mean KL divergence of the student's predictions from the teacher's"""
+    log_probabilities = torch.log_softmax(teacher_logits(student, tokenizer, texts), dim=-1)
+    return torch.nn.functional.kl_div(log_probabilities, teacher_probabilities, reduction='batchmean').item()
+
+
+def test_distillation():
+    """Test student construction, training and export"""
+    print("=" * 60)
+    print("Knowledge Distillation")
+    print("=" * 60)
+
+    texts = build_texts(48)
+    with tempfile.TemporaryDirectory() as directory:
+        teacher_dir = os.path.join(directory, "teacher")
+        student_dir = os.path.join(directory, "student")
+        make_tiny_checkpoint(teacher_dir)
+        teacher = AutoModelForSequenceClassification.from_pretrained(teacher_dir)
+        tokenizer = AutoTokenizer.from_pretrained(teacher_dir)
+
+        # A larger gap from the teacher than the default, so training has something to close
+        teacher_probabilities = torch.softmax(teacher_logits(teacher, tokenizer, texts) * 50, dim=-1)
+        teacher.classifier.out_proj.weight.data *= 50
+        teacher.classifier.out_proj.bias.data *= 50
+
+        copied = build_student(teacher, layers=1)
+        # Same seed as distill(), so this is the narrow student before training
+        torch.manual_seed(0)
+        untrained = build_student(teacher, layers=1, hidden_size=16)
+        student = distill(teacher, tokenizer, texts, layers=1, hidden_size=16, epochs=5, batch_size=8,
+                          learning_rate=1e-3, temperature=1.0)
+        save_student(student, tokenizer, student_dir, details={'teacher': teacher_dir})
+        reloaded = AutoModelForSequenceClassification.from_pretrained(student_dir)
+
+        checks = {
+            'Student has fewer layers': student.config.num_hidden_layers == 1,
+            'Student is smaller': parameter_bytes(student) < parameter_bytes(teacher),
+            'Same-width student starts from the teacher\'s last layer': torch.equal(
+                copied.state_dict()['roberta.encoder.layer.0.output.dense.weight'],
+                teacher.state_dict()['roberta.encoder.layer.1.output.dense.weight']),
+            'Training moves it towards the teacher': (kl_to_teacher(student, teacher_probabilities, tokenizer, texts)
+                                                      < kl_to_teacher(untrained, teacher_probabilities, tokenizer,
+                                                                      texts)),
+            'Labels kept': reloaded.config.id2label == teacher.config.id2label,
+            'Checkpoint reloads': torch.allclose(teacher_logits(reloaded, tokenizer, texts[:4]),
+                                                 teacher_logits(student, tokenizer, texts[:4]), atol=1e-5),
+            'Narrower student keeps the head size': student.config.num_attention_heads == 1
+        }
+
+        try:
+            build_student(teacher, layers=3)
+            checks['Too many layers rejected'] = False
+        except ValueError:
+            checks['Too many layers rejected'] = True
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all distillation tests"""
+    passed = test_distillation()
+    print("\n" + ("✅ All distillation tests passed" if passed else "❌ Some distillation tests failed"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Model Ensemble Tests
+
+Builds an ensemble of three tiny random checkpoints (see tiny_model.py)
+that share one tokenizer, one of them with its own label names. Checks
+that texts are tokenized once for all members, that the combined
+probability is the weighted mean of what each member scores on its own,
+and that per-member probabilities and latencies are reported for batches,
+sentences and paragraphs. Runs offline in a few seconds.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from benchmark_batching import build_texts
+from detector import metrics
+from detector.cli import quiet_streamlit_logging
+from tiny_model import make_tiny_checkpoint
+
+
+def relabel(checkpoint_dir, labels):
+    """Rename a checkpoint's labels, like a detector trained with other label names"""
+    path = os.path.join(checkpoint_dir, "config.json")
+    with open(path) as f:
+        config = json.load(f)
+    config['id2label'] = {str(index): label for index, label in enumerate(labels)}
+    config['label2id'] = {label: index for index, label in enumerate(labels)}
+    with open(path, 'w') as f:
+        json.dump(config, f)
+
+
+def tokenize_calls():
+    """Tokenizer calls recorded so far"""
+    return metrics.STAGE_SECONDS.quantiles((), stage="tokenize")['count']
+
+
+def test_ensemble():
+    """Test ensemble loading, scoring and reporting"""
+    print("=" * 60)
+    print("Model Ensemble")
+    print("=" * 60)
+
+    quiet_streamlit_logging()
+    saved = {name: getattr(app, name) for name in
+             ("ENABLE_RESULT_CACHE", "NEAR_DUPLICATE_MODE", "MODEL_CACHE_DIR", "ENSEMBLE_MODELS")}
+    try:
+        app.ENABLE_RESULT_CACHE = False
+        app.NEAR_DUPLICATE_MODE = "off"
+        texts = build_texts(6)
+        with tempfile.TemporaryDirectory() as directory:
+            app.MODEL_CACHE_DIR = directory
+            names = [make_tiny_checkpoint(os.path.join(directory, name), seed=seed)
+                     for seed, name in enumerate(["first", "second", "third"])]
+            relabel(names[2], ["AI", "Human"])
+            app.ENSEMBLE_MODELS = [{'name': names[0], 'weight': 1.0}, names[1],
+                                   {'name': names[2], 'weight': 2.0, 'ai_label': "AI", 'human_label': "Human"}]
+            ensemble = app.load_model()
+
+            before = tokenize_calls()
+            results = app._analyze_batch(texts, classifier=ensemble, aggregation="mean", batch_size=4, windowed=True)
+            tokenized_once = tokenize_calls() - before == 1
+
+            alone = [app._analyze_batch(texts, classifier=member.classifier, aggregation="mean", batch_size=4,
+                                        windowed=True) for member in ensemble.members]
+            weighted = [(alone[0][index]['ai_probability'] + alone[1][index]['ai_probability']
+                         + 2 * alone[2][index]['ai_probability']) / 4 for index in range(len(texts))]
+
+            sentences = app._score_sentences(texts[0], classifier=ensemble, context=0)
+            member_sentences = [app._score_sentences(texts[0], classifier=member.classifier, context=0)
+                                for member in ensemble.members]
+            paragraphs = app.analyze_text_incremental(texts[0] + "\n\n" + texts[1], ensemble)
+
+            checks = {
+                'Members sharing a tokenizer form one group': len(ensemble.tokenizer_groups()) == 1,
+                'Texts tokenized once for all members': tokenized_once,
+                'Combined score is the weighted mean': all(abs(result['ai_probability'] - expected) < 1e-6
+                                                           for result, expected in zip(results, weighted)),
+                'Member scores match scoring alone': all(
+                    abs(result['members'][position]['ai_probability'] - alone[position][index]['ai_probability']) < 1e-6
+                    for index, result in enumerate(results) for position in range(3)),
+                'Classification fields filled': all(result['classification'] and result['confidence_level']
+                                                    for result in results),
+                'Member latency reported': all(member['latency_ms'] > 0 for member in results[0]['members']),
+                'Sentence scores combined': all(
+                    abs(sentence['ai_probability'] - (member_sentences[0][index]['ai_probability']
+                                                      + member_sentences[1][index]['ai_probability']
+                                                      + 2 * member_sentences[2][index]['ai_probability']) / 4) < 1e-6
+                    for index, sentence in enumerate(sentences)),
+                'Paragraph scores combined': (len(paragraphs['members']) == 3
+                                              and paragraphs['paragraphs_reinferred'] == 2),
+                'Cache keys depend on the members': (app._cache_key("text", ensemble, "mean", True)
+                                                     != app._cache_key("text", ensemble.members[0].classifier,
+                                                                       "mean", True)),
+            }
+            ensemble.close()
+
+            app.ENSEMBLE_MODELS = [names[0], names[2]]
+            try:
+                app._load_ensemble()
+                checks['Unknown labels rejected'] = False
+            except ValueError:
+                checks['Unknown labels rejected'] = True
+    finally:
+        # load_model() cached the ensemble; later tests must load their own model
+        app.load_model.clear()
+        for name, value in saved.items():
+            setattr(app, name, value)
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all ensemble tests"""
+    passed = test_ensemble()
+    print("\n" + ("✅ All ensemble tests passed" if passed else "❌ Some ensemble tests failed"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
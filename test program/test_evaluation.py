@@ -0,0 +1,160 @@
+"""
+Evaluation Harness Tests
+
+Checks that the vectorized threshold sweep in detector.evaluation finds the
+same best threshold pair as classifying every pair one by one, then runs
+python -m detector evaluate on a labeled file with a tiny random checkpoint
+(see tiny_model.py): the report must hold the metrics, ROC/AUC and
+throughput, a second run must reuse the stored logits, and the candidate
+config must set the best thresholds. An ensemble and the cascade must be
+evaluated the way the app serves them. Runs offline in a few seconds.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import app
+from benchmark_batching import build_texts
+from detector import cli
+from detector.cascade import HashedNgramModel
+from detector.evaluation import METRICS, sweep_thresholds, threshold_metrics
+from tiny_model import make_tiny_checkpoint
+
+
+def brute_force_best(probabilities, positives, grid, metric, min_coverage):
+    """Best metric value over every threshold pair, classifying each pair separately"""
+    values = [threshold_metrics(probabilities, positives, ai_threshold, human_threshold)
+              for ai_threshold in grid for human_threshold in grid]
+    return max(value[metric] for value in values if value['coverage'] >= min_coverage)
+
+
+def run_evaluate(arguments):
+    """Run the evaluate command; return its exit code"""
+    return cli.main(["evaluate"] + arguments)
+
+
+def test_evaluation():
+    """Test the threshold sweep and the evaluate command"""
+    print("=" * 60)
+    print("Evaluation Harness")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    probabilities = np.round(rng.random(400), 2)
+    positives = rng.random(400) < probabilities
+    grid = np.round(np.arange(0.5, 1.0, 0.01), 2)
+    sweeps_match = all(
+        abs(sweep_thresholds(probabilities, positives, grid, metric, min_coverage)['value']
+            - brute_force_best(probabilities, positives, grid, metric, min_coverage)) < 1e-12
+        for metric in METRICS for min_coverage in (0.0, 0.8))
+    unreachable = sweep_thresholds(probabilities, positives, grid, min_coverage=1.1)['ai_threshold'] is None
+
+    with tempfile.TemporaryDirectory() as directory:
+        app.MODEL_CACHE_DIR = directory
+        app.LOGIT_STORE_DIR = os.path.join(directory, "logits")
+        checkpoint = make_tiny_checkpoint(os.path.join(directory, "tiny"))
+        data_path = os.path.join(directory, "labeled.jsonl")
+        texts = build_texts(20)
+        with open(data_path, 'w', encoding='utf-8') as f:
+            for index, text in enumerate(texts):
+                f.write(json.dumps({'text': text, 'label': "ai" if index % 2 else "human"}) + "\n")
+
+        report_path = os.path.join(directory, "report.json")
+        config_path = os.path.join(directory, "thresholds.py")
+        arguments = [data_path, "--model", checkpoint, "-o", report_path, "--grid-step", "0.05"]
+        first_exit = run_evaluate(arguments + ["--config", config_path])
+        with open(report_path) as f:
+            first = json.load(f)
+        second_exit = run_evaluate(arguments)
+        with open(report_path) as f:
+            second = json.load(f)
+        candidate = {}
+        with open(config_path) as f:
+            exec(f.read(), candidate)
+
+        saved = {name: getattr(app, name) for name in ("ENSEMBLE_MODELS", "ENABLE_CASCADE", "CASCADE_MODEL_PATH")}
+        try:
+            other = make_tiny_checkpoint(os.path.join(directory, "other"), seed=1)
+            app.ENSEMBLE_MODELS = [checkpoint, {'name': other, 'weight': 3.0}]
+            app.load_model.clear()
+            ensemble_exit = run_evaluate([data_path, "--model", checkpoint, "-o", report_path, "--grid-step", "0.05"])
+            with open(report_path) as f:
+                ensemble_report = json.load(f)
+            ensemble = app.load_model()
+            members = [app._analyze_batch(texts, classifier=member.classifier, aggregation="mean",
+                                          batch_size=app.BATCH_SIZE, windowed=True) for member in ensemble.members]
+            combined = np.array([(first_result['ai_probability'] + 3 * other_result['ai_probability']) / 400
+                                 for first_result, other_result in zip(*members)])
+            ensemble_expected = threshold_metrics(combined, np.arange(20) % 2 == 1,
+                                                  app.AI_THRESHOLD, app.HUMAN_THRESHOLD)['accuracy']
+            app.ENSEMBLE_MODELS = []
+            app.load_model.clear()
+
+            # A pre-classifier fitted to the labels answers the clear-cut texts itself
+            app.ENABLE_CASCADE = True
+            app.use_model(checkpoint)
+            os.makedirs(os.path.dirname(app.CASCADE_MODEL_PATH), exist_ok=True)
+            HashedNgramModel(dimensions=2 ** 12).fit(texts, [float(index % 2) for index in range(20)],
+                                                     epochs=50).save(app.CASCADE_MODEL_PATH)
+            app.load_cascade.clear()
+            cascade_exit = run_evaluate(arguments + ["--fresh"])
+            with open(report_path) as f:
+                cascade_report = json.load(f)
+        finally:
+            for name, value in saved.items():
+                setattr(app, name, value)
+            app.load_model.clear()
+            app.load_cascade.clear()
+
+        with open(data_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'text': "Unlabeled", 'label': "maybe"}) + "\n")
+        bad_label_exit = run_evaluate([data_path, "--model", checkpoint, "-o", report_path])
+
+    checks = {
+        'Vectorized sweep matches pair-by-pair search': sweeps_match,
+        'Unreachable coverage reported': unreachable,
+        'Evaluate succeeds': first_exit == 0 and second_exit == 0,
+        'Report holds metrics and ROC': (first['texts'] == 20 and 0 <= first['auc'] <= 1
+                                         and len(first['roc']['tpr']) == 101
+                                         and sum(map(sum, first['current']['confusion'])) == 20),
+        'Throughput reported': (first['throughput']['scored_texts'] == 20
+                                and first['throughput']['scored_texts_per_second'] > 0
+                                and first['throughput']['evaluated_texts_per_second'] > 0),
+        'Second run reuses stored logits': (second['throughput']['scored_texts'] == 0
+                                            and second['auc'] == first['auc']),
+        'Best pair at least as good as the current one': first['best']['accuracy'] >= first['current']['accuracy'],
+        'Candidate config sets the best thresholds': (
+            candidate.get('AI_THRESHOLD') == round(first['best']['ai_threshold'], 2)
+            and candidate.get('HUMAN_THRESHOLD') == round(first['best']['human_threshold'], 2)),
+        'Ensemble evaluated on its combined score': (
+            ensemble_exit == 0 and len(ensemble_report['ensemble']) == 2
+            and ensemble_report['throughput']['scored_texts'] == 20
+            and abs(ensemble_report['current']['accuracy'] - ensemble_expected) < 1e-9),
+        'Cascade answers reported': (cascade_exit == 0 and 0 < cascade_report['cascade_texts'] <= 20
+                                     and cascade_report['throughput']['scored_texts']
+                                     == 20 - cascade_report['cascade_texts']),
+        'Unknown labels rejected': bad_label_exit == 1,
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all evaluation harness tests"""
+    passed = test_evaluation()
+    print("\n" + ("✅ All evaluation tests passed" if passed else "❌ Some evaluation tests failed"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
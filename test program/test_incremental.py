@@ -0,0 +1,94 @@
+"""
+Incremental Rescoring Tests
+
+Analyzes a text of three paragraphs with a tiny random checkpoint (see
+tiny_model.py) through a shared scheduler, edits one paragraph and checks
+that only that paragraph is scored again, through the scheduler, that the
+score matches scoring every paragraph directly, and that the edited text is
+flagged (or, in reuse mode, answered) as a near-duplicate of the original.
+Runs offline in a few seconds.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from benchmark_batching import build_texts
+from detector.cli import quiet_streamlit_logging
+from tiny_model import make_tiny_checkpoint
+
+
+def test_incremental():
+    """Test paragraph reuse, scheduling and near-duplicate lookup"""
+    print("=" * 60)
+    print("Incremental Rescoring")
+    print("=" * 60)
+
+    quiet_streamlit_logging()
+    saved = {name: getattr(app, name) for name in
+             ("ENABLE_RESULT_CACHE", "RESULT_CACHE_PATH", "NEAR_DUPLICATE_MODE", "MODEL_CACHE_DIR")}
+    paragraphs = build_texts(3)
+    original = "\n\n".join(paragraphs)
+    edited = "\n\n".join(paragraphs[:2] + [paragraphs[2] + "!"])
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            app.MODEL_CACHE_DIR = directory
+            app.ENABLE_RESULT_CACHE = True
+            app.RESULT_CACHE_PATH = os.path.join(directory, "results.sqlite3")
+            app.NEAR_DUPLICATE_MODE = "flag"
+            app.load_result_cache.clear()
+            classifier = app._load_classifier(make_tiny_checkpoint(os.path.join(directory, "tiny")))
+            scheduler = app._make_scheduler(classifier)
+
+            first = app.analyze_text_incremental(original, classifier, scheduler=scheduler)
+            first_texts = scheduler.stats()['texts']
+            second = app.analyze_text_incremental(edited, classifier, scheduler=scheduler)
+            second_texts = scheduler.stats()['texts'] - first_texts
+            chunks = app._score_chunks(app._split_paragraphs(app._normalize_text(edited)), classifier,
+                                       batch_size=app.BATCH_SIZE)
+            expected = app._aggregate_chunks(chunks, app.WINDOW_AGGREGATION)[0] * 100
+
+            app.NEAR_DUPLICATE_MODE = "reuse"
+            before = scheduler.stats()['texts']
+            reused = app.analyze_text_incremental(edited + "?", classifier, scheduler=scheduler)
+            reuse_texts = scheduler.stats()['texts'] - before
+
+            mixed = scheduler.score([original, ('paragraph', paragraphs[0])])
+            scheduler.close()
+            app.load_result_cache.clear()
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+
+    checks = {
+        'Every paragraph scored through the scheduler': first_texts == 3 and first['paragraphs_reinferred'] == 3,
+        'Only the edited paragraph scored again': second_texts == 1 and second['paragraphs_reinferred'] == 1,
+        'Score matches scoring every paragraph': abs(second['ai_probability'] - expected) < 1e-6,
+        'Edited text flagged as a near-duplicate': (
+            second.get('near_duplicate', {}).get('reused') is False
+            and abs(second['near_duplicate']['ai_probability'] - first['ai_probability']) < 1e-6),
+        'Reuse mode answers without the model': (reuse_texts == 0
+                                                 and reused.get('near_duplicate', {}).get('reused') is True),
+        'Texts and paragraphs share a batch': ('classification' in mixed[0]
+                                               and len(mixed[1]['scores']) == len(mixed[1]['lengths']) > 0),
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all incremental rescoring tests"""
+    passed = test_incremental()
+    print("\n" + ("✅ All incremental rescoring tests passed" if passed else "❌ Some incremental rescoring tests failed"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
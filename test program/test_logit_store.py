@@ -0,0 +1,134 @@
+"""
+Raw-Logit Store Tests
+
+Scores texts with a tiny random checkpoint (see tiny_model.py) into a
+LogitStore and checks that probabilities recomputed from the stored logits
+match app._analyze_batch for every window aggregation, that stored texts
+never reach the model again, that an interrupted append is trimmed on
+reopen, and that the vectorized classification, confusion matrix and ROC
+helpers in detector.evaluation agree with their plain Python counterparts.
+Runs offline in a few seconds.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import app
+from benchmark_batching import build_texts
+from detector import metrics
+from detector.cli import quiet_streamlit_logging
+from detector.evaluation import (CLASSIFICATIONS, CONFIDENCE_LEVELS, auc, classify, confidence_levels,
+                                 confusion_matrix, roc_curve)
+from detector.logits import LogitStore
+from tiny_model import make_tiny_checkpoint
+
+
+def forward_calls():
+    """Forward passes recorded so far"""
+    return metrics.STAGE_SECONDS.quantiles((), stage="forward")['count']
+
+
+def brute_force_auc(scores, positives):
+    """Share of (positive, negative) pairs ranked correctly, ties counting half"""
+    positive_scores = [score for score, positive in zip(scores, positives) if positive]
+    negative_scores = [score for score, positive in zip(scores, positives) if not positive]
+    wins = sum((p > n) + 0.5 * (p == n) for p in positive_scores for n in negative_scores)
+    return wins / (len(positive_scores) * len(negative_scores))
+
+
+def test_logit_store():
+    """Test storing, re-reading and re-classifying logits"""
+    print("=" * 60)
+    print("Raw-Logit Store")
+    print("=" * 60)
+
+    quiet_streamlit_logging()
+    app.WINDOW_TOKENS = 64
+    app.WINDOW_OVERLAP = 16
+    texts = build_texts(12)
+    with tempfile.TemporaryDirectory() as directory:
+        app.MODEL_CACHE_DIR = directory
+        app.LOGIT_STORE_DIR = os.path.join(directory, "logits")
+        app.use_model(make_tiny_checkpoint(os.path.join(directory, "tiny")))
+        classifier = app.load_model()
+        store = app.open_logit_store(classifier)
+
+        app.record_logits(texts[:8], classifier, store, batch_size=4)
+        rows = app.record_logits(texts + [texts[0] + "  "], classifier, store, batch_size=4)
+        only_new_scored = len(store) == 12 and rows[12] == rows[0]
+        before = forward_calls()
+        stored_skipped = (app.record_logits(texts, classifier, store).tolist() == rows[:12].tolist()
+                          and forward_calls() == before)
+
+        matches = {}
+        for aggregation in ("mean", "max", "weighted"):
+            expected = [result['ai_probability'] / 100 for result in
+                        app._analyze_batch(texts, classifier, aggregation=aggregation, batch_size=4, windowed=True)]
+            matches[aggregation] = np.allclose(store.probabilities(rows[:12], aggregation), expected, atol=1e-6)
+        multi_window = any(result['window_count'] > 1 for result in
+                           app._analyze_batch(texts, classifier, aggregation="mean", batch_size=4, windowed=True))
+
+        # Simulate a crash after the logits of a new document were written, but before its key
+        with open(os.path.join(store.directory, "logits.bin"), 'ab') as f:
+            f.write(np.zeros((3, store.num_labels), dtype=np.float32).tobytes())
+        reopened = LogitStore(store.directory, store.num_labels, store.ai_index)
+        trimmed = (len(reopened) == 12
+                   and os.path.getsize(os.path.join(store.directory, "logits.bin"))
+                   == store._logits.size * 4
+                   and np.allclose(reopened.probabilities(rows[:12]), store.probabilities(rows[:12])))
+        try:
+            LogitStore(store.directory, store.num_labels + 1, store.ai_index)
+            mismatch_rejected = False
+        except ValueError:
+            mismatch_rejected = True
+
+        other_store = app.open_logit_store(classifier, windowed=False)
+
+    rng = np.random.default_rng(0)
+    probabilities = np.round(rng.random(500), 2)
+    results = [app._build_result(probability * 100, 100 - probability * 100) for probability in probabilities]
+    codes = classify(probabilities, app.AI_THRESHOLD, app.HUMAN_THRESHOLD)
+    levels = confidence_levels(probabilities, app.HIGH_CONFIDENCE, app.MEDIUM_CONFIDENCE)
+    positives = rng.random(500) < probabilities
+    fpr, tpr, _ = roc_curve(probabilities, positives)
+    matrix = confusion_matrix(positives.astype(int), (probabilities > 0.5).astype(int), 2)
+
+    checks = {
+        'Only texts not stored yet are scored': only_new_scored and stored_skipped,
+        'Texts are windowed in this test': multi_window,
+        'Mean matches the model': matches['mean'],
+        'Max matches the model': matches['max'],
+        'Weighted matches the model': matches['weighted'],
+        'Interrupted append trimmed on reopen': trimmed,
+        'Store with other labels rejected': mismatch_rejected,
+        'Other window settings get their own store': other_store.directory != store.directory,
+        'Vectorized classification matches _build_result': all(
+            CLASSIFICATIONS[code] == result['classification'] for code, result in zip(codes, results)),
+        'Vectorized confidence matches _build_result': all(
+            CONFIDENCE_LEVELS[level] == result['confidence_level'] for level, result in zip(levels, results)),
+        'Confusion matrix counts': (matrix.sum() == 500
+                                    and matrix[1, 1] == np.sum(positives & (probabilities > 0.5))),
+        'AUC matches pairwise ranking': abs(auc(fpr, tpr) - brute_force_auc(probabilities, positives)) < 1e-9,
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all logit store tests"""
+    passed = test_logit_store()
+    print("\n" + ("✅ All logit store tests passed" if passed else "❌ Some logit store tests failed"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
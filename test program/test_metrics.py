@@ -0,0 +1,67 @@
+"""
+Metrics Tests
+
+Verifies the latency histograms, counters and Prometheus text output of
+detector.metrics. No model is needed.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detector.metrics import MetricsRegistry
+
+
+def test_metrics():
+    """Test quantiles, cumulative buckets and the exposition format"""
+    print("=" * 60)
+    print("Metrics registry")
+    print("=" * 60)
+
+    registry = MetricsRegistry()
+    stages = registry.histogram('test_stage_seconds', 'Stage latency', ('stage',), buckets=(0.01, 0.1, 1.0))
+    outcomes = registry.counter('test_outcomes_total', 'Outcomes', ('classification',))
+
+    for value in range(1, 101):
+        stages.observe(value / 1000, stage="forward")
+    stages.observe(5.0, stage="model_load")
+    outcomes.inc(classification="AI Generated")
+    outcomes.inc(2, classification='Say "hi"')
+
+    summary = stages.quantiles(stage="forward")
+    text = registry.render()
+
+    checks = {
+        'p50 is the median': summary['p50'] == 0.05,
+        'p99 is near the top': summary['p99'] == 0.099,
+        'Buckets are cumulative': 'test_stage_seconds_bucket{stage="forward",le="0.1"} 100' in text,
+        '+Inf bucket counts everything': 'test_stage_seconds_bucket{stage="model_load",le="+Inf"} 1' in text,
+        'Sum and count exported': 'test_stage_seconds_count{stage="forward"} 100' in text,
+        'Counter labels escaped': 'test_outcomes_total{classification="Say \\"hi\\""} 2' in text,
+        'TYPE lines present': '# TYPE test_stage_seconds histogram' in text and '# TYPE test_outcomes_total counter' in text,
+        'Empty series has no quantiles': stages.quantiles(stage="tokenize") == {'count': 0}
+    }
+
+    try:
+        outcomes.inc(stage="forward")
+        checks['Wrong labels rejected'] = False
+    except ValueError:
+        checks['Wrong labels rejected'] = True
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all metrics tests"""
+    passed = test_metrics()
+    print("\n" + ("✅ All metrics tests passed" if passed else "❌ Some metrics tests failed"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Micro-Batching Tests
+
+Verifies that concurrent requests are coalesced into shared batches and that
+every caller gets back exactly its own results. Uses a fake scoring function,
+so no model download is needed.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detector.batching import AsyncMicroBatcher, ThreadMicroBatcher
+
+
+def fake_score_batch(texts):
+    """Pretend to run the model: slow enough for requests to pile up"""
+    time.sleep(0.05)
+    return [{'text': text} for text in texts]
+
+
+def test_thread_batcher():
+    """Test the batcher shared by Streamlit sessions"""
+    print("=" * 60)
+    print("ThreadMicroBatcher (Streamlit sessions)")
+    print("=" * 60)
+
+    batcher = ThreadMicroBatcher(fake_score_batch, max_wait_ms=20, max_texts=64)
+    results = {}
+
+    def session(user):
+        results[user] = batcher.score([f"user{user}-a", f"user{user}-b"])
+
+    threads = [threading.Thread(target=session, args=(user,)) for user in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = batcher.stats()
+
+    failing = ThreadMicroBatcher(lambda texts: 1 / 0, max_wait_ms=0, max_texts=8)
+    try:
+        failing.score(["boom"])
+        error_propagated = False
+    except ZeroDivisionError:
+        error_propagated = True
+    batcher.close()
+    failing.close()
+
+    checks = {
+        'Each session gets its own results': all(
+            results[user] == [{'text': f"user{user}-a"}, {'text': f"user{user}-b"}] for user in range(10)
+        ),
+        'Ten sessions share few batches': stats['batches'] <= 3,
+        'Errors reach the caller': error_propagated
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+    print(f"   {stats['requests']} requests in {stats['batches']} batches")
+
+    return all(checks.values())
+
+
+def test_async_batcher():
+    """Test the batcher used by the HTTP service"""
+    print("\n" + "=" * 60)
+    print("AsyncMicroBatcher (HTTP service)")
+    print("=" * 60)
+
+    async def run():
+        batcher = AsyncMicroBatcher(fake_score_batch, max_wait_ms=20, max_texts=64)
+        results = await asyncio.gather(*(batcher.submit([f"request{i}"]) for i in range(20)))
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(run())
+
+    checks = {
+        'Each request gets its own result': all(
+            result == [{'text': f"request{i}"}] for i, result in enumerate(results)
+        ),
+        'Concurrent requests coalesced': stats['batches'] <= 2
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+    print(f"   {stats['requests']} requests in {stats['batches']} batches")
+
+    return all(checks.values())
+
+
+def test_concurrent_batches():
+    """Test that one batch per model replica is scored at a time"""
+    print("\n" + "=" * 60)
+    print("Concurrent batches (model replica pool)")
+    print("=" * 60)
+
+    # max_texts=1 forces every request into its own 50ms batch
+    batcher = ThreadMicroBatcher(fake_score_batch, max_wait_ms=0, max_texts=1, workers=4)
+    start = time.perf_counter()
+    futures = [batcher.submit([f"thread{i}"]) for i in range(8)]
+    thread_results = [future.result() for future in futures]
+    thread_elapsed = time.perf_counter() - start
+    batcher.close()
+
+    async def run():
+        batcher = AsyncMicroBatcher(fake_score_batch, max_wait_ms=0, max_texts=1, concurrency=4)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(batcher.submit([f"request{i}"]) for i in range(8)))
+        return results, time.perf_counter() - start
+
+    async_results, async_elapsed = asyncio.run(run())
+
+    checks = {
+        'Thread workers return own results': all(
+            result == [{'text': f"thread{i}"}] for i, result in enumerate(thread_results)
+        ),
+        'Thread workers overlap batches': thread_elapsed < 8 * 0.05 / 2,
+        'Async slots return own results': all(
+            result == [{'text': f"request{i}"}] for i, result in enumerate(async_results)
+        ),
+        'Async slots overlap batches': async_elapsed < 8 * 0.05 / 2
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+    print(f"   8 batches of 50ms: {thread_elapsed * 1000:.0f}ms (threads), {async_elapsed * 1000:.0f}ms (async)")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all micro-batching tests"""
+    results = [test_thread_batcher(), test_async_batcher(), test_concurrent_batches()]
+    print("\n" + ("✅ All micro-batching tests passed" if all(results) else "❌ Some micro-batching tests failed"))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Model Registry Tests
+
+Loads tiny random checkpoints (see tiny_model.py) through the app's model
+registry and checks least-recently-used unloading by model count and by
+memory budget, that a request holding a model keeps it until it finishes
+even after a switch or an unload, and that concurrent requests for a model
+that is not loaded yet load it only once. Runs offline in a few seconds.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from benchmark_batching import build_texts
+from detector.cli import quiet_streamlit_logging
+from detector.registry import ModelRegistry
+from tiny_model import make_tiny_checkpoint
+
+
+def test_model_registry():
+    """Test loading, switching, leases and eviction"""
+    print("=" * 60)
+    print("Model Registry")
+    print("=" * 60)
+
+    quiet_streamlit_logging()
+    app.ENABLE_RESULT_CACHE = False
+    app.NEAR_DUPLICATE_MODE = "off"
+    texts = build_texts(4)
+    with tempfile.TemporaryDirectory() as directory:
+        app.MODEL_CACHE_DIR = directory
+        first, second, third = [make_tiny_checkpoint(os.path.join(directory, name), seed=seed)
+                                for seed, name in enumerate(["first", "second", "third"])]
+        loads = []
+        unloaded = []
+
+        def loader(name):
+            loads.append(name)
+            return app._load_served_model(name)
+
+        def unloader(served):
+            unloaded.append(served)
+            app._unload_served_model(served)
+
+        registry = ModelRegistry(loader, default=first, max_models=2, size=app._served_model_bytes,
+                                 unloader=unloader)
+        with registry.use() as served:
+            results = app.analyze_texts_shared(texts, served['classifier'], served['scheduler'])
+        model_bytes = registry.loaded()[0]['size_bytes']
+
+        # A request on the first model is still running while the model is switched and evicted
+        lease = registry.acquire()
+        registry.activate(second)
+        registry.load(third)
+        evicted_while_in_use = [model['name'] for model in registry.loaded()] == [third, second]
+        kept_for_request = not unloaded and len(app.analyze_texts(texts, lease.model['classifier'])) == len(texts)
+        lease.release()
+        released_after_request = unloaded == [lease.model]
+
+        try:
+            registry.unload(second)
+            active_protected = False
+        except ValueError:
+            active_protected = True
+        registry.unload(third)
+
+        # Four threads ask for a model that is not loaded yet
+        loads.clear()
+        threads = [threading.Thread(target=registry.load, args=(first,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        loaded_once = loads == [first]
+
+        budget = ModelRegistry(loader, default=first, max_models=3, max_bytes=int(model_bytes * 1.5),
+                               size=app._served_model_bytes, unloader=app._unload_served_model)
+        for name in (first, second, third):
+            budget.load(name)
+        budget_names = [model['name'] for model in budget.loaded()]
+        budget.close()
+        registry.close()
+
+        checks = {
+            'Active model scores texts': len(results) == len(texts),
+            'Model size measured': model_bytes > 0,
+            'Least recently used model evicted': evicted_while_in_use,
+            'Request keeps its model after a switch': kept_for_request,
+            'Model released once the request finished': released_after_request,
+            'Active model cannot be unloaded': active_protected,
+            'Concurrent requests load a model once': loaded_once,
+            'Memory budget enforced': budget_names == [third, first],
+            'Stats count loads and unloads': registry.stats()['unloads'] >= 3,
+        }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def test_near_duplicates_per_model():
+    """Test that a near-duplicate never reuses the score of another model"""
+    print("\n" + "=" * 60)
+    print("Near Duplicates Across Models")
+    print("=" * 60)
+
+    quiet_streamlit_logging()
+    saved = {name: getattr(app, name) for name in
+             ("ENABLE_RESULT_CACHE", "RESULT_CACHE_PATH", "NEAR_DUPLICATE_MODE", "MODEL_CACHE_DIR")}
+    text = build_texts(1)[0]
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            app.MODEL_CACHE_DIR = directory
+            app.ENABLE_RESULT_CACHE = True
+            app.RESULT_CACHE_PATH = os.path.join(directory, "results.sqlite3")
+            app.NEAR_DUPLICATE_MODE = "reuse"
+            app.load_result_cache.clear()
+            first, second = [app._load_classifier(make_tiny_checkpoint(os.path.join(directory, name), seed=seed))
+                             for seed, name in enumerate(["first", "second"])]
+
+            app.analyze_texts([text], first)
+            other_model = app.analyze_texts([text + "!"], second)[0]
+            same_model = app.analyze_texts([text + "?"], second)[0]
+            app.load_result_cache.clear()
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+
+    checks = {
+        "Other model's score not reused": 'near_duplicate' not in other_model,
+        "Same model's score reused": same_model.get('near_duplicate', {}).get('reused') is True,
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all model registry tests"""
+    passed = all([test_model_registry(), test_near_duplicates_per_model()])
+    print("\n" + ("✅ All model registry tests passed" if passed else "❌ Some model registry tests failed"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Near-Duplicate Index Tests
+
+Verifies SimHash fingerprints and the SimHashIndex radius lookup of
+detector.neardup. No model is needed.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detector.neardup import SimHashIndex, fingerprint
+
+TEXT = ("The committee met on Tuesday to review the budget for next year. After a long discussion, "
+        "members agreed to increase funding for the library and reduce spending on office supplies. "
+        "The final vote is expected next month, once the revised figures have been published.")
+
+
+def distance(a, b):
+    """Hamming distance between two fingerprints"""
+    return bin(a ^ b).count("1")
+
+
+def test_fingerprints():
+    """Test which edits keep a text near its original"""
+    print("=" * 60)
+    print("SimHash Fingerprints")
+    print("=" * 60)
+
+    original = fingerprint(TEXT)
+    reformatted = fingerprint(TEXT.upper().replace(" ", "  ").replace(",", ""))
+    swapped = fingerprint(TEXT.replace("increase", "raise"))
+    unrelated = fingerprint("I baked sourdough bread this weekend and the crust came out far too dark, "
+                            "so next time I will lower the oven temperature and shorten the bake.")
+
+    checks = {
+        'Case, spacing and punctuation ignored': reformatted == original,
+        'Swapped word stays within 5 bits': distance(swapped, original) <= 5,
+        'Unrelated text is far away': distance(unrelated, original) > 10,
+        'Fingerprint fits in 64 bits': 0 <= original < 2 ** 64
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def test_index():
+    """Test radius lookup, nearest match and the size limit"""
+    print("\n" + "=" * 60)
+    print("SimHash Index")
+    print("=" * 60)
+
+    index = SimHashIndex(max_distance=3, max_entries=3)
+    base = 0x0123456789ABCDEF
+    index.add(base, "base")
+    index.add(base ^ 0b11, "two bits away")
+    index.add(base ^ (1 << 63) ^ (1 << 40) ^ (1 << 20) ^ (1 << 5) ^ 1, "five bits away")
+
+    checks = {
+        'Exact match': index.query(base) == ("base", 0),
+        'Nearest match wins': index.query(base ^ 0b10) == ("base", 1),
+        'Match spread over every block': index.query(base ^ (1 << 60) ^ (1 << 35) ^ (1 << 10)) == ("base", 3),
+        'Outside the radius is no match': index.query(base ^ 0xF000F000F0000000) is None,
+        'Full index stores nothing': index.add(base ^ 0xFF, "extra") is False and len(index) == 3,
+        'Empty index has no match': SimHashIndex().query(base) is None
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all near-duplicate tests"""
+    results = [test_fingerprints(), test_index()]
+    print("\n" + ("✅ All near-duplicate tests passed" if all(results) else "❌ Some near-duplicate tests failed"))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Model Pool Failure Tests
+
+Starts a one-replica ModelPool on a tiny random checkpoint (see
+tiny_model.py) and checks that a call whose arguments cannot be pickled
+leaves the replica usable, and that callers waiting for a replica fail
+instead of hanging once the last replica process dies. Runs offline in
+about half a minute.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detector.pool import ModelPool
+from tiny_model import make_tiny_checkpoint
+
+
+def run_with_timeout(func, seconds=20):
+    """Run func in a thread; return ('ok', value), ('error', exception) or ('hung', None)"""
+    outcome = ['hung', None]
+
+    def target():
+        try:
+            outcome[:] = ['ok', func()]
+        except Exception as e:
+            outcome[:] = ['error', e]
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    return tuple(outcome)
+
+
+def test_pool_failures():
+    """Test that replicas survive caller errors and waiters see a dead pool"""
+    print("=" * 60)
+    print("Model Pool Failures")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint = make_tiny_checkpoint(os.path.join(directory, "tiny"))
+        settings = {'MODEL_CACHE_DIR': directory, 'ENABLE_RESULT_CACHE': False}
+        pool = ModelPool(1, 1, model_name=checkpoint, pin_cores=False, settings=settings)
+        try:
+            unpicklable = run_with_timeout(lambda: pool.run('_analyze_batch', [lambda: 0]))
+            after = run_with_timeout(lambda: pool.run('analyze_texts', ["hello world"]))
+
+            # Hold the only replica while two callers queue up, then kill its process
+            member = pool._idle.get()
+            waiters = [[None] for _ in range(2)]
+            threads = [threading.Thread(target=lambda box=box: box.__setitem__(
+                0, run_with_timeout(lambda: pool.run('analyze_texts', ["hello world"])))) for box in waiters]
+            for thread in threads:
+                thread.start()
+            member.process.kill()
+            member.process.join()
+            pool._idle.put(member)
+            for thread in threads:
+                thread.join(30)
+            after_death = run_with_timeout(lambda: pool.run('analyze_texts', ["hello world"]))
+        finally:
+            pool.close()
+
+    checks = {
+        'Unpicklable arguments raise': unpicklable[0] == 'error',
+        'Replica usable after a failed call': after[0] == 'ok' and len(after[1]) == 1,
+        'Waiters fail when the last replica dies': all(
+            box[0] is not None and box[0][0] == 'error' and isinstance(box[0][1], RuntimeError) for box in waiters),
+        'Later calls fail fast': after_death[0] == 'error' and isinstance(after_death[1], RuntimeError),
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all model pool tests"""
+    passed = test_pool_failures()
+    print("\n" + ("✅ All model pool tests passed" if passed else "❌ Some model pool tests failed"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Result Cache Tests
+
+Verifies the two-tier (memory LRU + SQLite) score cache: persistence across
+instances, TTL expiry, row-limit eviction and hit-rate counters.
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detector.cache import ResultCache, make_key
+
+
+def test_persistence_and_counters():
+    """Test that entries survive a new cache instance and hits are counted"""
+    print("=" * 60)
+    print("Persistence and Hit-Rate Counters")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results.sqlite3")
+        key = make_key("model", "rev", 1, "text-hash")
+
+        first = ResultCache(path)
+        first.put(key, {'ai_probability': 91.5, 'window_count': 2})
+        memory_hit = first.get(key)
+
+        second = ResultCache(path)
+        disk_hit = second.get(key)
+        second_hit = second.get(key)
+        miss = second.get(make_key("other-model", "rev", 1, "text-hash"))
+        stats = second.stats()
+
+    checks = {
+        'Memory tier hit': memory_hit == {'ai_probability': 91.5, 'window_count': 2},
+        'Disk tier hit after restart': disk_hit == memory_hit,
+        'Disk hit promoted to memory': second_hit == memory_hit and stats['memory_hits'] == 1,
+        'Different model misses': miss is None,
+        'Hit rate counted': abs(stats['hit_rate'] - 2 / 3) < 1e-9
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def test_eviction():
+    """Test TTL expiry and size-based eviction"""
+    print("\n" + "=" * 60)
+    print("TTL and Size Eviction")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        expiring = ResultCache(os.path.join(directory, "ttl.sqlite3"), ttl_seconds=0.05)
+        expiring.put("key", {'ai_probability': 10.0})
+        time.sleep(0.1)
+        expired = expiring.get("key")
+
+        bounded = ResultCache(os.path.join(directory, "size.sqlite3"), memory_entries=3, max_rows=10)
+        bounded.put_many({str(i): {'ai_probability': float(i)} for i in range(300)})
+        rows = bounded._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        memory_entries = bounded.stats()['memory_entries']
+        newest = bounded.get("299")
+
+    checks = {
+        'Expired entry not returned': expired is None,
+        'Disk rows capped': rows == 10,
+        'Memory LRU capped': memory_entries == 3,
+        'Newest entry kept': newest == {'ai_probability': 299.0}
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all result cache tests"""
+    results = [test_persistence_and_counters(), test_eviction()]
+    print("\n" + ("✅ All result cache tests passed" if all(results) else "❌ Some result cache tests failed"))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
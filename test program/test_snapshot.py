@@ -0,0 +1,99 @@
+"""
+Model Snapshot Revision Tests
+
+Snapshots a tiny random checkpoint (see tiny_model.py) through the app and
+checks that changing MODEL_REVISION replaces the snapshot instead of
+loading the old one, that a model still mapping the old weights keeps
+working, that cache keys follow the revision, that REQUIRE_LOCAL_SNAPSHOT
+refuses a snapshot of another revision, and that the ONNX and int8 exports
+are rebuilt for the new revision. Runs offline in a few seconds.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from detector.cli import quiet_streamlit_logging
+from detector.onnx_backend import is_exported
+from detector.quantization import is_quantized
+from detector.snapshot import has_snapshot, read_manifest
+from tiny_model import make_tiny_checkpoint
+
+
+def test_snapshot_revisions():
+    """Test that the pinned revision is what gets served"""
+    print("=" * 60)
+    print("Snapshot Revisions")
+    print("=" * 60)
+
+    quiet_streamlit_logging()
+    saved = {name: getattr(app, name) for name in
+             ("MODEL_CACHE_DIR", "MODEL_NAME", "MODEL_SNAPSHOT_DIR", "ONNX_MODEL_DIR", "QUANTIZED_MODEL_DIR",
+              "CASCADE_MODEL_PATH", "MODEL_REVISION", "REQUIRE_LOCAL_SNAPSHOT", "INFERENCE_BACKEND",
+              "QUANTIZED_MODEL")}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            app.MODEL_CACHE_DIR = directory
+            app.use_model(make_tiny_checkpoint(os.path.join(directory, "tiny")))
+            app.MODEL_REVISION = "v1"
+            old = app._load_classifier(app.MODEL_NAME)
+
+            app.MODEL_REVISION = "v2"
+            new = app._load_classifier(app.MODEL_NAME)
+            replaced = (read_manifest(app.MODEL_SNAPSHOT_DIR)['revision'] == "v2"
+                        and has_snapshot(app.MODEL_SNAPSHOT_DIR, "v2")
+                        and not has_snapshot(app.MODEL_SNAPSHOT_DIR, "v1"))
+            old_still_scores = len(old("A text scored by the model loaded before the new snapshot.")[0]) == 2
+            keys_differ = (app._cache_key("text", old, "mean", True) != app._cache_key("text", new, "mean", True))
+
+            app.REQUIRE_LOCAL_SNAPSHOT = True
+            app.MODEL_REVISION = "v3"
+            try:
+                app._load_classifier(app.MODEL_NAME)
+                offline_refused = False
+            except FileNotFoundError:
+                offline_refused = True
+            app.REQUIRE_LOCAL_SNAPSHOT = False
+
+            exports = {}
+            for backend, quantized, export_dir, is_built in (("onnx", False, app.ONNX_MODEL_DIR, is_exported),
+                                                              ("direct", True, app.QUANTIZED_MODEL_DIR, is_quantized)):
+                app.INFERENCE_BACKEND, app.QUANTIZED_MODEL = backend, quantized
+                app.MODEL_REVISION = "v2"
+                app._load_classifier(app.MODEL_NAME)
+                app.MODEL_REVISION = "v3"
+                served = app._load_classifier(app.MODEL_NAME)
+                exports[backend] = (is_built(export_dir, "v3") and not is_built(export_dir, "v2")
+                                    and served.model.config._commit_hash == "v3")
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+
+    checks = {
+        'New revision replaces the snapshot': replaced,
+        'Model loaded before keeps working': old_still_scores,
+        'Cache keys follow the revision': keys_differ,
+        'Offline start refuses another revision': offline_refused,
+        'ONNX export rebuilt for the new revision': exports['onnx'],
+        'INT8 model rebuilt for the new revision': exports['direct'],
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all snapshot tests"""
+    passed = test_snapshot_revisions()
+    print("\n" + ("✅ All snapshot tests passed" if passed else "❌ Some snapshot tests failed"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
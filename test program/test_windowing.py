@@ -0,0 +1,128 @@
+"""
+Sliding-Window Scoring Tests
+
+Verifies how long documents are split into overlapping windows and how
+window scores are aggregated. Runs without downloading the model.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+
+def test_split_windows():
+    """Test window boundaries and overlap"""
+    print("=" * 60)
+    print("Window Splitting")
+    print("=" * 60)
+
+    tokens = list(range(1200))
+    windows = app._split_windows(tokens, body_size=510, overlap=128)
+    covered = set(token for window in windows for token in window)
+
+    checks = {
+        'Short text is a single window': app._split_windows(list(range(100)), 510, 128) == [list(range(100))],
+        'Empty text is a single window': app._split_windows([], 510, 128) == [[]],
+        'Windows respect body size': all(len(window) <= 510 for window in windows),
+        'Consecutive windows overlap': windows[1][:128] == windows[0][-128:],
+        'Every token covered': covered == set(tokens),
+        'Last window reaches the end': windows[-1][-1] == tokens[-1]
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def test_aggregation():
+    """Test mean, max and length-weighted aggregation"""
+    print("\n" + "=" * 60)
+    print("Window Score Aggregation")
+    print("=" * 60)
+
+    scores = [0.9, 0.3]
+    lengths = [510, 90]
+
+    weighted = app._aggregate_window_scores(scores, lengths, "weighted")
+    checks = {
+        'Mean': abs(app._aggregate_window_scores(scores, lengths, "mean") - 0.6) < 1e-9,
+        'Max': app._aggregate_window_scores(scores, lengths, "max") == 0.9,
+        'Weighted favours long windows': abs(weighted - (0.9 * 510 + 0.3 * 90) / 600) < 1e-9,
+    }
+
+    try:
+        app._aggregate_window_scores(scores, lengths, "median")
+        checks['Unknown method rejected'] = False
+    except ValueError:
+        checks['Unknown method rejected'] = True
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def test_split_sentences():
+    """Test sentence boundaries for the sentence heatmap"""
+    print("\n" + "=" * 60)
+    print("Sentence Splitting")
+    print("=" * 60)
+
+    text = 'It rained. "Really?" she asked!  Pi is 3.14 today.\nA line without a stop\n\nThe end.'
+    sentences = [text[start:end] for start, end in app._split_sentences(text)]
+
+    checks = {
+        'Split at end punctuation': sentences[0] == 'It rained.',
+        'Closing quotes kept': sentences[1] == '"Really?"',
+        'Decimal point is not a boundary': 'Pi is 3.14 today.' in sentences,
+        'Line breaks end a sentence': 'A line without a stop' in sentences,
+        'Nothing lost or added': len(sentences) == 6 and sentences[-1] == 'The end.',
+        'Empty text has no sentences': app._split_sentences("") == []
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def test_split_paragraphs():
+    """Test that paragraph chunks only change where the text changed"""
+    print("\n" + "=" * 60)
+    print("Paragraph Chunking")
+    print("=" * 60)
+
+    original = "First paragraph.\nStill first.\n\nSecond paragraph.\n \n\nThird paragraph."
+    edited = original.replace("Second", "Edited second")
+    before = app._split_paragraphs(original)
+    after = app._split_paragraphs(edited)
+
+    checks = {
+        'Split at blank lines only': before == ["First paragraph.\nStill first.", "Second paragraph.", "Third paragraph."],
+        'Edit changes one chunk': sum(a != b for a, b in zip(before, after)) == 1,
+        'Whitespace-only text has no chunks': app._split_paragraphs(" \n\n ") == []
+    }
+
+    for check, passed in checks.items():
+        status = "✅" if passed else "❌"
+        print(f"{status} {check}: {'PASS' if passed else 'FAIL'}")
+
+    return all(checks.values())
+
+
+def main():
+    """Run all windowing tests"""
+    results = [test_split_windows(), test_aggregation(), test_split_sentences(), test_split_paragraphs()]
+    print("\n" + ("✅ All windowing tests passed" if all(results) else "❌ Some windowing tests failed"))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
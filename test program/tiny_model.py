@@ -0,0 +1,83 @@
+"""
+Tiny Offline Checkpoint
+
+Generates a randomly-initialized RoBERTa sequence classifier with the same
+Fake/Real label map as the real detector, plus a small byte-level BPE
+tokenizer trained on the sample sentences. Nothing is downloaded, so tests
+and benchmarks can run on hosts without network access. Its predictions
+are meaningless; only its shapes and code paths match the real model.
+
+Usage:
+    python "test program/tiny_model.py" ./tiny-detector
+    python "test program/tiny_model.py" ./base-shaped --preset base
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+
+import torch
+from tokenizers import ByteLevelBPETokenizer
+from transformers import RobertaConfig, RobertaForSequenceClassification, RobertaTokenizerFast
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_batching import SAMPLE_SENTENCES
+
+# Model shapes: "tiny" is fast enough for CI; "base" matches roberta-base, so
+# forward-pass timings are representative of the real detector
+PRESETS = {
+    'tiny': {'hidden_size': 32, 'num_hidden_layers': 2, 'num_attention_heads': 2, 'intermediate_size': 64},
+    'base': {'hidden_size': 768, 'num_hidden_layers': 12, 'num_attention_heads': 12, 'intermediate_size': 3072,
+             'vocab_size': 50265}
+}
+
+
+def make_tiny_checkpoint(output_dir, preset="tiny", seed=0):
+    """
+    Write a random RoBERTa detector checkpoint and tokenizer to output_dir.
+
+    Args:
+        output_dir (str): Directory to save the checkpoint in
+        preset (str): Key of PRESETS selecting the model shape
+        seed (int): Seed for the random weights
+
+    Returns:
+        str: output_dir, loadable with pipeline(model=output_dir)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator(SAMPLE_SENTENCES * 20, vocab_size=1000, min_frequency=1,
+                            special_tokens=["<s>", "<pad>", "</s>", "<unk>", "<mask>"])
+    with tempfile.TemporaryDirectory() as vocab_dir:
+        bpe.save_model(vocab_dir)
+        tokenizer = RobertaTokenizerFast(vocab_file=os.path.join(vocab_dir, "vocab.json"),
+                                         merges_file=os.path.join(vocab_dir, "merges.txt"),
+                                         model_max_length=512)
+    tokenizer.save_pretrained(output_dir)
+
+    shape = dict(PRESETS[preset])
+    shape.setdefault('vocab_size', len(tokenizer))
+    config = RobertaConfig(max_position_embeddings=514, type_vocab_size=1,
+                           pad_token_id=tokenizer.pad_token_id,
+                           id2label={0: "Fake", 1: "Real"}, label2id={"Fake": 0, "Real": 1}, **shape)
+    torch.manual_seed(seed)
+    RobertaForSequenceClassification(config).save_pretrained(output_dir)
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a random offline detector checkpoint")
+    parser.add_argument("output_dir", help="Directory to write the checkpoint to")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="tiny", help="Model shape")
+    args = parser.parse_args()
+
+    make_tiny_checkpoint(args.output_dir, preset=args.preset)
+    print(f"✅ Wrote {args.preset} checkpoint to {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())